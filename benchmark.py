@@ -0,0 +1,465 @@
+"""
+Benchmark - Micro-benchmark các hot path của server (offline, kịch bản cố định)
+
+Các kịch bản:
+1. place_bid: AuctionState.place_bid bị tranh chấp bởi 1 / 8 / 64 thread
+2. broadcast: AuctionHub.broadcast_new_price đến 10 / 1k / 10k client (socketpair,
+   ThreadedOutbox như chế độ thread) - đo thời gian đưa vào hàng đợi và thời
+   gian đến khi client cuối cùng nhận được frame
+3. frame_parse: LineFramer.feed trên luồng BID chia thành từng khối 4KB
+4. welcome: ClientSession.build_welcome_frame (snapshot đã cache / chưa cache)
+
+Kịch bản cố định (số thread, số client, số lần lặp, seed) nằm trong các hằng số
+bên dưới → 2 lần chạy trên cùng máy so sánh được với nhau. Mỗi kịch bản chạy
+REPEAT lần, lấy median của từng chỉ số.
+
+Kết quả:
+- Ghi ra file JSON (mặc định bench_baseline.json): {"meta": ..., "results":
+  {"place_bid.threads_8": {"ops_per_s": ...}, ...}} - khóa ổn định để diff
+- Kịch bản không chạy được trên máy đo (VD: broadcast 10k client cần ~20k file
+  descriptor, `ulimit -n` thấp hơn) không có trong "results" mà ghi lý do vào
+  meta["skipped"] - so sánh chỉ dùng các kịch bản có số liệu thật
+- --compare <file cũ>: in chênh lệch từng chỉ số và đánh dấu các chỉ số tệ hơn
+  quá --threshold % (exit code 1 nếu có)
+
+Cách dùng:
+    python benchmark.py                                 # chạy tất cả, ghi bench_baseline.json
+    python benchmark.py --only place_bid frame_parse
+    python benchmark.py --output new.json --compare bench_baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import selectors
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server"))
+from auction_hub import AuctionHub
+from auction_logic import AuctionState
+from async_server import raise_fd_limit
+from client_thread import ClientSession
+from event_log import log
+from message_framing import LineFramer, encode_message
+
+DEFAULT_OUTPUT = "bench_baseline.json"
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 10.0        # % tệ hơn thì coi là regression
+
+SCENARIOS = ("place_bid", "broadcast", "frame_parse", "welcome")
+
+STARTING_PRICE = 100_000        # cents
+SEED = 42
+
+PLACE_BID_THREADS = (1, 8, 64)
+PLACE_BID_TOTAL = 64_000        # Tổng số bid mỗi lần chạy (chia đều cho các thread)
+
+BROADCAST_CLIENTS = (10, 1_000, 10_000)
+BROADCAST_COUNT = 50            # Số NEW_PRICE mỗi lần chạy (gửi lần lượt, không bị gộp)
+BROADCAST_TIMEOUT = 30.0
+
+FRAME_PARSE_FRAMES = 200_000
+FRAME_PARSE_CHUNK = 4096
+
+WELCOME_CALLS = 50_000
+
+# Chỉ số càng lớn càng tốt (còn lại: càng nhỏ càng tốt)
+HIGHER_IS_BETTER = ("ops_per_s", "frames_per_s", "mb_per_s")
+# Chỉ số mô tả (không so sánh)
+INFO_METRICS = ("accepted", "rejected", "frame_bytes")
+
+
+def quiet():
+    """
+    Tắt print của các constructor (AuctionState, AuctionHub) trong lúc đo
+    """
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def new_auction():
+    with quiet():
+        state = AuctionState(STARTING_PRICE, "Benchmark", "Micro-benchmark")
+        hub = AuctionHub(state)
+    return state, hub
+
+
+def percentile_us(sorted_ns, fraction):
+    index = min(len(sorted_ns) - 1, int(fraction * len(sorted_ns)))
+    return round(sorted_ns[index] / 1000, 2)
+
+
+# ========== KỊCH BẢN ==========
+
+def bench_place_bid(threads):
+    """
+    PLACE_BID_TOTAL bid chia cho `threads` thread cùng đặt giá vào 1 phiên
+    
+    Mỗi thread bid giá snapshot + 1..3 bước giá → vừa có bid thắng (vào lock),
+    vừa có bid cũ bị loại trước lock (giống cuối phiên thật)
+    """
+    state, _ = new_auction()
+    per_thread = PLACE_BID_TOTAL // threads
+    barrier = threading.Barrier(threads + 1)
+    latencies = [None] * threads
+    accepted = [0] * threads
+    
+    def worker(index):
+        rng = random.Random(SEED + index)
+        user = f"bench{index}"
+        samples = []
+        ok = 0
+        barrier.wait()
+        for _ in range(per_thread):
+            value = state.snapshot.price + rng.randint(1, 3)
+            started = time.perf_counter_ns()
+            success, _, _ = state.place_bid(user, value)
+            samples.append(time.perf_counter_ns() - started)
+            ok += success
+        latencies[index] = samples
+        accepted[index] = ok
+    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    samples = sorted(sample for part in latencies for sample in part)
+    total = per_thread * threads
+    return {
+        "ops_per_s": round(total / elapsed),
+        "p50_us": percentile_us(samples, 0.50),
+        "p99_us": percentile_us(samples, 0.99),
+        "accepted": sum(accepted),
+        "rejected": total - sum(accepted)
+    }
+
+
+class FanoutReader:
+    """
+    1 thread đọc đầu client của mọi socketpair, báo khi client cuối cùng đã nhận
+    đủ `target` frame
+    """
+    
+    def __init__(self, sockets):
+        self.selector = selectors.DefaultSelector()
+        self.counts = [0] * len(sockets)
+        for index, sock in enumerate(sockets):
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ, index)
+        
+        self.lock = threading.Lock()
+        self.target = 0
+        self.remaining = 0
+        self.done = threading.Event()
+        self.is_running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+    
+    def expect(self, target):
+        with self.lock:
+            self.target = target
+            self.remaining = sum(1 for count in self.counts if count < target)
+            self.done.clear()
+            if self.remaining == 0:
+                self.done.set()
+    
+    def _loop(self):
+        while self.is_running:
+            for key, _ in self.selector.select(timeout=0.2):
+                try:
+                    data = key.fileobj.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    data = b""
+                if not data:
+                    self.selector.unregister(key.fileobj)
+                    continue
+                frames = data.count(b"\n")
+                with self.lock:
+                    before = self.counts[key.data]
+                    self.counts[key.data] = before + frames
+                    if before < self.target <= before + frames:
+                        self.remaining -= 1
+                        if self.remaining == 0:
+                            self.done.set()
+    
+    def stop(self):
+        self.is_running = False
+        self.thread.join(timeout=2)
+        self.selector.close()
+
+
+def bench_broadcast(clients):
+    """
+    BROADCAST_COUNT lần broadcast NEW_PRICE đến `clients` client (đợi client
+    cuối nhận xong mới broadcast tiếp)
+    """
+    needed = clients * 2 + 64
+    limit = raise_fd_limit()
+    if limit is not None and limit < needed:
+        return {"skipped": f"cần {needed} file descriptor, giới hạn {limit}"}
+    
+    state, hub = new_auction()
+    server_ends = []
+    client_ends = []
+    reader = None
+    try:
+        for index in range(clients):
+            server_end, client_end = socket.socketpair()
+            server_ends.append(server_end)
+            client_ends.append(client_end)
+            hub.add_client(server_end, f"bench-{index}")
+    except (OSError, RuntimeError) as e:
+        # Hết fd / không tạo thêm được writer thread
+        cleanup_broadcast(hub, server_ends, client_ends, None)
+        return {"skipped": f"không tạo được {clients} client: {e}"}
+    
+    try:
+        reader = FanoutReader(client_ends)
+        enqueue = []
+        fanout = []
+        for round_index in range(1, BROADCAST_COUNT + 1):
+            reader.expect(round_index)
+            started = time.perf_counter_ns()
+            hub.broadcast_new_price("bench", STARTING_PRICE + round_index, state.auction_id,
+                                    version=round_index)
+            enqueued = time.perf_counter_ns()
+            if not reader.done.wait(BROADCAST_TIMEOUT):
+                return {"skipped": f"quá {BROADCAST_TIMEOUT}s chưa gửi xong broadcast {round_index}"}
+            delivered = time.perf_counter_ns()
+            enqueue.append(enqueued - started)
+            fanout.append(delivered - started)
+    finally:
+        cleanup_broadcast(hub, server_ends, client_ends, reader)
+    
+    enqueue.sort()
+    fanout.sort()
+    return {
+        "enqueue_p50_us": percentile_us(enqueue, 0.50),
+        "fanout_p50_us": percentile_us(fanout, 0.50),
+        "fanout_max_us": round(fanout[-1] / 1000, 2)
+    }
+
+
+def cleanup_broadcast(hub, server_ends, client_ends, reader):
+    with quiet():
+        hub.close_all_clients()
+    if reader is not None:
+        reader.stop()
+    for sock in server_ends + client_ends:
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+
+def bench_frame_parse():
+    """
+    Tách + decode FRAME_PARSE_FRAMES frame BID nhận theo từng khối 4KB
+    """
+    frames = [
+        encode_message({"type": "BID", "user": f"user{i % 100}", "value_cents": STARTING_PRICE + i,
+                        "auction_id": "auction-1"})
+        for i in range(FRAME_PARSE_FRAMES)
+    ]
+    stream = b"".join(frames)
+    chunks = [stream[i:i + FRAME_PARSE_CHUNK] for i in range(0, len(stream), FRAME_PARSE_CHUNK)]
+    
+    framer = LineFramer()
+    parsed = 0
+    started = time.perf_counter()
+    for chunk in chunks:
+        messages, _ = framer.feed(chunk)
+        parsed += len(messages)
+    elapsed = time.perf_counter() - started
+    
+    assert parsed == FRAME_PARSE_FRAMES, parsed
+    return {
+        "frames_per_s": round(parsed / elapsed),
+        "mb_per_s": round(len(stream) / elapsed / 1e6, 2)
+    }
+
+
+def bench_welcome(cached):
+    """
+    WELCOME_CALLS lần build frame WELCOME; cached=False → snapshot bị encode lại
+    mỗi lần (như khi giá vừa đổi)
+    """
+    state, hub = new_auction()
+    state.place_bid("bench", STARTING_PRICE + 100)
+    session = ClientSession(None, None, "Client-1", hub, state)
+    frame_cache = hub.frame_cache
+    
+    started = time.perf_counter()
+    for _ in range(WELCOME_CALLS):
+        if not cached:
+            frame_cache.welcome_key = None
+        frame = session.build_welcome_frame()
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "us_per_call": round(elapsed / WELCOME_CALLS * 1e6, 3),
+        "frame_bytes": len(frame)
+    }
+
+
+def build_plan(only):
+    """
+    Returns:
+        list: (tên kết quả, hàm đo) theo thứ tự chạy
+    """
+    plan = []
+    if "place_bid" in only:
+        for threads in PLACE_BID_THREADS:
+            plan.append((f"place_bid.threads_{threads}", lambda t=threads: bench_place_bid(t)))
+    if "broadcast" in only:
+        for clients in BROADCAST_CLIENTS:
+            plan.append((f"broadcast.clients_{clients}", lambda c=clients: bench_broadcast(c)))
+    if "frame_parse" in only:
+        plan.append(("frame_parse", bench_frame_parse))
+    if "welcome" in only:
+        plan.append(("welcome.cached", lambda: bench_welcome(True)))
+        plan.append(("welcome.uncached", lambda: bench_welcome(False)))
+    return plan
+
+
+def run_repeated(function, repeat):
+    """
+    Chạy 1 kịch bản `repeat` lần, lấy median của từng chỉ số
+    """
+    runs = []
+    for _ in range(repeat):
+        result = function()
+        if "skipped" in result:
+            return result
+        runs.append(result)
+    return {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+
+# ========== BASELINE ==========
+
+def collect_meta(repeat, skipped):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "skipped": skipped,
+        "scenarios": {
+            "place_bid_total": PLACE_BID_TOTAL,
+            "broadcast_count": BROADCAST_COUNT,
+            "frame_parse_frames": FRAME_PARSE_FRAMES,
+            "welcome_calls": WELCOME_CALLS,
+            "seed": SEED
+        }
+    }
+
+
+def compare(old_results, new_results, threshold):
+    """
+    In chênh lệch từng chỉ số so với baseline cũ
+    
+    Returns:
+        list: Các "tên.chỉ_số" tệ hơn quá threshold %
+    """
+    regressions = []
+    print("-" * 60)
+    print(f"So sánh với baseline (ngưỡng {threshold}%)")
+    for name, new in new_results.items():
+        old = old_results.get(name)
+        if old is None or "skipped" in old or "skipped" in new:
+            continue
+        for metric, value in new.items():
+            before = old.get(metric)
+            if not isinstance(before, (int, float)) or before == 0 or metric in INFO_METRICS:
+                continue
+            change = (value - before) / before * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            mark = "❌" if worse > threshold else "  "
+            if worse > threshold:
+                regressions.append(f"{name}.{metric}")
+            print(f"{mark} {name}.{metric}: {before} → {value} ({change:+.1f}%)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark các hot path của server")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+                        help="Chỉ chạy các kịch bản này")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Số lần chạy mỗi kịch bản (lấy median)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="File JSON kết quả")
+    parser.add_argument("--compare", default=None, help="Baseline cũ để so sánh")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Tệ hơn bao nhiêu %% thì coi là regression")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat phải >= 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    # Log của server (bid accepted, broadcast...) không được tính vào thời gian đo,
+    # chỉ bật writer để cảnh báo (client chậm, queue đầy...) vẫn hiện ra
+    log.configure(level="WARNING")
+    log.start()
+    
+    old = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+    
+    results = {}
+    skipped = {}
+    for name, function in build_plan(args.only):
+        result = run_repeated(function, args.repeat)
+        if "skipped" in result:
+            skipped[name] = result["skipped"]
+            print(f"[BENCH] {name}: bỏ qua - {result['skipped']}", flush=True)
+            continue
+        results[name] = result
+        print(f"[BENCH] {name}: " + ", ".join(f"{k}={v}" for k, v in result.items()), flush=True)
+    
+    baseline = {"meta": collect_meta(args.repeat, skipped), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"[BENCH] Đã ghi kết quả: {args.output}")
+    
+    if old is not None:
+        regressions = compare(old["results"], results, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} chỉ số tệ hơn quá {args.threshold}%")
+            return 1
+        print("✅ Không có regression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,51 @@
 import socket
 import threading
-import json
+import os
+import sys
+import time
+import math
+
+# Dùng chung module framing với server (server/message_framing.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+from message_framing import LineFramer, encode_message
+from pricing import PriceError, parse_price, format_price, to_units
 
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 9999 
 
+# Chế độ timer "deadline": client tự đếm ngược theo deadline server gửi
+# (GAME_START / TIMER_SYNC) thay vì chờ UPDATE_TIMER mỗi giây
+timer_state = {"deadline": None, "thread": None}
+
+# Phiên đấu giá đang theo dõi (server có nhiều vật phẩm → gửi CATALOG)
+# Đổi bằng lệnh "use <auction_id>" (gửi SUBSCRIBE/UNSUBSCRIBE để server chỉ
+# gửi sự kiện của phiên đang theo dõi); BID gửi kèm auction_id này
+auction_state = {"auction_id": None, "catalog": {}}
+
+
+def is_current_auction(obj):
+    # Message không có auction_id (server cũ) luôn thuộc phiên đang theo dõi
+    auction_id = obj.get("auction_id")
+    return auction_id is None or auction_state["auction_id"] in (None, auction_id)
+
 # Hàm nhận data từ server
 def listen_from_server(sock):
+    # Có thể server gửi nhiều JSON một lúc hoặc 1 JSON bị cắt làm nhiều lần recv
+    # -> LineFramer giữ lại phần chưa đủ cho lần đọc sau
+    framer = LineFramer()
+    
     while True:
         try:
-            data = sock.recv(1024).decode("utf-8")
+            data = sock.recv(4096)
             if not data:
                 print("Server đóng kết nối.")
                 break
 
-            # Có thể server gửi nhiều JSON một lúc -> tách theo newline
-            messages = data.split("\n")
-            for msg in messages:
-                if msg.strip() == "":
-                    continue
-                try:
-                    parsed = json.loads(msg)
-                    handle_server_message(parsed)
-                except json.JSONDecodeError:
-                    print("Dữ liệu lỗi:", msg)
+            messages, errors = framer.feed(data)
+            for error in errors:
+                print("Dữ liệu lỗi:", error)
+            for parsed in messages:
+                handle_server_message(parsed)
 
         except:
             print("Mất kết nối với server.")
@@ -47,20 +69,66 @@ def handle_server_message(obj):
         print("=" * 60)
         print(obj.get('message', ''))
         print()
+        auction_state["auction_id"] = obj.get("auction_id")
+    
+    elif msg_type == "CATALOG":
+        # Server có nhiều phiên đấu giá đồng thời
+        auction_state["catalog"] = {item["auction_id"]: item for item in obj.get("auctions", [])}
+        print_catalog()
+    
+    elif msg_type == "SUBSCRIBED":
+        # Đã vào phòng của 1 phiên - server gửi kèm trạng thái hiện tại
+        auction_id = obj.get("auction_id")
+        auction_state["catalog"].setdefault(auction_id, {}).update(obj)
+        print(f"\n[PHIEN] Dang theo doi {auction_id}: {obj.get('item_name', 'N/A')}")
+        print(f"   Gia hien tai: ${obj.get('current_price', 0)} - "
+              f"Nguoi dan dau: {obj.get('current_winner') or 'Chua co'}")
+    
+    elif msg_type == "UNSUBSCRIBED":
+        pass
+    
+    elif msg_type == "HISTORY":
+        # Lịch sử bid (dạng cột) của 1 phiên
+        users = obj.get("users", [])
+        values = obj.get("values", [])
+        times = obj.get("timestamps_ms", [])
+        print(f"\n[LICH SU] {obj.get('auction_id')}: {len(values)}/{obj.get('total', 0)} bid gan nhat")
+        for user, value, timestamp in zip(users, values, times):
+            clock = time.strftime("%H:%M:%S", time.localtime(timestamp / 1000))
+            print(f"   {clock}  {user:<15} ${value}")
     
     elif msg_type == "NEW_PRICE":
         # Có người đặt giá mới
         user = obj.get('user', 'Unknown')
         value = obj.get('value', 0)
-        print(f"\n[UPDATE] {user} dang dan dau voi gia ${value}")
+        auction_id = obj.get('auction_id')
+        if auction_id in auction_state["catalog"]:
+            auction_state["catalog"][auction_id]["current_price"] = value
+        prefix = f"[{auction_id}] " if auction_id and not is_current_auction(obj) else ""
+        print(f"\n[UPDATE] {prefix}{user} dang dan dau voi gia ${value}")
         print(f"   {obj.get('message', '')}")
+        # Soft-close: bid cuối phiên dời deadline (deadline mới đi kèm NEW_PRICE)
+        if "extended_by" in obj and is_current_auction(obj):
+            if timer_state["deadline"] is not None:
+                start_local_countdown(obj.get('remaining', 0))
+            else:
+                print_timer(math.ceil(obj.get('remaining', 0)))
     
     elif msg_type == "UPDATE_TIMER":
-        # Cập nhật thời gian còn lại
-        remaining = obj.get('remaining', 0)
-        minutes = remaining // 60
-        seconds = remaining % 60
-        print(f"\r[TIMER] Thoi gian con lai: {minutes:02d}:{seconds:02d}", end='', flush=True)
+        # Cập nhật thời gian còn lại (chỉ của phiên đang theo dõi)
+        if is_current_auction(obj):
+            print_timer(obj.get('remaining', 0))
+    
+    elif msg_type == "GAME_START":
+        print(f"\n[GAME] {obj.get('message', '')}")
+        # Chế độ deadline: GAME_START kèm remaining để tự đếm ngược
+        if "remaining" in obj and is_current_auction(obj):
+            start_local_countdown(obj["remaining"])
+    
+    elif msg_type == "TIMER_SYNC":
+        # Đồng bộ lại deadline (định kỳ hoặc khi deadline thay đổi)
+        if is_current_auction(obj):
+            start_local_countdown(obj.get('remaining', 0))
     
     elif msg_type == "WARNING":
         # Cảnh báo còn ít thời gian
@@ -69,8 +137,10 @@ def handle_server_message(obj):
     
     elif msg_type == "WINNER":
         # Thông báo người thắng
+        if is_current_auction(obj):
+            stop_local_countdown()
         print("\n\n" + "=" * 60)
-        print("PHIEN DAU GIA KET THUC!")
+        print(f"PHIEN DAU GIA KET THUC! {obj.get('item_name', '')}")
         print("=" * 60)
         print(f"Nguoi thang: {obj.get('user', 'N/A')}")
         print(f"Gia thang: ${obj.get('value', 0)}")
@@ -79,24 +149,80 @@ def handle_server_message(obj):
     
     elif msg_type == "NO_WINNER":
         # Không có người thắng
+        if is_current_auction(obj):
+            stop_local_countdown()
         print("\n\n" + "=" * 60)
-        print("PHIEN DAU GIA KET THUC - KHONG CO NGUOI THANG")
+        print(f"PHIEN DAU GIA KET THUC - KHONG CO NGUOI THANG {obj.get('item_name', '')}")
         print("=" * 60)
         print(f"{obj.get('message', '')}")
         print("=" * 60)
     
+    elif msg_type == "BID_ACCEPTED":
+        # Bid của mình đã được server nhận (giá mới đến qua NEW_PRICE)
+        print(f"\n[OK] {obj.get('message', '')}")
+    
+    elif msg_type == "PROXY_ACCEPTED":
+        # Giá tối đa ẩn đã được ghi nhận - server tự trả giá tới mức này
+        print(f"\n[AUTO] Gia toi da ${obj.get('max_value')} da duoc ghi nhan - "
+              f"{obj.get('message', '')}")
+    
     elif msg_type == "ERROR":
         # Lỗi từ server (VD: bid quá thấp)
         print(f"\n[LOI] {obj.get('message', 'Unknown error')}")
     
     elif msg_type == "SHUTDOWN":
         # Server đang shutdown
+        stop_local_countdown()
         print(f"\n\n[SHUTDOWN] {obj.get('message', 'Server dang dong')}")
     
     else:
         print("\n[UNKNOWN] Server gui:", obj)
 
 
+def print_catalog():
+    print("\n" + "=" * 60)
+    print("DANH MUC PHIEN DAU GIA")
+    print("=" * 60)
+    for auction_id, item in auction_state["catalog"].items():
+        marker = "*" if auction_id == auction_state["auction_id"] else " "
+        print(f" {marker} {auction_id}: {item.get('item_name', 'N/A')} "
+              f"- gia hien tai ${item.get('current_price', 0)}")
+    print("  (go 'use <auction_id>' de chon phien dat gia)")
+    print("=" * 60)
+
+
+def print_timer(remaining):
+    minutes = int(remaining) // 60
+    seconds = int(remaining) % 60
+    print(f"\r[TIMER] Thoi gian con lai: {minutes:02d}:{seconds:02d}", end='', flush=True)
+
+
+def start_local_countdown(remaining):
+    # Deadline cục bộ = đồng hồ monotonic của client + thời gian còn lại
+    timer_state["deadline"] = time.monotonic() + remaining
+    
+    if timer_state["thread"] is None:
+        timer_state["thread"] = threading.Thread(target=local_countdown_loop, daemon=True)
+        timer_state["thread"].start()
+
+
+def stop_local_countdown():
+    timer_state["deadline"] = None
+
+
+def local_countdown_loop():
+    # Chỉ in lại khi số giây thay đổi
+    last_shown = None
+    while True:
+        deadline = timer_state["deadline"]
+        if deadline is not None:
+            remaining = max(0, math.ceil(deadline - time.monotonic()))
+            if remaining != last_shown:
+                print_timer(remaining)
+                last_shown = remaining
+        time.sleep(0.2)
+
+
 def main():
     print("=" * 60)
     print("SIMPLE AUCTION GAME - CLIENT")
@@ -122,7 +248,6 @@ def main():
     threading.Thread(target=listen_from_server, args=(sock,), daemon=True).start()
 
     # Đợi 1 giây để nhận WELCOME message
-    import time
     time.sleep(1)
 
     # Hiển thị hướng dẫn
@@ -130,6 +255,10 @@ def main():
     print("HUONG DAN SU DUNG")
     print("=" * 60)
     print("  <so tien>  - Dat gia (VD: 1500)")
+    print("  auto <max> - Dat gia tu dong toi da <max> (server tu tra gia)")
+    print("  use <id>   - Chon phien dau gia (khi co nhieu vat pham)")
+    print("  list       - Xem danh muc phien dau gia")
+    print("  history    - Xem lich su dat gia")
     print("  info       - Xem huong dan")
     print("  exit       - Thoat")
     print("=" * 60)
@@ -150,42 +279,88 @@ def main():
                 print("HUONG DAN SU DUNG")
                 print("=" * 60)
                 print("  <so tien>  - Dat gia (VD: 1500)")
+                print("  auto <max> - Dat gia tu dong toi da <max> (server tu tra gia)")
+                print("  use <id>   - Chon phien dau gia (khi co nhieu vat pham)")
+                print("  list       - Xem danh muc phien dau gia")
+                print("  history    - Xem lich su dat gia")
                 print("  info       - Xem huong dan")
                 print("  exit       - Thoat")
                 continue
+            
+            # Xem danh mục phiên đấu giá
+            elif user_input.lower() == "list":
+                print_catalog()
+                continue
+            
+            # Xem lịch sử đặt giá của phiên đang theo dõi
+            elif user_input.lower() == "history":
+                request = {"type": "GET_HISTORY", "limit": 20}
+                if auction_state["auction_id"] is not None:
+                    request["auction_id"] = auction_state["auction_id"]
+                sock.sendall(encode_message(request))
+                continue
+            
+            # Đấu giá tự động: gửi giá tối đa ẩn, server trả giá thay mình
+            elif user_input.lower().startswith("auto "):
+                try:
+                    ceiling = parse_price(user_input[5:])
+                except PriceError:
+                    print("[LOI] Vui long nhap gia toi da hop le (VD: auto 2000)")
+                    continue
+                request = {
+                    "type": "PROXY_BID",
+                    "user": client_name,
+                    "max_value": to_units(ceiling),
+                    "max_value_cents": ceiling
+                }
+                if auction_state["auction_id"] is not None:
+                    request["auction_id"] = auction_state["auction_id"]
+                sock.sendall(encode_message(request))
+                print(f"[SEND] Da gui gia toi da: ${format_price(ceiling)}")
+                continue
+            
+            # Chọn phiên đấu giá
+            elif user_input.lower().startswith("use "):
+                auction_id = user_input[4:].strip()
+                if auction_state["catalog"] and auction_id not in auction_state["catalog"]:
+                    print(f"[LOI] Khong co phien {auction_id} - go 'list' de xem danh muc")
+                elif auction_id != auction_state["auction_id"]:
+                    # Rời phòng cũ, vào phòng mới
+                    if auction_state["auction_id"] is not None:
+                        sock.sendall(encode_message({"type": "UNSUBSCRIBE",
+                                                     "auction_id": auction_state["auction_id"]}))
+                    auction_state["auction_id"] = auction_id
+                    stop_local_countdown()
+                    sock.sendall(encode_message({"type": "SUBSCRIBE", "auction_id": auction_id}))
+                    print(f"Da chon phien {auction_id}")
+                continue
 
             # Nhập số trực tiếp với validation
             try:
-                # Chuyển đổi sang số
-                price = float(user_input)
+                # Chuyển đổi sang cents (không qua float: "1500.1" → 150010)
+                # Giá tối đa / bước giá do server kiểm tra (trả về ERROR)
+                price = parse_price(user_input)
                 
                 # Validation: Kiểm tra giá trị hợp lệ
                 if price <= 0:
                     print("[LOI] Gia phai lon hon 0!")
                     continue
                 
-                # Giới hạn giá tối đa (tránh số quá lớn như 1e+27)
-                if price > 999999999:  # Tối đa 999 triệu
-                    print("[LOI] Gia qua lon! Vui long nhap gia hop ly (toi da 999,999,999)")
-                    continue
-                
-                # Kiểm tra số thập phân hợp lý (không quá nhiều chữ số)
-                if len(user_input.replace('.', '').replace('-', '')) > 12:
-                    print("[LOI] Gia khong hop le! Vui long nhap so binh thuong (VD: 1500)")
-                    continue
-                
-                # Gửi bid
+                # Gửi bid (value để hiển thị, value_cents là giá chính xác)
                 bid_packet = {
                     "type": "BID",
                     "user": client_name,
-                    "value": price
+                    "value": to_units(price),
+                    "value_cents": price
                 }
-                sock.send((json.dumps(bid_packet) + "\n").encode())
+                if auction_state["auction_id"] is not None:
+                    bid_packet["auction_id"] = auction_state["auction_id"]
+                sock.sendall(encode_message(bid_packet))
                 
                 # Hiển thị giá với format đẹp (có dấu phẩy)
-                print(f"[SEND] Da gui bid: ${price:,.0f}")
+                print(f"[SEND] Da gui bid: ${format_price(price)}")
                 
-            except ValueError:
+            except PriceError:
                   # Không phải số hợp lệ
                 print("[LOI] Vui long nhap so tien hop le (VD: 1500 hoac 1500.5)")
                 print("      Hoac go 'info' de xem huong dan")
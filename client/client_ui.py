@@ -3,8 +3,15 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, simpledialog
 import threading
 import socket
-import json
 import sys
+import os
+import time
+import math
+
+# Dùng chung module framing với server (server/message_framing.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+from message_framing import LineFramer, encode_message
+from pricing import PriceError, parse_price, format_price, to_units
 
 
 class AuctionClientGUI:
@@ -33,16 +40,25 @@ class AuctionClientGUI:
         
         # Auction state (từ server)
         self.current_price = 0
+        self.current_price_cents = 0  # Giá chính xác (cents) để tính quick bid
         self.current_winner = "Chưa có"
+        self.price_version = 0  # Version snapshot của giá đang hiển thị
         self.connection_status = "Disconnected"
         self.remaining_time = 0  # Thời gian còn lại từ server
         self.is_warning_mode = False  # Flag để blink timer khi warning
         
+        # Chế độ timer "deadline": tự đếm ngược theo deadline cục bộ
+        self.local_deadline = None
+        self.local_countdown_running = False
+        
         # Thông tin vật phẩm đấu giá
         self.item_name = "Đang chờ..."
         self.item_description = ""
         self.starting_price = 0
         
+        # Phiên đấu giá đang theo dõi (server nhiều vật phẩm gửi kèm auction_id)
+        self.auction_id = None
+        
         # Colors
         self.color_bg = "#f0f0f0"
         self.color_header = "#2c3e50"
@@ -561,7 +577,7 @@ class AuctionClientGUI:
         """
         Thread nhận messages từ server
         """
-        buffer = ""
+        framer = LineFramer()
         
         while self.is_running:
             try:
@@ -573,17 +589,12 @@ class AuctionClientGUI:
                     self.root.after(0, lambda: self.update_connection_status(False))
                     break
                 
-                buffer += data.decode('utf-8')
-                
-                # Process line-delimited JSON messages
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    if line:
-                        try:
-                            message = json.loads(line)
-                            self.root.after(0, lambda msg=message: self.handle_message(msg))
-                        except json.JSONDecodeError as e:
-                            self.root.after(0, lambda: self.add_log(f"❌ JSON Error: {e}", "error"))
+                # Tách mọi JSON message hoàn chỉnh, giữ lại phần chưa đủ
+                messages, errors = framer.feed(data)
+                for message in messages:
+                    self.root.after(0, lambda msg=message: self.handle_message(msg))
+                for error in errors:
+                    self.root.after(0, lambda err=error: self.add_log(f"❌ JSON Error: {err}", "error"))
             
             except Exception as e:
                 if self.is_running:
@@ -601,9 +612,19 @@ class AuctionClientGUI:
         """
         msg_type = message.get("type")
         
+        # Sự kiện của phiên khác trong catalog: chỉ ghi log
+        if not self.is_current_auction(message) and msg_type in (
+                "NEW_PRICE", "UPDATE_TIMER", "TIMER_SYNC", "WARNING", "WINNER", "NO_WINNER"):
+            if msg_type in ("NEW_PRICE", "WINNER", "NO_WINNER"):
+                self.add_log(f"🗂️ [{message.get('auction_id')}] {message.get('message', '')}", "info")
+            return
+        
         if msg_type == "WELCOME":
+            self.auction_id = message.get("auction_id")
             self.current_price = message.get("current_price", 0)
+            self.current_price_cents = self.read_cents(message, "current_price_cents", "current_price")
             self.current_winner = message.get("current_winner", "Chưa có")
+            self.price_version = message.get("version", 0)
             
             # Nhận thông tin vật phẩm đấu giá
             self.item_name = message.get("item_name", "Sản phẩm bí mật")
@@ -621,8 +642,33 @@ class AuctionClientGUI:
             self.add_log(f"💰 Giá hiện tại: ${self.current_price}", "info")
             self.add_log(f"⏸️  Đợi admin bắt đầu game...", "warning")
         
+        elif msg_type == "SUBSCRIBED":
+            self.add_log(
+                f"🗂️ Đang theo dõi {message.get('auction_id')}: {message.get('item_name')}",
+                "info"
+            )
+        
+        elif msg_type == "UNSUBSCRIBED":
+            pass
+        
+        elif msg_type == "CATALOG":
+            # Server có nhiều phiên đấu giá đồng thời
+            self.add_log("🗂️ Danh mục phiên đấu giá:", "info")
+            for item in message.get("auctions", []):
+                self.add_log(
+                    f"   {item.get('auction_id')}: {item.get('item_name')} - ${item.get('current_price')}",
+                    "info"
+                )
+        
         elif msg_type == "NEW_PRICE":
+            # NEW_PRICE cũ hơn giá đang hiển thị (VD: gửi trước WELCOME) → bỏ qua
+            version = message.get("version")
+            if version is not None and version < self.price_version:
+                return
+            if version is not None:
+                self.price_version = version
             self.current_price = message.get("value", 0)
+            self.current_price_cents = self.read_cents(message, "value_cents", "value")
             self.current_winner = message.get("user", "Unknown")
             self.update_status_panel()
             self.add_log(
@@ -630,6 +676,25 @@ class AuctionClientGUI:
                 "new_price"
             )
             self.clear_error()
+            
+            # Soft-close: bid cuối phiên dời deadline (deadline mới đi kèm NEW_PRICE)
+            if "extended_by" in message:
+                remaining = message.get("remaining", 0)
+                self.add_log(f"⏳ Gia hạn thêm {message['extended_by']} giây", "warning")
+                self.is_warning_mode = False
+                if self.local_deadline is not None:
+                    self.start_local_countdown(remaining)
+                else:
+                    self.remaining_time = math.ceil(remaining)
+                    self.update_timer_display()
+        
+        elif msg_type == "BID_ACCEPTED":
+            # Bid của mình đã được server nhận (giá mới đến qua NEW_PRICE)
+            self.add_log(f"✅ {message.get('message', '')}", "info")
+        
+        elif msg_type == "PROXY_ACCEPTED":
+            # Giá tối đa ẩn (đấu giá tự động) đã được server ghi nhận
+            self.add_log(f"🤖 Giá tối đa ${message.get('max_value')}: {message.get('message', '')}", "info")
         
         elif msg_type == "ERROR":
             error_msg = message.get("message", "Unknown error")
@@ -643,6 +708,7 @@ class AuctionClientGUI:
             # Tắt chế độ warning (dừng blink)
             self.is_warning_mode = False
             self.remaining_time = 0
+            self.local_deadline = None
             # Hiển thị kết quả
             self.add_log(f"\n{'='*50}", "winner")
             self.add_log(f"🎉 WINNER: {winner} - ${value}", "winner")
@@ -659,9 +725,16 @@ class AuctionClientGUI:
             self.add_log(f"🚀 {start_msg}", "winner")
             self.add_log(f"⏰ Thời gian: {duration} giây", "info")
             self.add_log(f"{'='*50}\n", "winner")
+            # Chế độ deadline: GAME_START kèm remaining để tự đếm ngược
+            if "remaining" in message:
+                self.start_local_countdown(message["remaining"])
             # Hiển thị popup
             messagebox.showinfo("🎮 Game Bắt Đầu!", f"{start_msg}\nThời gian: {duration}s")
         
+        elif msg_type == "TIMER_SYNC":
+            # Server đồng bộ lại deadline (định kỳ hoặc khi deadline thay đổi)
+            self.start_local_countdown(message.get("remaining", 0))
+        
         elif msg_type == "UPDATE_TIMER":
             # Nhận cập nhật thời gian từ server mỗi giây
             remaining = message.get("remaining", 0)
@@ -681,11 +754,13 @@ class AuctionClientGUI:
             # Tắt chế độ warning
             self.is_warning_mode = False
             self.remaining_time = 0
+            self.local_deadline = None
             self.add_log(f"❌ {message.get('message')}", "error")
             self.timer_label.config(text="❌ Không có winner", fg="#e74c3c")
             messagebox.showinfo("Kết Thúc", message.get('message'))
         
         elif msg_type == "SHUTDOWN":
+            self.local_deadline = None
             self.add_log(f"🛑 {message.get('message')}", "error")
             self.is_running = False
             self.update_connection_status(False)
@@ -693,6 +768,27 @@ class AuctionClientGUI:
         else:
             self.add_log(f"📩 {message}", "info")
     
+    def is_current_auction(self, message):
+        """
+        Message có thuộc phiên đang theo dõi không
+        (message không kèm auction_id luôn được coi là của phiên hiện tại)
+        """
+        auction_id = message.get("auction_id")
+        return auction_id is None or self.auction_id in (None, auction_id)
+    
+    def read_cents(self, message, cents_key, units_key):
+        """
+        Lấy giá chính xác (cents) từ message
+        (server cũ không gửi trường *_cents → parse từ giá theo đơn vị)
+        """
+        cents = message.get(cents_key)
+        if isinstance(cents, int):
+            return cents
+        try:
+            return parse_price(message.get(units_key, 0))
+        except PriceError:
+            return 0
+    
     # ========== SEND BID ==========
     
     def send_bid(self):
@@ -709,27 +805,30 @@ class AuctionClientGUI:
             self.show_error("Vui lòng nhập giá!")
             return
         
+        # Parse thẳng sang cents (không qua float); giá tối đa do server kiểm tra
         try:
-            bid_value = float(bid_value_str)
-        except ValueError:
-            self.show_error("Giá phải là số!")
+            bid_value = parse_price(bid_value_str)
+        except PriceError:
+            self.show_error("Giá phải là số (tối đa 2 chữ số thập phân)!")
             return
         
         if bid_value <= 0:
             self.show_error("Giá phải lớn hơn 0!")
             return
         
-        # Send BID message
+        # Send BID message (value để hiển thị, value_cents là giá chính xác)
         bid_msg = {
             "type": "BID",
             "user": self.username,
-            "value": bid_value
+            "value": to_units(bid_value),
+            "value_cents": bid_value
         }
+        if self.auction_id is not None:
+            bid_msg["auction_id"] = self.auction_id
         
         try:
-            message_json = json.dumps(bid_msg) + "\n"
-            self.socket.sendall(message_json.encode('utf-8'))
-            self.add_log(f"📤 Đã gửi bid: ${bid_value}", "info")
+            self.socket.sendall(encode_message(bid_msg))
+            self.add_log(f"📤 Đã gửi bid: ${format_price(bid_value)}", "info")
             self.bid_entry.delete(0, tk.END)
         except Exception as e:
             self.show_error(f"Lỗi gửi bid: {e}")
@@ -741,9 +840,9 @@ class AuctionClientGUI:
         Args:
             increment: Số tiền tăng thêm
         """
-        new_bid = self.current_price + increment
+        new_bid = self.current_price_cents + parse_price(increment)
         self.bid_entry.delete(0, tk.END)
-        self.bid_entry.insert(0, str(new_bid))
+        self.bid_entry.insert(0, format_price(new_bid))
         self.send_bid()
     
     # ========== UI UPDATE HELPERS ==========
@@ -771,10 +870,40 @@ class AuctionClientGUI:
         else:
             self.item_desc_label.config(text="")
     
+    def start_local_countdown(self, remaining):
+        """
+        Đặt deadline cục bộ và bắt đầu tự đếm ngược (chế độ deadline)
+        
+        Args:
+            remaining: Số giây còn lại theo server (có thể là số thực)
+        """
+        self.local_deadline = time.monotonic() + remaining
+        
+        if not self.local_countdown_running:
+            self.local_countdown_running = True
+            self.tick_local_countdown()
+    
+    def tick_local_countdown(self):
+        """
+        1 nhịp đếm ngược cục bộ - tự lặp lại mỗi 200ms cho đến khi hết giờ
+        """
+        if self.local_deadline is None:
+            self.local_countdown_running = False
+            return
+        
+        self.remaining_time = max(0, math.ceil(self.local_deadline - time.monotonic()))
+        self.update_timer_display()
+        
+        if self.remaining_time == 0:
+            self.local_countdown_running = False
+            return
+        
+        self.root.after(200, self.tick_local_countdown)
+    
     def update_timer_display(self):
         """
         Cập nhật hiển thị timer với format MM:SS
-        Được gọi khi nhận UPDATE_TIMER từ server
+        Được gọi khi nhận UPDATE_TIMER từ server hoặc mỗi nhịp đếm ngược cục bộ
         """
         if self.remaining_time > 0:
             minutes = self.remaining_time // 60
@@ -0,0 +1,694 @@
+"""
+Load Test - Bộ tạo tải headless cho server đấu giá (thay test_race_condition.py)
+
+Nhiệm vụ chính:
+1. Giả lập hàng nghìn người đặt giá (asyncio, chia ra nhiều process nếu cần)
+2. Phát BID theo 1 trong 3 kịch bản:
+   - steady: mỗi người bid đều với rate BID / giây
+   - burst:  như steady, nhưng WINDOW giây cuối rate tăng BURST_FACTOR lần
+   - sniper: SNIPERS (tỉ lệ) người im lặng đến WINDOW giây cuối rồi bid dồn dập
+3. Báo cáo throughput BID được chấp nhận / bị từ chối và độ trễ p50/p99/p999
+   từ lúc gửi BID đến lúc chính người đó nhận NEW_PRICE của bid mình
+4. Kiểm tra bất biến khi kết thúc:
+   - Giá cuối = bid được chấp nhận cao nhất (theo BID_ACCEPTED server trả riêng
+     cho từng bid) và người dẫn đầu = người đặt bid đó
+   - Không mất cập nhật: BID gửi = chấp nhận + từ chối, và số BID_ACCEPTED
+     = số bid chấp nhận trong lịch sử server
+   - Mọi người chơi đều nhận được NEW_PRICE cuối cùng (giá cuối)
+
+Đo lường:
+- BID được gửi theo lịch cố định (open-loop, khoảng cách theo phân phối mũ),
+  không đợi kết quả bid trước → server chậm thì độ trễ tăng chứ không bị che
+- Server gộp NEW_PRICE cũ trong outbox (chỉ gửi giá mới nhất), nên bid đã
+  được chấp nhận nhưng bị vượt ngay có thể không có NEW_PRICE riêng:
+  bid chấp nhận được biết qua BID_ACCEPTED (không bao giờ bị gộp) và đối
+  chiếu với lịch sử server (GET_HISTORY), độ trễ chỉ đo trên các NEW_PRICE
+  thực sự đến tay người đặt
+- 1 kết nối điều khiển riêng (không bid) đọc WELCOME + GET_HISTORY trước và
+  sau khi chạy; nếu phiên kết thúc và server tự dừng, giá cuối lấy từ WINNER
+
+Yêu cầu:
+- Server đang chạy, load test là nguồn bid duy nhất trong lúc đo
+- Mỗi người chơi dùng tên riêng (loadNNNNN); rate limit của server vẫn áp dụng
+  (BID bị chặn được đếm riêng là RATE_LIMITED)
+
+Cách dùng:
+    python load_test.py --bidders 1000 --duration 30
+    python load_test.py --bidders 5000 --processes 4 --profile burst --json result.json
+    python load_test.py --bidders 2000 --profile sniper --snipers 0.2 --window 5
+
+Exit code: 0 nếu mọi bất biến đúng, 1 nếu có bất biến sai
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server"))
+from message_framing import LineFramer, encode_message
+from pricing import format_price, parse_price
+
+HOST = "localhost"
+PORT = 9999
+
+PROFILES = ("steady", "burst", "sniper")
+
+DEFAULT_BIDDERS = 200
+DEFAULT_DURATION = 20.0
+DEFAULT_RATE = 1.0              # BID / giây / người chơi
+DEFAULT_BURST_FACTOR = 8.0
+DEFAULT_WINDOW = 3.0            # Giây cuối của burst / sniper
+DEFAULT_SNIPERS = 0.1
+DEFAULT_SETTLE = 1.0            # Hết bid: dừng khi không còn kết quả nào đến trong SETTLE giây
+MAX_SETTLE = 60.0               # ... nhưng đợi tối đa MAX_SETTLE giây
+
+# Server chế độ thread chỉ listen(5): mở quá nhiều kết nối cùng lúc làm SYN bị
+# bỏ (client đợi 1s/3s/7s mới gửi lại) → kết nối dần, thử lại khi quá hạn
+DEFAULT_CONNECT_CONCURRENCY = 5
+CONNECT_ATTEMPTS = 3
+CONNECT_TIMEOUT = 5.0
+
+# Số bước giá mỗi BID vượt lên so với giá đang thấy (ngẫu nhiên trong khoảng)
+MAX_STEPS = 3
+
+
+class Bidder:
+    """
+    1 người chơi giả lập (1 kết nối TCP)
+    
+    Attributes:
+        user (str): Tên người chơi
+        is_sniper (bool): Chỉ bid trong WINDOW giây cuối (kịch bản sniper)
+        price (int): Giá mới nhất đã thấy (cents)
+        version (int): Version của giá mới nhất đã thấy
+        pending (dict): {value: thời điểm gửi} - BID chưa thấy NEW_PRICE của chính mình
+        latencies (list): Độ trễ BID → NEW_PRICE (ms)
+    """
+    
+    def __init__(self, user, is_sniper, rng):
+        self.user = user
+        self.is_sniper = is_sniper
+        self.rng = rng
+        
+        self.reader = None
+        self.writer = None
+        self.connected = False
+        self.closed = False
+        
+        self.auction_id = None
+        self.price = 0
+        self.min_increment = 1
+        self.version = 0
+        self.last_bid = 0
+        
+        self.pending = {}
+        self.latencies = []
+        self.sent = 0
+        self.rejected = 0
+        self.rate_limited = 0
+        self.delivered = 0
+        self.acknowledged = 0           # Số BID_ACCEPTED đã nhận
+        self.max_accepted = None        # (value, user) cao nhất mà server trả BID_ACCEPTED
+        self.out_of_order = 0
+        self.winner = None
+        self.last_result = 0.0          # time.monotonic() lần cuối nhận kết quả bid / NEW_PRICE
+    
+    async def connect(self, host, port, semaphore, auction_id):
+        """
+        Kết nối + đợi WELCOME (lấy giá, bước giá, version hiện tại)
+        
+        Returns:
+            bool: True nếu đã nhận WELCOME
+        """
+        async with semaphore:
+            for _ in range(CONNECT_ATTEMPTS):
+                framer = LineFramer()
+                try:
+                    self.reader, self.writer = await asyncio.wait_for(
+                        asyncio.open_connection(host, port), CONNECT_TIMEOUT
+                    )
+                    while not self.connected:
+                        data = await asyncio.wait_for(self.reader.read(65536), CONNECT_TIMEOUT)
+                        if not data:
+                            break
+                        messages, _ = framer.feed(data)
+                        for message in messages:
+                            if message.get("type") == "WELCOME":
+                                self.on_welcome(message)
+                            else:
+                                self.on_message(message, time.monotonic())
+                except (OSError, asyncio.TimeoutError):
+                    pass
+                if self.connected:
+                    break
+                self.close()
+            else:
+                return False
+        
+        if auction_id is not None and auction_id != self.auction_id:
+            # Phiên khác phiên mặc định: vào phòng của phiên đó để nhận NEW_PRICE
+            self.auction_id = auction_id
+            self.send({"type": "SUBSCRIBE", "auction_id": auction_id})
+        
+        self.framer = framer
+        return True
+    
+    def on_welcome(self, message):
+        self.connected = True
+        self.auction_id = message.get("auction_id")
+        self.price = message.get("current_price_cents", 0)
+        self.version = message.get("version", 0)
+        self.min_increment = max(1, parse_price(message.get("min_increment", 0)))
+    
+    def on_message(self, message, now):
+        msg_type = message.get("type")
+        
+        if msg_type in ("NEW_PRICE", "BID_ACCEPTED", "ERROR"):
+            self.last_result = now
+        
+        if msg_type == "NEW_PRICE":
+            if message.get("auction_id", self.auction_id) != self.auction_id:
+                return
+            version = message.get("version", 0)
+            value = message.get("value_cents")
+            if version < self.version:
+                # Các thread broadcast song song có thể gửi lệch thứ tự
+                self.out_of_order += 1
+                return
+            self.version = version
+            self.price = value
+            
+            if message.get("user") == self.user:
+                sent_at = self.pending.pop(value, None)
+                if sent_at is not None:
+                    self.latencies.append((now - sent_at) * 1000.0)
+                    self.delivered += 1
+        
+        elif msg_type == "BID_ACCEPTED":
+            # Kết quả riêng của bid mình (NEW_PRICE của nó có thể đã bị gộp)
+            value = message.get("value_cents")
+            self.acknowledged += 1
+            if self.max_accepted is None or value > self.max_accepted[0]:
+                self.max_accepted = (value, self.user)
+        
+        elif msg_type == "SUBSCRIBED":
+            self.price = message.get("current_price_cents", self.price)
+            self.version = message.get("version", self.version)
+        
+        elif msg_type == "ERROR":
+            self.rejected += 1
+            if message.get("code") == "RATE_LIMITED":
+                self.rate_limited += 1
+        
+        elif msg_type == "WINNER":
+            self.winner = (message.get("value_cents"), message.get("user"))
+        
+        elif msg_type == "SHUTDOWN":
+            self.closed = True
+    
+    async def read_loop(self):
+        """
+        Đọc mọi frame từ server cho đến khi kết nối đóng
+        """
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                now = time.monotonic()
+                messages, _ = self.framer.feed(data)
+                for message in messages:
+                    self.on_message(message, now)
+        except (OSError, asyncio.CancelledError):
+            pass
+        self.closed = True
+    
+    def send(self, message):
+        try:
+            self.writer.write(encode_message(message))
+        except (OSError, RuntimeError):
+            self.closed = True
+    
+    def send_bid(self):
+        
+        # Giá = max(giá đang thấy, bid trước của mình) + 1..MAX_STEPS bước giá
+        # (không bao giờ bid lại cùng 1 giá → ghép được NEW_PRICE với BID)
+        value = max(self.price, self.last_bid) + self.min_increment * self.rng.randint(1, MAX_STEPS)
+        self.last_bid = value
+        self.pending[value] = time.monotonic()
+        self.sent += 1
+        self.send({"type": "BID", "user": self.user, "value_cents": value,
+                   "auction_id": self.auction_id})
+    
+    def close(self):
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except (OSError, RuntimeError):
+                pass
+
+
+def bid_rate(options, bidder, remaining):
+    """
+    Rate BID (BID / giây) của 1 người chơi theo kịch bản, khi còn remaining giây
+    
+    Returns:
+        float: 0 nếu người chơi chưa bid lúc này
+    """
+    in_window = remaining <= options["window"]
+    profile = options["profile"]
+    
+    if profile == "burst" and in_window:
+        return options["rate"] * options["burst_factor"]
+    if profile == "sniper" and bidder.is_sniper:
+        return options["rate"] * options["burst_factor"] if in_window else 0.0
+    return options["rate"]
+
+
+async def bid_loop(options, bidder, end_at):
+    """
+    Gửi BID theo lịch open-loop đến end_at
+    """
+    while not bidder.closed:
+        now = time.time()
+        if now >= end_at:
+            return
+        
+        rate = bid_rate(options, bidder, end_at - now)
+        if rate <= 0:
+            # Sniper: ngủ đến đầu cửa sổ cuối
+            await asyncio.sleep(max(0.0, end_at - options["window"] - now))
+            continue
+        
+        await asyncio.sleep(bidder.rng.expovariate(rate))
+        if time.time() < end_at and not bidder.closed:
+            bidder.send_bid()
+            await bidder.writer.drain()
+
+
+async def run_bidders(options, first, count, barrier=None):
+    """
+    Chạy count người chơi (loadNNNNN từ first) trong 1 event loop
+    
+    Args:
+        barrier (multiprocessing.Barrier, optional): Đợi mọi process kết nối
+            xong rồi mới cùng bắt đầu bid
+    
+    Returns:
+        dict: Thống kê gộp của các người chơi (xem merge_stats)
+    """
+    semaphore = asyncio.Semaphore(options["connect_concurrency"])
+    sniper_every = round(1 / options["snipers"]) if options["snipers"] > 0 else 0
+    
+    bidders = []
+    for index in range(first, first + count):
+        rng = random.Random(options["seed"] * 1_000_003 + index)
+        is_sniper = sniper_every > 0 and index % sniper_every == 0
+        bidders.append(Bidder(f"load{index:05d}", is_sniper, rng))
+    
+    connect_started = time.monotonic()
+    results = await asyncio.gather(*[
+        bidder.connect(options["host"], options["port"], semaphore, options["auction_id"])
+        for bidder in bidders
+    ])
+    connected = [bidder for bidder, ok in zip(bidders, results) if ok]
+    connect_time = time.monotonic() - connect_started
+    
+    readers = [asyncio.ensure_future(bidder.read_loop()) for bidder in connected]
+    if barrier is not None:
+        await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+    
+    end_at = time.time() + options["duration"]
+    await asyncio.gather(*[bid_loop(options, bidder, end_at) for bidder in connected],
+                         return_exceptions=True)
+    
+    # Đợi kết quả của các BID cuối (server đang quá tải có thể trả chậm vài giây):
+    # dừng khi không người chơi nào nhận NEW_PRICE / ERROR trong settle giây
+    settle_until = time.monotonic() + MAX_SETTLE
+    while time.monotonic() < settle_until:
+        await asyncio.sleep(0.1)
+        last_result = max((bidder.last_result for bidder in connected), default=0.0)
+        if time.monotonic() - last_result >= options["settle"]:
+            break
+    for bidder in connected:
+        bidder.close()
+    for reader in readers:
+        reader.cancel()
+    await asyncio.gather(*readers, return_exceptions=True)
+    
+    stats = collect_stats(connected)
+    stats["connect_failed"] = len(bidders) - len(connected)
+    stats["connect_s"] = connect_time
+    return stats
+
+
+def collect_stats(bidders):
+    stats = {
+        "connected": len(bidders),
+        "sent": 0, "rejected": 0, "rate_limited": 0, "delivered": 0, "out_of_order": 0,
+        "acknowledged": 0, "latencies": [], "max_accepted": None, "winner": None,
+        "final_prices": [], "snipers": 0
+    }
+    for bidder in bidders:
+        stats["sent"] += bidder.sent
+        stats["rejected"] += bidder.rejected
+        stats["rate_limited"] += bidder.rate_limited
+        stats["delivered"] += bidder.delivered
+        stats["acknowledged"] += bidder.acknowledged
+        stats["out_of_order"] += bidder.out_of_order
+        stats["snipers"] += bidder.is_sniper
+        stats["latencies"].extend(bidder.latencies)
+        stats["final_prices"].append(bidder.price)
+        if bidder.max_accepted is not None and (
+                stats["max_accepted"] is None or bidder.max_accepted > stats["max_accepted"]):
+            stats["max_accepted"] = bidder.max_accepted
+        if bidder.winner is not None:
+            stats["winner"] = bidder.winner
+    return stats
+
+
+def merge_stats(parts):
+    merged = parts[0]
+    for part in parts[1:]:
+        for key in ("connected", "connect_failed", "sent", "rejected", "rate_limited",
+                    "delivered", "acknowledged", "out_of_order", "snipers"):
+            merged[key] += part[key]
+        merged["latencies"].extend(part["latencies"])
+        merged["final_prices"].extend(part["final_prices"])
+        if part["max_accepted"] is not None and (
+                merged["max_accepted"] is None or part["max_accepted"] > merged["max_accepted"]):
+            merged["max_accepted"] = part["max_accepted"]
+        merged["winner"] = merged["winner"] or part["winner"]
+        merged["connect_s"] = max(merged["connect_s"], part["connect_s"])
+    return merged
+
+
+# Barrier dùng chung của các process con (gán trong init_worker)
+worker_barrier = None
+
+
+def init_worker(barrier):
+    global worker_barrier
+    worker_barrier = barrier
+    raise_fd_limit()
+
+
+def worker_main(options, first, count):
+    """
+    Entry point của 1 process con (--processes > 1)
+    """
+    return asyncio.run(run_bidders(options, first, count, worker_barrier))
+
+
+def raise_fd_limit():
+    # Mỗi người chơi = 1 socket → nâng giới hạn file descriptor lên mức tối đa cho phép
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+# ========== KẾT NỐI ĐIỀU KHIỂN (đọc trạng thái server, không bid) ==========
+
+async def query_server(host, port, auction_id, timeout=5.0):
+    """
+    Đọc trạng thái phiên: WELCOME (hoặc SUBSCRIBED) + tổng số bid trong lịch sử
+    
+    Returns:
+        dict or None: auction_id, price, winner, version, history_total
+            (None nếu không kết nối được - VD: server đã tự dừng sau khi phiên kết thúc)
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    
+    framer = LineFramer()
+    state = {}
+    try:
+        async def read_until(msg_type):
+            while True:
+                data = await asyncio.wait_for(reader.read(65536), timeout)
+                if not data:
+                    return None
+                messages, _ = framer.feed(data)
+                for message in messages:
+                    if message.get("type") == msg_type:
+                        return message
+        
+        welcome = await read_until("WELCOME")
+        if welcome is None:
+            return None
+        if auction_id is not None and auction_id != welcome.get("auction_id"):
+            writer.write(encode_message({"type": "SUBSCRIBE", "auction_id": auction_id}))
+            welcome = await read_until("SUBSCRIBED")
+            if welcome is None:
+                return None
+        
+        state["auction_id"] = welcome.get("auction_id", auction_id)
+        state["price"] = welcome.get("current_price_cents")
+        state["winner"] = welcome.get("current_winner")
+        state["version"] = welcome.get("version", 0)
+        
+        writer.write(encode_message({"type": "GET_HISTORY", "auction_id": state["auction_id"],
+                                     "limit": 0}))
+        history = await read_until("HISTORY")
+        state["history_total"] = history.get("total") if history is not None else None
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        writer.close()
+    
+    return state
+
+
+# ========== BÁO CÁO ==========
+
+def percentile(sorted_values, fraction):
+    """
+    Percentile theo nearest-rank trên list đã sort
+    """
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def check_invariants(stats, before, after):
+    """
+    Kiểm tra bất biến sau khi chạy
+    
+    Returns:
+        list: Các (tên, ok, chi tiết) - ok=None nếu không kiểm tra được
+    """
+    checks = []
+    
+    # Giá cuối: từ kết nối điều khiển, hoặc WINNER nếu server đã dừng
+    if after is not None:
+        final = (after["price"], after["winner"])
+    elif stats["winner"] is not None:
+        final = stats["winner"]
+    else:
+        final = None
+    
+    # Bid chấp nhận cao nhất theo BID_ACCEPTED (không phải NEW_PRICE cao nhất đã
+    # thấy: đó chỉ là những gì server broadcast, server làm mất bid cao hơn
+    # thì NEW_PRICE cũng không có)
+    best = stats["max_accepted"]
+    if final is None:
+        checks.append(("Giá cuối = bid chấp nhận cao nhất", None, "không đọc được giá cuối"))
+    elif best is None:
+        checks.append(("Giá cuối = bid chấp nhận cao nhất", final[0] == before["price"],
+                       f"không có bid nào được chấp nhận, giá cuối ${format_price(final[0])}"))
+    else:
+        checks.append(("Giá cuối = bid chấp nhận cao nhất", final == best,
+                       f"giá cuối ${format_price(final[0])} ({final[1]}) | "
+                       f"bid cao nhất ${format_price(best[0])} ({best[1]})"))
+    
+    if after is None or before["history_total"] is None or after["history_total"] is None:
+        checks.append(("Không mất cập nhật: gửi = chấp nhận + từ chối", None,
+                       "không đọc được lịch sử server"))
+        checks.append(("Mọi người chơi nhận NEW_PRICE cuối", None, "không đọc được giá cuối"))
+        return checks
+    
+    accepted = after["history_total"] - before["history_total"]
+    stats["accepted"] = accepted
+    checks.append(("Không mất cập nhật: gửi = chấp nhận + từ chối",
+                   stats["sent"] == accepted + stats["rejected"],
+                   f"{stats['sent']} = {accepted} + {stats['rejected']}"))
+    checks.append(("Mỗi bid chấp nhận đều nhận BID_ACCEPTED",
+                   stats["acknowledged"] == accepted,
+                   f"{stats['acknowledged']} BID_ACCEPTED / {accepted} bid trong lịch sử"))
+    
+    # So giá chứ không so version: đặt deadline / đóng phiên cũng tăng version
+    stale = sum(1 for price in stats["final_prices"] if price != after["price"])
+    checks.append(("Mọi người chơi nhận NEW_PRICE cuối", stale == 0,
+                   f"giá cuối ${format_price(after['price'])}, {stale} người chơi chưa nhận"))
+    return checks
+
+
+def build_report(options, stats, before, after, elapsed):
+    checks = check_invariants(stats, before, after)
+    latencies = sorted(stats.pop("latencies"))
+    stats.pop("final_prices")
+    duration = options["duration"]
+    
+    accepted = stats.get("accepted")
+    return {
+        "options": options,
+        "elapsed_s": round(elapsed, 3),
+        "connected": stats["connected"],
+        "connect_failed": stats["connect_failed"],
+        "connect_s": round(stats["connect_s"], 3),
+        "snipers": stats["snipers"],
+        "sent": stats["sent"],
+        "accepted": accepted,
+        "acknowledged": stats["acknowledged"],
+        "rejected": stats["rejected"],
+        "rate_limited": stats["rate_limited"],
+        "delivered": stats["delivered"],
+        "out_of_order": stats["out_of_order"],
+        "sent_per_s": round(stats["sent"] / duration, 1),
+        "accepted_per_s": round(accepted / duration, 1) if accepted is not None else None,
+        "rejected_per_s": round(stats["rejected"] / duration, 1),
+        "latency_ms": {
+            "count": len(latencies),
+            "p50": percentile(latencies, 0.50),
+            "p99": percentile(latencies, 0.99),
+            "p999": percentile(latencies, 0.999),
+            "max": latencies[-1] if latencies else None
+        },
+        "invariants": [{"name": name, "ok": ok, "detail": detail} for name, ok, detail in checks],
+        "ok": all(ok is not False for _, ok, _ in checks)
+    }
+
+
+def print_report(report):
+    options = report["options"]
+    latency = report["latency_ms"]
+    
+    def ms(value):
+        return f"{value:.2f}" if value is not None else "-"
+    
+    print("=" * 60)
+    print(f"LOAD TEST - {options['profile']} | {options['bidders']} người chơi | "
+          f"{options['duration']}s | {options['processes']} process")
+    print("=" * 60)
+    print(f"🔌 Kết nối: {report['connected']} (lỗi {report['connect_failed']}) trong "
+          f"{report['connect_s']}s, sniper: {report['snipers']}")
+    print(f"📤 BID gửi: {report['sent']} ({report['sent_per_s']}/s)")
+    accepted = report["accepted"] if report["accepted"] is not None else "?"
+    print(f"✅ Chấp nhận: {accepted} ({report['accepted_per_s']}/s) | "
+          f"BID_ACCEPTED: {report['acknowledged']} | "
+          f"NEW_PRICE của chính mình: {report['delivered']}")
+    print(f"❌ Từ chối: {report['rejected']} ({report['rejected_per_s']}/s) | "
+          f"RATE_LIMITED: {report['rate_limited']}")
+    print(f"🔀 NEW_PRICE lệch thứ tự (đã bỏ): {report['out_of_order']}")
+    print(f"⏱️  BID → NEW_PRICE (ms, {latency['count']} mẫu): p50 {ms(latency['p50'])} | "
+          f"p99 {ms(latency['p99'])} | p999 {ms(latency['p999'])} | max {ms(latency['max'])}")
+    print("-" * 60)
+    for check in report["invariants"]:
+        mark = "⚠️ " if check["ok"] is None else ("✅" if check["ok"] else "❌")
+        print(f"{mark} {check['name']}: {check['detail']}")
+    print("=" * 60)
+
+
+# ========== MAIN ==========
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test headless cho server đấu giá")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--auction-id", default=None,
+                        help="Phiên cần bid (mặc định: phiên trong WELCOME)")
+    parser.add_argument("--bidders", type=int, default=DEFAULT_BIDDERS, help="Số người chơi")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Chia người chơi ra nhiều process (mỗi process 1 event loop)")
+    parser.add_argument("--profile", choices=PROFILES, default="steady", help="Kịch bản bid")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Thời gian bid (giây)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="BID / giây / người chơi")
+    parser.add_argument("--burst-factor", type=float, default=DEFAULT_BURST_FACTOR,
+                        help="Hệ số nhân rate trong cửa sổ cuối (burst / sniper)")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW,
+                        help="Độ dài cửa sổ cuối (giây)")
+    parser.add_argument("--snipers", type=float, default=DEFAULT_SNIPERS,
+                        help="Tỉ lệ người chơi là sniper (kịch bản sniper)")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE,
+                        help="Hết bid: dừng khi không còn kết quả nào đến trong SETTLE giây")
+    parser.add_argument("--connect-concurrency", type=int, default=DEFAULT_CONNECT_CONCURRENCY,
+                        help="Số kết nối mở song song (mỗi process) lúc khởi động")
+    parser.add_argument("--seed", type=int, default=1, help="Seed ngẫu nhiên (lặp lại được kịch bản)")
+    parser.add_argument("--json", default=None, help="Ghi báo cáo JSON ra file")
+    
+    args = parser.parse_args(argv)
+    if (args.bidders < 1 or args.processes < 1 or args.connect_concurrency < 1
+            or args.duration <= 0 or args.rate <= 0):
+        parser.error("--bidders, --processes, --connect-concurrency, --duration và --rate phải > 0")
+    if not 0 <= args.snipers <= 1:
+        parser.error("--snipers phải trong khoảng 0-1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {
+        "host": args.host, "port": args.port, "auction_id": args.auction_id,
+        "bidders": args.bidders, "processes": min(args.processes, args.bidders),
+        "profile": args.profile, "duration": args.duration, "rate": args.rate,
+        "burst_factor": args.burst_factor, "window": args.window,
+        "snipers": args.snipers if args.profile == "sniper" else 0.0,
+        "settle": args.settle, "seed": args.seed,
+        "connect_concurrency": args.connect_concurrency
+    }
+    raise_fd_limit()
+    
+    before = asyncio.run(query_server(args.host, args.port, args.auction_id))
+    if before is None:
+        print(f"❌ Không kết nối được server {args.host}:{args.port}")
+        return 1
+    options["auction_id"] = before["auction_id"]
+    print(f"[LOAD_TEST] Phiên {before['auction_id']}: giá ${format_price(before['price'])}, "
+          f"version {before['version']}, {before['history_total']} bid trong lịch sử")
+    
+    print(f"[LOAD_TEST] Kết nối {options['bidders']} người chơi "
+          f"({options['connect_concurrency']} kết nối song song), bid khi tất cả đã kết nối...")
+    
+    started = time.monotonic()
+    processes = options["processes"]
+    if processes == 1:
+        parts = [asyncio.run(run_bidders(options, 0, options["bidders"]))]
+    else:
+        share, extra = divmod(options["bidders"], processes)
+        chunks = []
+        first = 0
+        for index in range(processes):
+            count = share + (1 if index < extra else 0)
+            chunks.append((options, first, count))
+            first += count
+        barrier = multiprocessing.Barrier(processes)
+        with multiprocessing.Pool(processes, initializer=init_worker, initargs=(barrier,)) as pool:
+            parts = pool.starmap(worker_main, chunks)
+    elapsed = time.monotonic() - started
+    
+    after = asyncio.run(query_server(args.host, args.port, options["auction_id"]))
+    report = build_report(options, merge_stats(parts), before, after, elapsed)
+    print_report(report)
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[LOAD_TEST] Đã ghi báo cáo: {args.json}")
+    
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
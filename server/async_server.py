@@ -0,0 +1,377 @@
+"""
+Async Server Module - Chế độ server asyncio (1 event loop cho mọi client)
+
+Nhiệm vụ chính:
+1. Accept, đọc dữ liệu, xử lý BID và broadcast trên cùng 1 event loop
+2. Dùng asyncio StreamReader/StreamWriter thay cho 1 thread mỗi client
+3. Giữ nguyên ngữ nghĩa của AuctionState và AuctionHub
+
+So với chế độ thread:
+- Mỗi kết nối chỉ tốn 1 coroutine + buffer (không có thread stack riêng)
+- Có thể giữ 10k+ bidders đang chờ trên 1 process
+- AuctionScheduler vẫn chạy thread riêng, broadcast từ thread khác được
+  chuyển vào event loop qua loop.call_soon_threadsafe()
+- Mỗi kết nối có 1 AsyncOutbox (hàng đợi giới hạn) + 1 writer task
+  dùng await writer.drain() để tôn trọng TCP backpressure
+"""
+
+import asyncio
+import socket
+import threading
+
+from client_thread import ClientSession
+from event_log import log
+from outbound_queue import ClientOutbox
+
+try:
+    import resource  # Chỉ có trên Unix
+except ImportError:
+    resource = None
+
+
+class AsyncClientConnection:
+    """
+    Adapter giống socket (sendall/close) bọc quanh asyncio StreamWriter
+    
+    AuctionHub chỉ gọi sendall() và close() nên có thể dùng object này
+    thay cho socket thật mà không cần sửa Hub.
+    
+    Attributes:
+        writer (asyncio.StreamWriter): Writer của kết nối
+        loop (asyncio.AbstractEventLoop): Event loop sở hữu writer
+    """
+    
+    def __init__(self, writer, loop):
+        """
+        Args:
+            writer (asyncio.StreamWriter): Writer của kết nối
+            loop (asyncio.AbstractEventLoop): Event loop đang chạy server
+        """
+        self.writer = writer
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self.closed = False
+    
+    def sendall(self, data):
+        """
+        Ghi data vào transport (không block)
+        
+        - Gọi từ event loop: ghi trực tiếp
+        - Gọi từ thread khác (AuctionScheduler): chuyển vào loop bằng call_soon_threadsafe
+        
+        Raises:
+            ConnectionError: Nếu kết nối đã đóng
+        """
+        if self.closed or self.writer.is_closing():
+            raise ConnectionError("Kết nối đã đóng")
+        
+        if threading.get_ident() == self.loop_thread_id:
+            self.writer.write(data)
+        else:
+            self.loop.call_soon_threadsafe(self._write, data)
+    
+    def _write(self, data):
+        # Chạy trong event loop
+        if not self.closed and not self.writer.is_closing():
+            self.writer.write(data)
+    
+    def shutdown(self, how=None):
+        """
+        Giống socket.shutdown(): đóng transport để reader nhận EOF
+        """
+        self.close()
+    
+    def close(self):
+        """
+        Đóng kết nối (thread-safe)
+        """
+        if self.closed:
+            return
+        self.closed = True
+        
+        if threading.get_ident() == self.loop_thread_id:
+            self.writer.close()
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self.writer.close)
+            except RuntimeError:
+                # Event loop đã dừng
+                pass
+
+
+class AsyncOutbox(ClientOutbox):
+    """
+    Outbox cho chế độ async: 1 writer task trên event loop
+    
+    put() có thể được gọi từ bất kỳ thread nào (AuctionScheduler, event loop);
+    writer task được đánh thức qua asyncio.Event + call_soon_threadsafe.
+    """
+    
+    def __init__(self, connection, client_id, **kwargs):
+        """
+        Args:
+            connection (AsyncClientConnection): Kết nối của client
+            client_id (str): ID của client
+            **kwargs: max_size, policy, stats, on_disconnect, traffic (xem ClientOutbox)
+        """
+        super().__init__(client_id, **kwargs)
+        self.connection = connection
+        self.loop = connection.loop
+        self.loop_thread_id = connection.loop_thread_id
+        self.wakeup = asyncio.Event()
+        self.drained = asyncio.Event()
+        self.drained.set()
+        self.writer_task = None
+    
+    def start(self):
+        """
+        Tạo writer task (phải gọi trong event loop)
+        """
+        self.writer_task = self.loop.create_task(self._writer_loop())
+    
+    def _wake_writer(self):
+        if threading.get_ident() == self.loop_thread_id:
+            self.wakeup.set()
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self.wakeup.set)
+            except RuntimeError:
+                # Event loop đã dừng
+                pass
+    
+    async def _writer_loop(self):
+        """
+        Lấy frame từ hàng đợi, ghi vào transport và await drain()
+        """
+        writer = self.connection.writer
+        
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                
+                frames, fanouts = self.pop_all()
+                if frames:
+                    self.drained.clear()
+                    writer.writelines(frames)
+                    # Block writer task (không block event loop) khi client chậm
+                    try:
+                        await writer.drain()
+                        self._count_sent(frames)
+                    finally:
+                        for fanout in fanouts:
+                            fanout.done()
+                
+                if not self.queue:
+                    self.drained.set()
+                    if self.closed:
+                        return
+        except (ConnectionError, OSError) as e:
+            with self.lock:
+                already_closed = self.closed
+                self.closed = True
+                self._discard_queue()
+            self.drained.set()
+            if not already_closed:
+                log.warning("OUTBOX", "⚠️ Không gửi được đến client", client_id=self.client_id, error=e)
+                if self.on_disconnect:
+                    self.on_disconnect(self)
+        except asyncio.CancelledError:
+            self.drained.set()
+    
+    async def wait_drained(self, timeout):
+        """
+        Đợi (trong event loop) đến khi hàng đợi gửi hết
+        """
+        try:
+            await asyncio.wait_for(self._until_drained(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _until_drained(self):
+        # Frame vừa put chưa được writer task lấy → drained vẫn đang set
+        while self.queue and not self.closed:
+            await asyncio.sleep(0.001)
+        await self.drained.wait()
+    
+    def flush(self, timeout):
+        """
+        Đợi hàng đợi gửi hết (gọi từ thread khác, VD: scheduler đóng clients
+        sau phiên cuối). Trong event loop không block được → chỉ kiểm tra
+        """
+        if threading.get_ident() == self.loop_thread_id:
+            return self.pending() == 0
+        try:
+            future = asyncio.run_coroutine_threadsafe(self.wait_drained(timeout), self.loop)
+            return future.result(timeout + 0.5)
+        except Exception:
+            # Event loop đã dừng / quá thời gian
+            return False
+
+
+class AsyncClientSession(ClientSession):
+    """
+    Session của 1 client trong chế độ asyncio
+    
+    Dùng lại toàn bộ logic giao thức của ClientSession, chỉ thay vòng lặp
+    recv() blocking bằng await reader.read().
+    """
+    
+    async def serve(self, reader):
+        """
+        Vòng lặp đọc dữ liệu từ client cho đến khi ngắt kết nối
+        
+        Args:
+            reader (asyncio.StreamReader): Reader của kết nối
+        """
+        # Gửi welcome message
+        self.send_welcome()
+        
+        try:
+            while self.is_running:
+                data = await reader.read(4096)
+                
+                if not data:
+                    # Client đã ngắt kết nối
+                    log.info("CLIENT", "Ngắt kết nối", client_id=self.client_id)
+                    break
+                
+                self.process_data(data)
+        
+        except (ConnectionError, OSError) as e:
+            log.warning("CLIENT", "Lỗi kết nối", client_id=self.client_id, error=e)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.cleanup()
+
+
+class AsyncAuctionServer:
+    """
+    Server asyncio: accept + đọc + xử lý BID + broadcast trên 1 event loop
+    
+    Attributes:
+        host (str): Địa chỉ lắng nghe
+        port (int): Port lắng nghe
+        backlog (int): Kích thước hàng đợi accept của kernel
+        auction_hub: Reference đến AuctionHub
+        auction_state: Reference đến AuctionState (phiên mặc định)
+        auction_registry: AuctionRegistry khi có nhiều phiên (optional)
+    """
+    
+    def __init__(self, host, port, auction_hub, auction_state, backlog=1024,
+                 auction_registry=None):
+        """
+        Args:
+            host (str): Địa chỉ lắng nghe
+            port (int): Port lắng nghe
+            auction_hub: Reference đến AuctionHub
+            auction_state: Reference đến AuctionState
+            backlog (int): Kích thước hàng đợi accept (mặc định 1024)
+            auction_registry: AuctionRegistry khi có nhiều phiên (optional)
+        """
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        self.auction_hub = auction_hub
+        self.auction_state = auction_state
+        self.auction_registry = auction_registry
+        self.client_counter = 0
+        self.loop = None
+        self.server = None
+    
+    async def handle_client(self, reader, writer):
+        """
+        Callback của asyncio.start_server cho mỗi kết nối mới
+        """
+        self.client_counter += 1
+        client_id = f"Client-{self.client_counter}"
+        client_address = writer.get_extra_info('peername')
+        
+        # Tắt Nagle để NEW_PRICE/UPDATE_TIMER đi ngay
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+        
+        log.info("CONNECT", "Client kết nối", client_id=client_id, address=client_address)
+        
+        connection = AsyncClientConnection(writer, self.loop)
+        session = AsyncClientSession(
+            client_socket=connection,
+            client_address=client_address,
+            client_id=client_id,
+            auction_hub=self.auction_hub,
+            auction_state=self.auction_state,
+            auction_registry=self.auction_registry
+        )
+        
+        # Hàng đợi gửi riêng + writer task cho kết nối này
+        outbox = AsyncOutbox(connection, client_id, **self.auction_hub.outbox_options())
+        outbox.start()
+        
+        # Đăng ký client vào hub
+        self.auction_hub.add_client(connection, client_id, outbox=outbox)
+        
+        await session.serve(reader)
+    
+    async def serve(self, shutdown_flag):
+        """
+        Chạy server cho đến khi shutdown_flag được set
+        
+        Args:
+            shutdown_flag (threading.Event): Cờ shutdown dùng chung với main_server
+        """
+        self.loop = asyncio.get_running_loop()
+        
+        self.server = await asyncio.start_server(
+            self.handle_client,
+            self.host,
+            self.port,
+            backlog=self.backlog,
+            reuse_address=True
+        )
+        
+        print(f"[ASYNC] Đang lắng nghe tại {self.host}:{self.port} (backlog={self.backlog})")
+        
+        try:
+            # Kiểm tra shutdown_flag định kỳ (set bởi admin/timer/signal)
+            while not shutdown_flag.is_set():
+                await asyncio.sleep(0.5)
+        finally:
+            self.server.close()
+            
+            # Gửi SHUTDOWN và đợi các writer task gửi hết trước khi loop dừng
+            self.auction_hub.broadcast_shutdown()
+            outboxes = self.auction_hub.get_outboxes()
+            if outboxes:
+                await asyncio.gather(*(outbox.wait_drained(1.0) for outbox in outboxes))
+            self.auction_hub.close_all_clients()
+            
+            await self.server.wait_closed()
+            print("[ASYNC] Server asyncio đã dừng")
+
+
+def raise_fd_limit():
+    """
+    Nâng soft limit số file descriptor lên bằng hard limit (Unix)
+    
+    Cần thiết để giữ hàng nghìn kết nối đồng thời.
+    
+    Returns:
+        int or None: Soft limit mới, None nếu không hỗ trợ
+    """
+    if resource is None:
+        return None
+    
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard != resource.RLIM_INFINITY and soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        return soft
+    except (ValueError, OSError):
+        return None
@@ -6,12 +6,39 @@ Hỗ trợ 2 nguồn config (theo thứ tự ưu tiên):
 2. Config File (auction_config.json)
 
 Nếu không có cả 2 → Sử dụng giá trị mặc định
+
+Config file có thể là:
+- 1 object (1 vật phẩm - định dạng cũ)
+- 1 list các object (catalog nhiều vật phẩm, mỗi object như auction_config.json)
+- 1 object có trường "auctions" (catalog) + các thiết lập server khác
+Command line chỉ override vật phẩm ĐẦU TIÊN trong catalog.
+
+Giá trong config (starting_price, min_increment, max_price) viết theo đơn vị
+(VD: 1500.50); main_server đổi sang cents bằng pricing.parse_price.
 """
 
 import json
 import os
+import sys
 import argparse
 
+from pricing import PriceError, parse_price, DEFAULT_MAX_PRICE
+from event_log import DEFAULT_LEVEL as DEFAULT_LOG_LEVEL, DEFAULT_FORMAT as DEFAULT_LOG_FORMAT
+from event_log import LEVELS as LOG_LEVELS, LOG_FORMATS
+from rate_limit import (DEFAULT_BID_RATE, DEFAULT_BID_BURST, DEFAULT_USER_BID_RATE,
+                        DEFAULT_USER_BID_BURST)
+from metrics import DEFAULT_METRICS_HOST
+
+
+def price_or_none(raw):
+    """
+    Giá theo cents, None nếu không parse được (không raise)
+    """
+    try:
+        return parse_price(raw)
+    except PriceError:
+        return None
+
 
 class AuctionConfig:
     """
@@ -23,6 +50,39 @@ class AuctionConfig:
     DEFAULT_STARTING_PRICE = 1000
     DEFAULT_DURATION = 120
     DEFAULT_DESCRIPTION = "Một món đồ đặc biệt đang chờ chủ nhân!"
+    DEFAULT_SERVER_MODE = "thread"
+    DEFAULT_OUTBOX_SIZE = 256
+    DEFAULT_OVERFLOW_POLICY = "drop_timer"
+    DEFAULT_TIMER_MODE = "tick"
+    DEFAULT_SYNC_INTERVAL = 15
+    DEFAULT_AUCTION_ID = "auction-1"
+    DEFAULT_JOURNAL_PATH = None  # None = tắt write-ahead bid journal
+    DEFAULT_JOURNAL_INTERVAL_MS = 10
+    DEFAULT_JOURNAL_BATCH = 256
+    DEFAULT_MIN_INCREMENT = 0.01  # 1 cent = chỉ cần cao hơn giá hiện tại
+    DEFAULT_MAX_PRICE = DEFAULT_MAX_PRICE
+    DEFAULT_SOFT_CLOSE_WINDOW = 0  # 0 = tắt soft-close (hết giờ là đóng)
+    DEFAULT_SOFT_CLOSE_EXTENSION = 10
+    DEFAULT_SOFT_CLOSE_MAX = 120
+    DEFAULT_BID_RATE = DEFAULT_BID_RATE  # 0 = không giới hạn tốc độ BID
+    DEFAULT_BID_BURST = DEFAULT_BID_BURST
+    DEFAULT_USER_BID_RATE = DEFAULT_USER_BID_RATE
+    DEFAULT_USER_BID_BURST = DEFAULT_USER_BID_BURST
+    DEFAULT_BID_BATCH_MS = 0  # 0 = xử lý từng BID (tắt micro-batching)
+    DEFAULT_LOG_LEVEL = DEFAULT_LOG_LEVEL
+    DEFAULT_LOG_FORMAT = DEFAULT_LOG_FORMAT
+    DEFAULT_METRICS_PORT = 0  # 0 = tắt HTTP endpoint /metrics
+    DEFAULT_METRICS_HOST = DEFAULT_METRICS_HOST  # Chỉ cho truy cập từ máy local
+    DEFAULT_LOCK_PROFILE = False  # True = đo tranh chấp AuctionState.lock / AuctionHub.lock
+    
+    # Các chế độ server hợp lệ
+    SERVER_MODES = ("thread", "async")
+    
+    # Chính sách khi hàng đợi gửi của 1 client bị đầy
+    OVERFLOW_POLICIES = ("drop_timer", "latest_price", "disconnect")
+    
+    # Chế độ timer: tick (UPDATE_TIMER mỗi giây) hoặc deadline (client tự đếm)
+    TIMER_MODES = ("tick", "deadline")
     
     def __init__(self):
         """
@@ -32,6 +92,32 @@ class AuctionConfig:
         self.starting_price = self.DEFAULT_STARTING_PRICE
         self.auction_duration = self.DEFAULT_DURATION
         self.description = self.DEFAULT_DESCRIPTION
+        self.server_mode = self.DEFAULT_SERVER_MODE
+        self.outbox_size = self.DEFAULT_OUTBOX_SIZE
+        self.overflow_policy = self.DEFAULT_OVERFLOW_POLICY
+        self.timer_mode = self.DEFAULT_TIMER_MODE
+        self.sync_interval = self.DEFAULT_SYNC_INTERVAL
+        self.auction_id = self.DEFAULT_AUCTION_ID
+        self.journal_path = self.DEFAULT_JOURNAL_PATH
+        self.journal_interval_ms = self.DEFAULT_JOURNAL_INTERVAL_MS
+        self.journal_batch = self.DEFAULT_JOURNAL_BATCH
+        self.min_increment = self.DEFAULT_MIN_INCREMENT
+        self.max_price = self.DEFAULT_MAX_PRICE
+        self.soft_close_window = self.DEFAULT_SOFT_CLOSE_WINDOW
+        self.soft_close_extension = self.DEFAULT_SOFT_CLOSE_EXTENSION
+        self.soft_close_max = self.DEFAULT_SOFT_CLOSE_MAX
+        self.bid_rate = self.DEFAULT_BID_RATE
+        self.bid_burst = self.DEFAULT_BID_BURST
+        self.user_bid_rate = self.DEFAULT_USER_BID_RATE
+        self.user_bid_burst = self.DEFAULT_USER_BID_BURST
+        self.bid_batch_ms = self.DEFAULT_BID_BATCH_MS
+        self.log_level = self.DEFAULT_LOG_LEVEL
+        self.log_format = self.DEFAULT_LOG_FORMAT
+        self.metrics_port = self.DEFAULT_METRICS_PORT
+        self.metrics_host = self.DEFAULT_METRICS_HOST
+        self.lock_profile = self.DEFAULT_LOCK_PROFILE
+        self.catalog = []  # Các vật phẩm đọc từ file (raw dict)
+        self.catalog_settings = {}  # Thiết lập cấp ngoài cùng của file catalog
         self.config_source = "default"
     
     def load_from_file(self, config_path="auction_config.json"):
@@ -54,11 +140,52 @@ class AuctionConfig:
             with open(config_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
+            # Catalog nhiều vật phẩm
+            if isinstance(data, list):
+                self.catalog = data
+                data = data[0] if data else {}
+            elif "auctions" in data:
+                self.catalog = data["auctions"]
+                settings = data
+                self.catalog_settings = {key: value for key, value in settings.items()
+                                         if key != "auctions"}
+                data = dict(self.catalog[0]) if self.catalog else {}
+                # Thiết lập server đặt ở cấp ngoài cùng
+                for key, value in settings.items():
+                    if key != "auctions":
+                        data.setdefault(key, value)
+            else:
+                self.catalog = [data]
+            
             # Parse các trường
+            self.auction_id = data.get("auction_id", self.DEFAULT_AUCTION_ID)
             self.item_name = data.get("item_name", self.DEFAULT_ITEM_NAME)
             self.starting_price = data.get("starting_price", self.DEFAULT_STARTING_PRICE)
             self.auction_duration = data.get("auction_duration", self.DEFAULT_DURATION)
             self.description = data.get("description", self.DEFAULT_DESCRIPTION)
+            self.server_mode = data.get("server_mode", self.DEFAULT_SERVER_MODE)
+            self.outbox_size = data.get("outbox_size", self.DEFAULT_OUTBOX_SIZE)
+            self.overflow_policy = data.get("overflow_policy", self.DEFAULT_OVERFLOW_POLICY)
+            self.timer_mode = data.get("timer_mode", self.DEFAULT_TIMER_MODE)
+            self.sync_interval = data.get("sync_interval", self.DEFAULT_SYNC_INTERVAL)
+            self.journal_path = data.get("journal_path", self.DEFAULT_JOURNAL_PATH)
+            self.journal_interval_ms = data.get("journal_interval_ms", self.DEFAULT_JOURNAL_INTERVAL_MS)
+            self.journal_batch = data.get("journal_batch", self.DEFAULT_JOURNAL_BATCH)
+            self.min_increment = data.get("min_increment", self.DEFAULT_MIN_INCREMENT)
+            self.max_price = data.get("max_price", self.DEFAULT_MAX_PRICE)
+            self.soft_close_window = data.get("soft_close_window", self.DEFAULT_SOFT_CLOSE_WINDOW)
+            self.soft_close_extension = data.get("soft_close_extension", self.DEFAULT_SOFT_CLOSE_EXTENSION)
+            self.soft_close_max = data.get("soft_close_max", self.DEFAULT_SOFT_CLOSE_MAX)
+            self.bid_rate = data.get("bid_rate", self.DEFAULT_BID_RATE)
+            self.bid_burst = data.get("bid_burst", self.DEFAULT_BID_BURST)
+            self.user_bid_rate = data.get("user_bid_rate", self.DEFAULT_USER_BID_RATE)
+            self.user_bid_burst = data.get("user_bid_burst", self.DEFAULT_USER_BID_BURST)
+            self.bid_batch_ms = data.get("bid_batch_ms", self.DEFAULT_BID_BATCH_MS)
+            self.log_level = data.get("log_level", self.DEFAULT_LOG_LEVEL)
+            self.log_format = data.get("log_format", self.DEFAULT_LOG_FORMAT)
+            self.metrics_port = data.get("metrics_port", self.DEFAULT_METRICS_PORT)
+            self.metrics_host = data.get("metrics_host", self.DEFAULT_METRICS_HOST)
+            self.lock_profile = data.get("lock_profile", self.DEFAULT_LOCK_PROFILE)
             self.config_source = f"file:{config_path}"
             
             print(f"[CONFIG] ✅ Đã load config từ {config_path}")
@@ -90,6 +217,7 @@ Examples:
   python main_server.py --item "PS5 Console" --price 5000
   python main_server.py --config custom_config.json
   python main_server.py --item "MacBook Pro M3" --price 20000 --duration 180
+  python main_server.py --mode async
             """
         )
         
@@ -124,6 +252,147 @@ Examples:
             help='Mô tả vật phẩm (override config file)'
         )
         
+        parser.add_argument(
+            '--mode',
+            type=str,
+            choices=self.SERVER_MODES,
+            help='Chế độ server: thread (mỗi client 1 thread) hoặc async (asyncio)'
+        )
+        
+        parser.add_argument(
+            '--outbox-size',
+            type=int,
+            help='Số message tối đa trong hàng đợi gửi của mỗi client'
+        )
+        
+        parser.add_argument(
+            '--overflow-policy',
+            type=str,
+            choices=self.OVERFLOW_POLICIES,
+            help='Xử lý client chậm khi hàng đợi đầy: drop_timer, latest_price, disconnect'
+        )
+        
+        parser.add_argument(
+            '--timer-mode',
+            type=str,
+            choices=self.TIMER_MODES,
+            help='tick: UPDATE_TIMER mỗi giây | deadline: gửi deadline, client tự đếm ngược'
+        )
+        
+        parser.add_argument(
+            '--sync-interval',
+            type=int,
+            help='Chế độ deadline: số giây giữa 2 lần TIMER_SYNC (mặc định 15)'
+        )
+        
+        parser.add_argument(
+            '--journal',
+            type=str,
+            help='Bật write-ahead bid journal tại đường dẫn này (khôi phục sau crash)'
+        )
+        
+        parser.add_argument(
+            '--journal-interval',
+            type=int,
+            help='Group commit: fsync journal mỗi N mili giây (mặc định 10)'
+        )
+        
+        parser.add_argument(
+            '--journal-batch',
+            type=int,
+            help='Group commit: fsync ngay khi có N bản ghi chờ (mặc định 256)'
+        )
+        
+        parser.add_argument(
+            '--min-increment',
+            type=str,
+            help='Bước giá tối thiểu so với giá hiện tại (mặc định 0.01)'
+        )
+        
+        parser.add_argument(
+            '--max-price',
+            type=str,
+            help=f'Giá tối đa được phép đặt (mặc định {DEFAULT_MAX_PRICE})'
+        )
+        
+        parser.add_argument(
+            '--soft-close',
+            type=int,
+            help='Soft-close: bid trong N giây cuối sẽ dời deadline (mặc định 0 = tắt)'
+        )
+        
+        parser.add_argument(
+            '--soft-close-extension',
+            type=int,
+            help='Soft-close: số giây dời thêm mỗi lần (mặc định 10)'
+        )
+        
+        parser.add_argument(
+            '--soft-close-max',
+            type=int,
+            help='Soft-close: tổng số giây được dời tối đa mỗi phiên (mặc định 120)'
+        )
+        
+        parser.add_argument(
+            '--bid-rate',
+            type=float,
+            help=f'Số BID/giây tối đa của mỗi kết nối, VD: 20 (mặc định {DEFAULT_BID_RATE} = không giới hạn)'
+        )
+        
+        parser.add_argument(
+            '--bid-burst',
+            type=int,
+            help=f'Số BID liên tiếp tối đa của mỗi kết nối (mặc định {DEFAULT_BID_BURST})'
+        )
+        
+        parser.add_argument(
+            '--user-bid-rate',
+            type=float,
+            help=(f'Số BID/giây tối đa của mỗi user (tên trong BID đầu tiên của kết nối, '
+                  f'theo địa chỉ client), VD: 10 (mặc định {DEFAULT_USER_BID_RATE} = không giới hạn)')
+        )
+        
+        parser.add_argument(
+            '--user-bid-burst',
+            type=int,
+            help=f'Số BID liên tiếp tối đa của mỗi user (mặc định {DEFAULT_USER_BID_BURST})'
+        )
+        
+        parser.add_argument(
+            '--bid-batch-ms',
+            type=int,
+            help='Micro-batching: gom BID theo lượt N mili giây, VD: 5-20 (mặc định 0 = tắt)'
+        )
+        
+        parser.add_argument(
+            '--log-level',
+            choices=list(LOG_LEVELS),
+            help=f'Level log thấp nhất được ghi (mặc định {DEFAULT_LOG_LEVEL})'
+        )
+        
+        parser.add_argument(
+            '--log-format',
+            choices=LOG_FORMATS,
+            help=f'Định dạng log: text hoặc json - 1 object/dòng (mặc định {DEFAULT_LOG_FORMAT})'
+        )
+        
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            help='Port HTTP phục vụ /metrics dạng Prometheus, VD: 9100 (mặc định 0 = tắt)'
+        )
+        
+        parser.add_argument(
+            '--metrics-host',
+            help=f'Địa chỉ lắng nghe của /metrics (mặc định {DEFAULT_METRICS_HOST})'
+        )
+        
+        parser.add_argument(
+            '--lock-profile',
+            action='store_true',
+            help='Đo thời gian đợi / giữ AuctionState.lock và AuctionHub.lock theo call site (mặc định tắt)'
+        )
+        
         # Parse arguments
         if args is None:
             args = parser.parse_args()
@@ -148,6 +417,99 @@ Examples:
             self.description = args.desc
             self.config_source = "command_line"
         
+        if args.mode:
+            self.server_mode = args.mode
+            self.config_source = "command_line"
+        
+        if args.outbox_size:
+            self.outbox_size = args.outbox_size
+            self.config_source = "command_line"
+        
+        if args.overflow_policy:
+            self.overflow_policy = args.overflow_policy
+            self.config_source = "command_line"
+        
+        if args.timer_mode:
+            self.timer_mode = args.timer_mode
+            self.config_source = "command_line"
+        
+        if args.sync_interval:
+            self.sync_interval = args.sync_interval
+            self.config_source = "command_line"
+        
+        if args.journal:
+            self.journal_path = args.journal
+            self.config_source = "command_line"
+        
+        if args.journal_interval:
+            self.journal_interval_ms = args.journal_interval
+            self.config_source = "command_line"
+        
+        if args.journal_batch:
+            self.journal_batch = args.journal_batch
+            self.config_source = "command_line"
+        
+        if args.min_increment:
+            self.min_increment = args.min_increment
+            self.config_source = "command_line"
+        
+        if args.max_price:
+            self.max_price = args.max_price
+            self.config_source = "command_line"
+        
+        if args.soft_close:
+            self.soft_close_window = args.soft_close
+            self.config_source = "command_line"
+        
+        if args.soft_close_extension:
+            self.soft_close_extension = args.soft_close_extension
+            self.config_source = "command_line"
+        
+        if args.soft_close_max:
+            self.soft_close_max = args.soft_close_max
+            self.config_source = "command_line"
+        
+        # rate = 0 là giá trị hợp lệ (tắt giới hạn) → so với None
+        if args.bid_rate is not None:
+            self.bid_rate = args.bid_rate
+            self.config_source = "command_line"
+        
+        if args.bid_burst:
+            self.bid_burst = args.bid_burst
+            self.config_source = "command_line"
+        
+        if args.user_bid_rate is not None:
+            self.user_bid_rate = args.user_bid_rate
+            self.config_source = "command_line"
+        
+        if args.user_bid_burst:
+            self.user_bid_burst = args.user_bid_burst
+            self.config_source = "command_line"
+        
+        if args.bid_batch_ms:
+            self.bid_batch_ms = args.bid_batch_ms
+            self.config_source = "command_line"
+        
+        if args.log_level:
+            self.log_level = args.log_level
+            self.config_source = "command_line"
+        
+        if args.log_format:
+            self.log_format = args.log_format
+            self.config_source = "command_line"
+        
+        if args.metrics_port:
+            self.metrics_port = args.metrics_port
+            self.config_source = "command_line"
+        
+        if args.metrics_host:
+            self.metrics_host = args.metrics_host
+            self.config_source = "command_line"
+        
+        if args.lock_profile:
+            self.lock_profile = True
+            self.config_source = "command_line"
+        
         return args
     
     def validate(self):
@@ -157,6 +519,33 @@ Examples:
         Returns:
             tuple: (is_valid: bool, error_message: str)
         """
+        # Validate catalog (các vật phẩm từ thứ 2 trở đi)
+        catalog = self.get_catalog()
+        auction_ids = [item["auction_id"] for item in catalog]
+        if len(set(auction_ids)) != len(auction_ids):
+            return False, "auction_id trong catalog bị trùng"
+        
+        for item in catalog[1:]:
+            if not item["item_name"] or len(str(item["item_name"]).strip()) == 0:
+                return False, f"{item['auction_id']}: Tên vật phẩm không được để trống"
+            if item["starting_price"] <= 0:
+                return False, f"{item['auction_id']}: Giá khởi điểm phải lớn hơn 0"
+            if item["auction_duration"] < 10:
+                return False, f"{item['auction_id']}: Thời gian đấu giá phải ít nhất 10 giây"
+        
+        # Validate giá (mọi vật phẩm): parse được thành cents, bước giá > 0
+        for item in catalog:
+            try:
+                starting_price = parse_price(item["starting_price"])
+                min_increment = parse_price(item["min_increment"])
+                max_price = parse_price(item["max_price"])
+            except PriceError as e:
+                return False, f"{item['auction_id']}: Giá không hợp lệ ({e})"
+            if min_increment <= 0:
+                return False, f"{item['auction_id']}: Bước giá phải lớn hơn 0"
+            if max_price <= starting_price:
+                return False, f"{item['auction_id']}: Giá tối đa phải lớn hơn giá khởi điểm"
+        
         # Validate item name
         if not self.item_name or len(self.item_name.strip()) == 0:
             return False, "Tên vật phẩm không được để trống"
@@ -172,8 +561,154 @@ Examples:
         if self.auction_duration < 10:
             return False, "Thời gian đấu giá phải ít nhất 10 giây"
         
+        # Validate server mode
+        if self.server_mode not in self.SERVER_MODES:
+            return False, f"Chế độ server không hợp lệ: {self.server_mode}"
+        
+        # Validate outbound queue
+        if self.outbox_size <= 0:
+            return False, "Kích thước hàng đợi gửi phải lớn hơn 0"
+        
+        if self.overflow_policy not in self.OVERFLOW_POLICIES:
+            return False, f"Chính sách overflow không hợp lệ: {self.overflow_policy}"
+        
+        # Validate timer
+        if self.timer_mode not in self.TIMER_MODES:
+            return False, f"Chế độ timer không hợp lệ: {self.timer_mode}"
+        
+        if self.sync_interval <= 0:
+            return False, "Chu kỳ TIMER_SYNC phải lớn hơn 0"
+        
+        # Validate journal
+        if self.journal_interval_ms <= 0:
+            return False, "Chu kỳ group commit của journal phải lớn hơn 0"
+        
+        if self.journal_batch <= 0:
+            return False, "Kích thước batch của journal phải lớn hơn 0"
+        
+        # Validate soft-close
+        if self.soft_close_window < 0:
+            return False, "Cửa sổ soft-close không được âm"
+        
+        if self.soft_close_window > 0 and (self.soft_close_extension <= 0 or self.soft_close_max <= 0):
+            return False, "Soft-close cần số giây dời và tổng số giây dời lớn hơn 0"
+        
+        # Validate rate limit (burst >= 1: bucket đầy phải đủ cho ít nhất 1 BID)
+        if self.bid_rate < 0 or self.user_bid_rate < 0:
+            return False, "Tốc độ BID tối đa không được âm"
+        
+        if self.bid_burst < 1 or self.user_bid_burst < 1:
+            return False, "Burst BID phải ít nhất 1"
+        
+        # Validate micro-batching (lượt quá dài làm chậm mọi NEW_PRICE)
+        if not 0 <= self.bid_batch_ms <= 1000:
+            return False, "Độ dài lượt gom BID phải từ 0 đến 1000 mili giây"
+        
+        # Validate log
+        if self.log_level not in LOG_LEVELS:
+            return False, f"Level log không hợp lệ: {self.log_level}"
+        
+        if self.log_format not in LOG_FORMATS:
+            return False, f"Định dạng log không hợp lệ: {self.log_format}"
+        
+        # Validate metrics endpoint
+        if not 0 <= self.metrics_port <= 65535:
+            return False, "Port metrics phải từ 0 đến 65535"
+        
         return True, ""
     
+    def reset_invalid_fields(self):
+        """
+        Đặt lại về giá trị mặc định mọi trường mà validate() từ chối (gọi khi
+        validate báo lỗi). Giữ nguyên giá trị hỏng thì server hoặc crash lúc
+        khởi động (PriceError / KeyError), hoặc chạy sai (VD: sync_interval = 0
+        → TIMER_SYNC liên tục, outbox_size <= 0 → ngắt mọi client).
+        
+        Kiểm tra từng trường độc lập (validate chỉ báo lỗi đầu tiên). Lỗi không
+        sửa được bằng giá trị mặc định (VD: auction_id trùng) vẫn còn → gọi
+        validate() lại để biết.
+        
+        Returns:
+            list: Các (tên trường, giá trị mặc định) đã đặt lại
+        """
+        reset = []
+        
+        # (trường, giá trị mặc định, điều kiện hợp lệ) - cùng điều kiện với validate()
+        checks = [
+            ("item_name", self.DEFAULT_ITEM_NAME, lambda value: bool(value and str(value).strip())),
+            ("auction_duration", self.DEFAULT_DURATION, lambda value: value >= 10),
+            ("server_mode", self.DEFAULT_SERVER_MODE, lambda value: value in self.SERVER_MODES),
+            ("outbox_size", self.DEFAULT_OUTBOX_SIZE, lambda value: value > 0),
+            ("overflow_policy", self.DEFAULT_OVERFLOW_POLICY,
+             lambda value: value in self.OVERFLOW_POLICIES),
+            ("timer_mode", self.DEFAULT_TIMER_MODE, lambda value: value in self.TIMER_MODES),
+            ("sync_interval", self.DEFAULT_SYNC_INTERVAL, lambda value: value > 0),
+            ("journal_interval_ms", self.DEFAULT_JOURNAL_INTERVAL_MS, lambda value: value > 0),
+            ("journal_batch", self.DEFAULT_JOURNAL_BATCH, lambda value: value > 0),
+            ("soft_close_window", self.DEFAULT_SOFT_CLOSE_WINDOW, lambda value: value >= 0),
+            ("bid_rate", self.DEFAULT_BID_RATE, lambda value: value >= 0),
+            ("user_bid_rate", self.DEFAULT_USER_BID_RATE, lambda value: value >= 0),
+            ("bid_burst", self.DEFAULT_BID_BURST, lambda value: value >= 1),
+            ("user_bid_burst", self.DEFAULT_USER_BID_BURST, lambda value: value >= 1),
+            ("bid_batch_ms", self.DEFAULT_BID_BATCH_MS, lambda value: 0 <= value <= 1000),
+            ("log_level", self.DEFAULT_LOG_LEVEL, lambda value: value in LOG_LEVELS),
+            ("log_format", self.DEFAULT_LOG_FORMAT, lambda value: value in LOG_FORMATS),
+            ("metrics_port", self.DEFAULT_METRICS_PORT, lambda value: 0 <= value <= 65535)
+        ]
+        for field, default, is_valid in checks:
+            if not is_valid(getattr(self, field)):
+                setattr(self, field, default)
+                reset.append((field, default))
+        
+        # Soft-close bật thì cần số giây dời và tổng số giây dời > 0
+        if self.soft_close_window > 0:
+            if self.soft_close_extension <= 0:
+                self.soft_close_extension = self.DEFAULT_SOFT_CLOSE_EXTENSION
+                reset.append(("soft_close_extension", self.soft_close_extension))
+            if self.soft_close_max <= 0:
+                self.soft_close_max = self.DEFAULT_SOFT_CLOSE_MAX
+                reset.append(("soft_close_max", self.soft_close_max))
+        
+        # Giá của vật phẩm đầu tiên (trường của config)
+        starting_price = price_or_none(self.starting_price)
+        if starting_price is None or starting_price <= 0:
+            self.starting_price = self.DEFAULT_STARTING_PRICE
+            starting_price = parse_price(self.starting_price)
+            reset.append(("starting_price", self.starting_price))
+        min_increment = price_or_none(self.min_increment)
+        if min_increment is None or min_increment <= 0:
+            self.min_increment = self.DEFAULT_MIN_INCREMENT
+            reset.append(("min_increment", self.min_increment))
+        max_price = price_or_none(self.max_price)
+        if max_price is None or max_price <= starting_price:
+            self.max_price = self.DEFAULT_MAX_PRICE
+            reset.append(("max_price", self.max_price))
+        
+        # Các vật phẩm sau trong catalog (ghi giá trị mặc định vào entry của file)
+        for entry, item in zip(self.catalog[1:], self.get_catalog()[1:]):
+            auction_id = item["auction_id"]
+            if not item["item_name"] or not str(item["item_name"]).strip():
+                entry["item_name"] = self.DEFAULT_ITEM_NAME
+                reset.append((f"{auction_id}.item_name", self.DEFAULT_ITEM_NAME))
+            if item["auction_duration"] < 10:
+                entry["auction_duration"] = self.DEFAULT_DURATION
+                reset.append((f"{auction_id}.auction_duration", self.DEFAULT_DURATION))
+            starting_price = price_or_none(item["starting_price"])
+            if starting_price is None or starting_price <= 0:
+                entry["starting_price"] = self.DEFAULT_STARTING_PRICE
+                starting_price = parse_price(self.DEFAULT_STARTING_PRICE)
+                reset.append((f"{auction_id}.starting_price", self.DEFAULT_STARTING_PRICE))
+            min_increment = price_or_none(item["min_increment"])
+            if min_increment is None or min_increment <= 0:
+                entry["min_increment"] = self.DEFAULT_MIN_INCREMENT
+                reset.append((f"{auction_id}.min_increment", self.DEFAULT_MIN_INCREMENT))
+            max_price = price_or_none(item["max_price"])
+            if max_price is None or max_price <= starting_price:
+                entry["max_price"] = self.DEFAULT_MAX_PRICE
+                reset.append((f"{auction_id}.max_price", self.DEFAULT_MAX_PRICE))
+        
+        return reset
+    
     def print_config(self):
         """
         In ra cấu hình hiện tại (dùng để debug/confirm)
@@ -185,9 +720,72 @@ Examples:
         print(f"💰 Giá khởi điểm : ${self.starting_price}")
         print(f"⏰ Thời gian     : {self.auction_duration} giây ({self.auction_duration // 60}:{self.auction_duration % 60:02d})")
         print(f"📝 Mô tả         : {self.description}")
+        catalog = self.get_catalog()
+        if len(catalog) > 1:
+            print(f"🗂️  Catalog       : {len(catalog)} vật phẩm")
+            for item in catalog:
+                print(f"   - {item['auction_id']}: {item['item_name']} "
+                      f"(${item['starting_price']}, {item['auction_duration']}s)")
+        print(f"⚙️  Chế độ server : {self.server_mode}")
+        print(f"📤 Hàng đợi gửi  : {self.outbox_size} message/client ({self.overflow_policy})")
+        print(f"⏱️  Chế độ timer  : {self.timer_mode} (sync mỗi {self.sync_interval}s)")
+        print(f"🪜 Bước giá      : ${self.min_increment} (tối đa ${self.max_price})")
+        if self.soft_close_window > 0:
+            print(f"⏳ Soft-close    : bid trong {self.soft_close_window}s cuối → "
+                  f"+{self.soft_close_extension}s (tối đa +{self.soft_close_max}s)")
+        if self.bid_rate > 0 or self.user_bid_rate > 0:
+            print(f"🚦 Giới hạn BID  : {self.bid_rate}/s mỗi kết nối (burst {self.bid_burst}), "
+                  f"{self.user_bid_rate}/s mỗi user (burst {self.user_bid_burst})")
+        if self.bid_batch_ms > 0:
+            print(f"📦 Gom BID       : mỗi lượt {self.bid_batch_ms}ms, 1 NEW_PRICE / lượt")
+        if self.journal_path:
+            print(f"💾 Bid journal   : {self.journal_path} "
+                  f"(fsync mỗi {self.journal_interval_ms}ms / {self.journal_batch} bids)")
+        print(f"📝 Log           : {self.log_level} ({self.log_format})")
+        if self.metrics_port > 0:
+            print(f"📈 Metrics       : http://{self.metrics_host}:{self.metrics_port}/metrics")
+        if self.lock_profile:
+            print("🔒 Lock profile  : bật (wait / hold / call site của AuctionState, AuctionHub)")
         print(f"📌 Nguồn config  : {self.config_source}")
         print("=" * 60)
     
+    def get_catalog(self):
+        """
+        Danh sách vật phẩm đấu giá đã chuẩn hóa
+        
+        Vật phẩm đầu tiên lấy từ các trường của config (đã áp dụng command line),
+        các vật phẩm sau lấy từ file (thiếu trường → giá trị mặc định).
+        
+        Returns:
+            list: Các dict {auction_id, item_name, starting_price, auction_duration,
+                  description, min_increment, max_price} (giá theo đơn vị)
+        """
+        catalog = [{
+            "auction_id": self.auction_id,
+            "item_name": self.item_name,
+            "starting_price": self.starting_price,
+            "auction_duration": self.auction_duration,
+            "description": self.description,
+            "min_increment": self.min_increment,
+            "max_price": self.max_price
+        }]
+        
+        for index, entry in enumerate(self.catalog[1:], start=2):
+            catalog.append({
+                "auction_id": entry.get("auction_id", f"auction-{index}"),
+                "item_name": entry.get("item_name", self.DEFAULT_ITEM_NAME),
+                "starting_price": entry.get("starting_price", self.DEFAULT_STARTING_PRICE),
+                "auction_duration": entry.get("auction_duration", self.DEFAULT_DURATION),
+                "description": entry.get("description", self.DEFAULT_DESCRIPTION),
+                # Bước giá / giá tối đa: riêng từng vật phẩm, mặc định theo thiết lập chung
+                "min_increment": entry.get("min_increment", self.catalog_settings.get(
+                    "min_increment", self.DEFAULT_MIN_INCREMENT)),
+                "max_price": entry.get("max_price", self.catalog_settings.get(
+                    "max_price", self.DEFAULT_MAX_PRICE))
+            })
+        
+        return catalog
+    
     def to_dict(self):
         """
         Chuyển config thành dictionary (để gửi qua JSON)
@@ -218,6 +816,14 @@ def load_auction_config():
     if not is_valid:
         print(f"[CONFIG] ❌ Lỗi: {error_msg}")
         print("[CONFIG] Sử dụng giá trị mặc định")
+        for field, default in config.reset_invalid_fields():
+            print(f"[CONFIG] ↩️  {field} không hợp lệ → dùng mặc định {default}")
+        
+        # Lỗi giá trị mặc định không sửa được (VD: auction_id trùng) → không khởi động
+        is_valid, error_msg = config.validate()
+        if not is_valid:
+            print(f"[CONFIG] ❌ Không khởi động được: {error_msg}")
+            sys.exit(1)
     
     # Print config
     config.print_config()
@@ -6,15 +6,35 @@ Nhiệm vụ chính:
 2. Broadcast messages đến tất cả clients (realtime)
 3. Xử lý add/remove clients thread-safe
 4. Cung cấp các hàm broadcast chuyên biệt (NEW_PRICE, WINNER, etc.)
+5. Mỗi client có 1 outbox (hàng đợi gửi giới hạn + writer riêng)
+   → 1 client chậm không làm block AuctionScheduler hay ClientThread khác
+6. Encode mỗi sự kiện 1 lần duy nhất: cùng 1 frame bytes cho mọi client
+   (chi phí broadcast = O(clients × send), không phải O(clients × serialize))
+7. Phòng theo phiên đấu giá (rooms): sự kiện của 1 phiên chỉ gửi đến các
+   client đã SUBSCRIBE phiên đó (client mới tự vào phòng của phiên mặc định)
 
 Thread-Safety:
 - Sử dụng threading.Lock() để bảo vệ danh sách clients
 - Mỗi thao tác với clients dict phải acquire lock
+- rooms/subscriptions được cập nhật từng phần khi connect/disconnect/SUBSCRIBE
+  (cùng lock với clients), broadcast chỉ copy danh sách outbox của 1 phòng
 """
 
-import threading
-import json
 import socket
+import time
+
+from event_log import log
+from latency import FanoutTimer
+from lock_profile import lock_profiler
+from counters import TrafficStats
+from message_framing import encode_message, FrameCache
+from outbound_queue import (
+    ThreadedOutbox,
+    BackpressureStats,
+    DEFAULT_OUTBOX_SIZE,
+    DEFAULT_OVERFLOW_POLICY
+)
+from pricing import format_price, to_units
 
 
 class AuctionHub:
@@ -23,39 +43,101 @@ class AuctionHub:
     
     Attributes:
         clients (dict): Dictionary mapping {socket: client_id}
+        outboxes (dict): Dictionary mapping {socket: ClientOutbox}
+        rooms (dict): Dictionary mapping {auction_id: {socket: ClientOutbox}}
+        subscriptions (dict): Dictionary mapping {socket: set(auction_id)}
+        default_auction_id (str): Phòng client tự tham gia khi kết nối
         auction_state: Reference đến AuctionState để lấy thông tin
         lock (threading.Lock): Lock để đồng bộ hóa truy cập clients dict
+            (ProfiledLock khi bật --lock-profile)
+        backpressure_stats (BackpressureStats): Số lần các chính sách overflow được kích hoạt
+        traffic (TrafficStats): Số kết nối, bytes nhận/gửi (đọc không cần lock - metrics.py)
+        frame_cache (FrameCache): Cache các frame hay gửi (WELCOME, UPDATE_TIMER, ERROR)
+        rate_limiter (BidRateLimiter): Giới hạn tốc độ BID (None = không giới hạn)
+        bid_batcher (BidBatcher): Gom BID theo lượt (None = xử lý từng BID)
     """
     
-    def __init__(self, auction_state):
+    def __init__(self, auction_state, outbox_size=DEFAULT_OUTBOX_SIZE,
+                 overflow_policy=DEFAULT_OVERFLOW_POLICY):
         """
         Khởi tạo Auction Hub
         
         Args:
             auction_state: Reference đến AuctionState object
+            outbox_size (int): Số frame tối đa trong hàng đợi gửi của mỗi client
+            overflow_policy (str): Chính sách khi hàng đợi đầy
+                ("drop_timer", "latest_price", "disconnect")
         """
         self.clients = {}  # {socket: client_id}
+        self.outboxes = {}  # {socket: ClientOutbox}
+        self.rooms = {}  # {auction_id: {socket: ClientOutbox}}
+        self.subscriptions = {}  # {socket: set(auction_id)}
         self.auction_state = auction_state
+        self.default_auction_id = auction_state.auction_id
+        self.outbox_size = outbox_size
+        self.overflow_policy = overflow_policy
+        self.backpressure_stats = BackpressureStats()
+        self.traffic = TrafficStats()
+        self.frame_cache = FrameCache()
+        
+        # Các AuctionTimer {auction_id: AuctionTimer} (main_server gán)
+        # dùng để gửi TIMER_SYNC cho client vào giữa phiên
+        self.auction_timers = {}
+        
+        # BidRateLimiter dùng chung cho mọi session (main_server gán, None = không giới hạn)
+        self.rate_limiter = None
+        
+        # BidBatcher khi bật micro-batching (main_server gán, None = xử lý từng BID)
+        self.bid_batcher = None
         
         # QUAN TRỌNG: Lock để bảo vệ clients dictionary
         # Tránh Race Condition khi nhiều threads add/remove clients đồng thời
-        self.lock = threading.Lock()
+        # (--lock-profile: ProfiledLock đo wait / hold / call site, xem lock_profile.py)
+        self.lock = lock_profiler.make_lock("AuctionHub.lock")
         
         print("[AUCTION_HUB] Khởi tạo Hub - Sẵn sàng quản lý clients")
     
-    def add_client(self, client_socket, client_id):
+    def outbox_options(self):
+        """
+        Tham số dùng chung để tạo outbox cho 1 client
+        
+        Returns:
+            dict: max_size, policy, stats, traffic
+        """
+        return {
+            "max_size": self.outbox_size,
+            "policy": self.overflow_policy,
+            "stats": self.backpressure_stats,
+            "traffic": self.traffic
+        }
+    
+    def add_client(self, client_socket, client_id, outbox=None):
         """
         Thêm client mới vào danh sách (thread-safe)
         
         Args:
             client_socket: Socket object của client
             client_id (str): ID duy nhất của client
+            outbox (ClientOutbox, optional): Outbox đã tạo sẵn (chế độ async).
+                Nếu None → tạo ThreadedOutbox với writer thread riêng
         """
+        if outbox is None:
+            outbox = ThreadedOutbox(client_socket, client_id, **self.outbox_options())
+            outbox.start()
+        
+        # Client chậm / lỗi gửi → ngắt kết nối client đó
+        outbox.on_disconnect = lambda _outbox: self.disconnect_client(client_socket)
+        
         with self.lock:
             self.clients[client_socket] = client_id
+            self.outboxes[client_socket] = outbox
+            self.subscriptions[client_socket] = {self.default_auction_id}
+            self.rooms.setdefault(self.default_auction_id, {})[client_socket] = outbox
             client_count = len(self.clients)
+        self.traffic.connected.increment()
+        self.traffic.connections.increment()
         
-        print(f"[AUCTION_HUB] ➕ Thêm client: {client_id} (Tổng: {client_count})")
+        log.info("AUCTION_HUB", "➕ Thêm client", client_id=client_id, clients=client_count)
     
     def remove_client(self, client_socket):
         """
@@ -64,12 +146,152 @@ class AuctionHub:
         Args:
             client_socket: Socket object cần xóa
         """
+        outbox = None
+        
         with self.lock:
             if client_socket in self.clients:
                 client_id = self.clients[client_socket]
                 del self.clients[client_socket]
+                outbox = self.outboxes.pop(client_socket, None)
+                # Chỉ rời các phòng client đã tham gia (không quét mọi phòng)
+                for auction_id in self.subscriptions.pop(client_socket, ()):
+                    self.rooms.get(auction_id, {}).pop(client_socket, None)
                 client_count = len(self.clients)
-                print(f"[AUCTION_HUB] ➖ Xóa client: {client_id} (Còn lại: {client_count})")
+                log.info("AUCTION_HUB", "➖ Xóa client", client_id=client_id, clients=client_count)
+        
+        # Dừng writer của client (ngoài lock)
+        if outbox:
+            self.traffic.connected.increment(-1)
+            outbox.close()
+    
+    def subscribe(self, client_socket, auction_id):
+        """
+        Cho client vào phòng của 1 phiên đấu giá (thread-safe)
+        
+        Args:
+            client_socket: Socket object của client
+            auction_id (str): ID phiên đấu giá
+        
+        Returns:
+            bool: True nếu client mới vào phòng (False nếu đã ở trong phòng
+                hoặc client không còn kết nối)
+        """
+        with self.lock:
+            outbox = self.outboxes.get(client_socket)
+            subscribed = self.subscriptions.get(client_socket)
+            if outbox is None or auction_id in subscribed:
+                return False
+            
+            subscribed.add(auction_id)
+            self.rooms.setdefault(auction_id, {})[client_socket] = outbox
+            return True
+    
+    def unsubscribe(self, client_socket, auction_id):
+        """
+        Cho client rời phòng của 1 phiên đấu giá (thread-safe)
+        
+        Args:
+            client_socket: Socket object của client
+            auction_id (str): ID phiên đấu giá
+        
+        Returns:
+            bool: True nếu client đã ở trong phòng
+        """
+        with self.lock:
+            subscribed = self.subscriptions.get(client_socket)
+            if not subscribed or auction_id not in subscribed:
+                return False
+            
+            subscribed.discard(auction_id)
+            self.rooms.get(auction_id, {}).pop(client_socket, None)
+            return True
+    
+    def is_subscribed(self, client_socket, auction_id):
+        """
+        Returns:
+            bool: True nếu client đang ở trong phòng của auction_id
+        """
+        return auction_id in self.subscriptions.get(client_socket, ())
+    
+    def get_room_sizes(self):
+        """
+        Số client trong mỗi phòng (thread-safe)
+        
+        Returns:
+            dict: {auction_id: số client}
+        """
+        with self.lock:
+            return {auction_id: len(room) for auction_id, room in self.rooms.items()}
+    
+    def disconnect_client(self, client_socket):
+        """
+        Ngắt kết nối 1 client (client quá chậm hoặc lỗi gửi)
+        
+        shutdown() làm recv() của ClientThread trả về ngay → thread tự cleanup
+        
+        Args:
+            client_socket: Socket object cần ngắt
+        """
+        self.remove_client(client_socket)
+        
+        try:
+            client_socket.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+        try:
+            client_socket.close()
+        except Exception:
+            pass
+    
+    def send_to_client(self, client_socket, message_dict):
+        """
+        Gửi message đến 1 client qua outbox của client đó
+        
+        Args:
+            client_socket: Socket object của client
+            message_dict (dict): Message cần gửi
+        
+        Returns:
+            bool: True nếu message được đưa vào hàng đợi
+        """
+        return self.send_frame_to_client(
+            client_socket, encode_message(message_dict), message_dict.get("type")
+        )
+    
+    def send_frame_to_client(self, client_socket, frame, msg_type=None):
+        """
+        Gửi 1 frame đã encode sẵn đến 1 client
+        
+        Args:
+            client_socket: Socket object của client
+            frame (bytes): Frame đã encode (VD: từ frame_cache)
+            msg_type (str): Loại message
+        
+        Returns:
+            bool: True nếu frame được đưa vào hàng đợi
+        """
+        with self.lock:
+            outbox = self.outboxes.get(client_socket)
+        
+        if outbox is None:
+            return False
+        
+        return outbox.put(frame, msg_type)
+    
+    def send_error_to_client(self, client_socket, error_message):
+        """
+        Gửi ERROR đến 1 client (frame lấy từ cache, không json.dumps lại)
+        
+        Args:
+            client_socket: Socket object của client
+            error_message (str): Nội dung lỗi
+        
+        Returns:
+            bool: True nếu frame được đưa vào hàng đợi
+        """
+        return self.send_frame_to_client(
+            client_socket, self.frame_cache.error_frame(error_message), "ERROR"
+        )
     
     def get_client_count(self):
         """
@@ -81,55 +303,99 @@ class AuctionHub:
         with self.lock:
             return len(self.clients)
     
-    def broadcast_message(self, message_dict):
+    def broadcast_message(self, message_dict, auction_id=None, coalesce_key=None, received_ns=None,
+                          version=None):
         """
-        Broadcast message đến TẤT CẢ clients
+        Broadcast message đến TẤT CẢ clients (hoặc các client trong 1 phòng)
         
         Đây là hàm CORE của Hub - được gọi bởi:
         - ClientThread: Khi có BID mới (broadcast NEW_PRICE)
-        - TimerThread: Mỗi giây (broadcast UPDATE_TIMER)
+        - AuctionScheduler: Mỗi giây (broadcast UPDATE_TIMER)
         - Server: Khi shutdown (broadcast SHUTDOWN)
         
         Args:
             message_dict (dict): Dictionary chứa message data
                 Format: {"type": "...", "message": "...", ...}
+            auction_id (str, optional): Chỉ gửi cho phòng của phiên này
+                (None → mọi client, VD: SHUTDOWN)
+            coalesce_key (optional): Khóa gộp NEW_PRICE / UPDATE_TIMER chưa gửi
+                (mặc định auction_id)
+            received_ns (int, optional): perf_counter_ns lúc nhận BID gây ra
+                message này → đo broadcast_enqueue / last_send / total
+            version (int, optional): Version snapshot của NEW_PRICE (outbox không
+                để NEW_PRICE cũ hơn thay thế NEW_PRICE mới hơn đang chờ gửi)
         
         Thread-Safety:
-        - Tạo snapshot của clients list để tránh modification during iteration
-        - Xử lý từng client trong snapshot (không hold lock lâu)
+        - Tạo snapshot của outboxes để tránh modification during iteration
+        - Chỉ đưa frame vào hàng đợi của từng client (không block vì client chậm)
         """
-        # Tạo JSON string từ dict
+        # Encode 1 lần duy nhất cho mọi client
         try:
-            message_json = json.dumps(message_dict) + "\n"
-            message_bytes = message_json.encode('utf-8')
+            message_bytes = encode_message(message_dict)
         except Exception as e:
-            print(f"[AUCTION_HUB] ❌ Lỗi encode message: {e}")
+            log.error("AUCTION_HUB", "❌ Lỗi encode message", error=e)
             return
         
-        # Tạo snapshot của clients để tránh modification during iteration
+        self.broadcast_frame(message_bytes, message_dict.get("type"), auction_id, coalesce_key,
+                             received_ns, version)
+    
+    def broadcast_frame(self, frame, msg_type=None, auction_id=None, coalesce_key=None,
+                        received_ns=None, version=None):
+        """
+        Broadcast 1 frame đã encode sẵn đến TẤT CẢ clients (hoặc 1 phòng)
+        
+        Cùng 1 object bytes (immutable) được đưa vào outbox của mọi client,
+        không copy hay serialize lại cho từng client.
+        
+        Args:
+            frame (bytes): Frame đã encode
+            msg_type (str): Loại message (để outbox áp dụng chính sách overflow)
+            auction_id (str, optional): Chỉ gửi cho phòng của phiên này
+            coalesce_key (optional): Khóa gộp trong outbox (mặc định auction_id)
+            received_ns (int, optional): Xem broadcast_message
+            version (int, optional): Xem broadcast_message
+        """
+        started_ns = time.perf_counter_ns()
+        if coalesce_key is None:
+            coalesce_key = auction_id
+        
+        # Tạo snapshot của outboxes để tránh modification during iteration
+        # (chỉ copy các outbox trong phòng → client xem phiên khác không bị đánh thức)
         with self.lock:
-            clients_snapshot = list(self.clients.items())
+            if auction_id is None:
+                outboxes_snapshot = list(self.outboxes.values())
+            else:
+                outboxes_snapshot = list(self.rooms.get(auction_id, {}).values())
         
-        # Broadcast đến từng client
-        failed_sockets = []
+        # Đưa frame vào hàng đợi của từng client
+        # (client tràn hàng đợi sẽ bị ngắt bởi outbox.on_disconnect)
+        # NEW_PRICE chưa gửi chỉ bị thay bởi giá mới của cùng phiên (cùng khóa gộp)
+        if received_ns is None:
+            for outbox in outboxes_snapshot:
+                outbox.put(frame, msg_type, coalesce_key, version=version)
+            return
         
-        for client_socket, client_id in clients_snapshot:
-            try:
-                client_socket.sendall(message_bytes)
-            except socket.error as e:
-                # Client đã disconnect hoặc socket error
-                print(f"[AUCTION_HUB] ⚠️ Không gửi được đến {client_id}: {e}")
-                failed_sockets.append(client_socket)
-            except Exception as e:
-                print(f"[AUCTION_HUB] ❌ Lỗi broadcast đến {client_id}: {e}")
-                failed_sockets.append(client_socket)
+        # Đo độ trễ: writer của người nhận cuối cùng gửi xong → ghi last_send / total
+        fanout = FanoutTimer(received_ns, len(outboxes_snapshot))
+        for outbox in outboxes_snapshot:
+            if not outbox.put(frame, msg_type, coalesce_key, fanout, version):
+                fanout.done()
+        fanout.enqueued(started_ns)
+    
+    def broadcast_timer(self, remaining, auction_id=None):
+        """
+        Broadcast UPDATE_TIMER (frame lấy từ cache theo giá trị remaining)
         
-        # Cleanup các sockets failed
-        if failed_sockets:
-            for sock in failed_sockets:
-                self.remove_client(sock)
+        Args:
+            remaining (int): Số giây còn lại
+            auction_id (str, optional): Phiên đấu giá
+        """
+        self.broadcast_frame(
+            self.frame_cache.timer_frame(remaining, auction_id), "UPDATE_TIMER", auction_id
+        )
     
-    def broadcast_new_price(self, user, value):
+    def broadcast_new_price(self, user, value, auction_id=None, extension=None, version=None,
+                            received_ns=None):
         """
         Broadcast khi có giá mới (NEW_PRICE event)
         
@@ -137,50 +403,71 @@ class AuctionHub:
         
         Args:
             user (str): Tên người đặt giá
-            value (float): Giá mới
+            value (int): Giá mới (cents)
+            auction_id (str, optional): Phiên đấu giá
+            extension (dict, optional): Soft-close - deadline mới ghép vào cùng
+                NEW_PRICE (extended_by, deadline, server_time, remaining)
+            version (int, optional): Version snapshot của giá này - các thread
+                broadcast song song có thể gửi lệch thứ tự, client bỏ NEW_PRICE
+                có version nhỏ hơn version đã thấy, outbox không để nó thay thế
+                NEW_PRICE mới hơn đang chờ gửi
+            received_ns (int, optional): perf_counter_ns lúc nhận BID (đo độ trễ)
         """
         message = {
             "type": "NEW_PRICE",
             "user": user,
-            "value": value,
-            "message": f"{user} đã đặt giá ${value}"
+            "value": to_units(value),
+            "value_cents": value,
+            "message": f"{user} đã đặt giá ${format_price(value)}"
         }
+        if auction_id is not None:
+            message["auction_id"] = auction_id
+        if version is not None:
+            message["version"] = version
+        coalesce_key = None
+        if extension:
+            message.update(extension)
+            message["message"] += f" - gia hạn thêm {extension['extended_by']} giây"
+            # NEW_PRICE mang deadline mới chỉ được thay bởi NEW_PRICE cũng mang
+            # deadline (deadline sau luôn mới hơn) - giá thường không được làm mất nó
+            coalesce_key = (auction_id, "deadline")
         
-        print(f"[AUCTION_HUB] 📢 Broadcast NEW_PRICE: {user} = ${value}")
-        self.broadcast_message(message)
+        log.info("AUCTION_HUB", "📢 Broadcast NEW_PRICE", auction_id=auction_id, user=user, price=value)
+        self.broadcast_message(message, auction_id, coalesce_key, received_ns, version)
     
     def broadcast_winner(self, user, value):
         """
         Broadcast thông báo người thắng cuộc
         
-        Được gọi bởi TimerThread khi đấu giá kết thúc
+        Được gọi bởi AuctionTimer khi đấu giá kết thúc
         
         Args:
             user (str): Tên người thắng
-            value (float): Giá thắng
+            value (int): Giá thắng (cents)
         """
         message = {
             "type": "WINNER",
             "user": user,
-            "value": value,
-            "message": f"🎉 Chúc mừng {user} đã thắng với giá ${value}!"
+            "value": to_units(value),
+            "value_cents": value,
+            "message": f"🎉 Chúc mừng {user} đã thắng với giá ${format_price(value)}!"
         }
         
-        print(f"[AUCTION_HUB] 🏆 Broadcast WINNER: {user} = ${value}")
+        log.info("AUCTION_HUB", "🏆 Broadcast WINNER", user=user, price=value)
         self.broadcast_message(message)
     
     def broadcast_no_winner(self):
         """
         Broadcast khi không có người thắng (không ai bid)
         
-        Được gọi bởi TimerThread khi đấu giá kết thúc nhưng không có bid
+        Được gọi bởi AuctionTimer khi đấu giá kết thúc nhưng không có bid
         """
         message = {
             "type": "NO_WINNER",
             "message": "⚠️ Phiên đấu giá kết thúc - Không có người thắng"
         }
         
-        print("[AUCTION_HUB] ⚠️ Broadcast NO_WINNER")
+        log.info("AUCTION_HUB", "⚠️ Broadcast NO_WINNER")
         self.broadcast_message(message)
     
     def broadcast_shutdown(self):
@@ -194,7 +481,7 @@ class AuctionHub:
             "message": "Server đang shutdown. Cảm ơn đã tham gia!"
         }
         
-        print("[AUCTION_HUB] 🛑 Broadcast SHUTDOWN")
+        log.info("AUCTION_HUB", "🛑 Broadcast SHUTDOWN")
         self.broadcast_message(message)
     
     def close_all_clients(self):
@@ -207,19 +494,61 @@ class AuctionHub:
         
         with self.lock:
             clients_snapshot = list(self.clients.items())
+            outboxes_snapshot = list(self.outboxes.values())
+        
+        # Cho các writer tối đa 1 giây để gửi nốt (VD: SHUTDOWN)
+        deadline = time.monotonic() + 1.0
+        for outbox in outboxes_snapshot:
+            outbox.flush(max(0.0, deadline - time.monotonic()))
+            outbox.close()
         
         for client_socket, client_id in clients_snapshot:
+            try:
+                # shutdown() làm recv() đang block của ClientThread trả về ngay
+                # (chỉ close() từ thread khác không đánh thức recv())
+                client_socket.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
             try:
                 client_socket.close()
-                print(f"[AUCTION_HUB] Đã đóng {client_id}")
+                log.debug("AUCTION_HUB", "Đã đóng client", client_id=client_id)
             except Exception as e:
-                print(f"[AUCTION_HUB] Lỗi khi đóng {client_id}: {e}")
+                log.warning("AUCTION_HUB", "Lỗi khi đóng client", client_id=client_id, error=e)
         
         # Clear danh sách
         with self.lock:
             self.clients.clear()
+            self.outboxes.clear()
+            self.rooms.clear()
+            self.subscriptions.clear()
         
         print(f"[AUCTION_HUB] Đã đóng tất cả {len(clients_snapshot)} clients")
+        
+        stats = self.get_backpressure_stats()
+        print(f"[AUCTION_HUB] Backpressure: {stats}")
+        if self.rate_limiter is not None:
+            print(f"[AUCTION_HUB] Rate limit: {self.rate_limiter.get_stats()}")
+    
+    def get_outboxes(self):
+        """
+        Lấy danh sách outboxes hiện tại (snapshot)
+        
+        Returns:
+            list: Các ClientOutbox
+        """
+        with self.lock:
+            return list(self.outboxes.values())
+    
+    def get_backpressure_stats(self):
+        """
+        Thống kê chính sách overflow + tổng số frame đang chờ gửi
+        
+        Returns:
+            dict: dropped_timer, collapsed_price, disconnected, queued_frames
+        """
+        stats = self.backpressure_stats.to_dict()
+        stats["queued_frames"] = sum(outbox.pending() for outbox in self.get_outboxes())
+        return stats
     
     def get_clients_info(self):
         """
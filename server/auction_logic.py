@@ -4,15 +4,64 @@ Auction Logic Module - Quản lý trạng thái đấu giá
 Nhiệm vụ chính:
 1. Duy trì giá cao nhất (current_price) và người thắng cuộc (current_winner)
 2. Áp dụng Lock/Mutex để bảo vệ biến trạng thái khi nhiều threads truy cập đồng thời
-3. Xử lý logic place_bid với validation
+3. Xử lý logic place_bid với validation (bước giá tối thiểu, giá tối đa)
+4. Đấu giá tự động (proxy bid): giữ ceiling ẩn của người chơi và tự trả giá
+   thay họ theo kiểu eBay (xem proxy_bidding.py)
+5. Soft-close (chống bắn tỉa): bid được chấp nhận trong soft_close_window giây
+   cuối dời deadline thêm soft_close_extension giây (tổng tối đa soft_close_max)
+6. Micro-batching (tùy chọn): place_bid_batch xử lý cả 1 lượt bid trong 1 lần
+   lock (xem bid_batcher.py)
 
 Thread-Safety:
 - Sử dụng threading.Lock() để đảm bảo thread-safe operations
 - Mỗi thao tác đọc/ghi current_price và current_winner đều phải acquire lock
 - Tránh Race Condition khi nhiều clients bid cùng lúc
+- Deadline cũng nằm trong lock: dời deadline (place_bid) và đóng phiên (close)
+  loại trừ nhau → không có bid nào được chấp nhận sau khi phiên đã đóng,
+  và phiên không đóng khi 1 bid vừa dời deadline
+
+Read path không lock (snapshot):
+- Mỗi lần trạng thái đổi, writer (đang giữ lock) tạo 1 AuctionSnapshot bất biến
+  (version, price, winner, is_open, deadline) và gán vào self.snapshot
+- Gán 1 attribute là thao tác nguyên tử → reader (WELCOME, CATALOG, thống kê)
+  chỉ đọc self.snapshot 1 lần, không tranh lock với place_bid và luôn thấy
+  cặp (price, winner) nhất quán
+- version tăng dần: client so version để bỏ NEW_PRICE cũ hơn WELCOME đã nhận
+
+Từ chối sớm (optimistic, trước lock):
+- Giá chỉ tăng → bid không vượt được giá của 1 snapshot cũ thì chắc chắn
+  không vượt được giá hiện tại → place_bid từ chối ngay, không xếp hàng chờ lock
+- Chỉ bid có thể thắng mới vào critical section (kiểm tra lại trong lock)
+- Deadline KHÔNG kiểm tra trước lock: soft-close có thể đã dời deadline
+  mà snapshot đang đọc chưa thấy
+
+Giá:
+- Mọi giá trong AuctionState là số nguyên cents (xem pricing.py)
+- So sánh và lưu lịch sử đều là phép toán số nguyên, không có sai số float
 """
 
-import threading
+import time
+from collections import namedtuple
+
+from bid_history import BidHistory
+from counters import AtomicCounter
+from event_log import log
+from latency import TimedLock
+from lock_profile import lock_profiler
+from proxy_bidding import ProxyBook
+from pricing import DEFAULT_MAX_PRICE, CENTS_PER_UNIT, check_bid, format_price, to_units
+
+# auction_id mặc định khi chỉ có 1 vật phẩm (trùng với auction_registry)
+DEFAULT_AUCTION_ID = "auction-1"
+
+# Kết quả của 1 bid làm giá thay đổi:
+# price/winner sau khi proxy đã trả giá, extended = số giây deadline vừa được
+# dời (0 nếu không), deadline = deadline mới theo time.monotonic() (hoặc None)
+# version = version của snapshot công bố cùng thay đổi này
+BidUpdate = namedtuple("BidUpdate", ["price", "winner", "extended", "deadline", "version"])
+
+# Ảnh chụp bất biến của trạng thái phiên (đọc không cần lock)
+AuctionSnapshot = namedtuple("AuctionSnapshot", ["version", "price", "winner", "is_open", "deadline"])
 
 
 class AuctionState:
@@ -20,35 +69,87 @@ class AuctionState:
     Class quản lý trạng thái đấu giá (Auction State)
     
     Attributes:
-        starting_price (float): Giá khởi điểm
-        current_price (float): Giá cao nhất hiện tại
+        starting_price (int): Giá khởi điểm (cents)
+        current_price (int): Giá cao nhất hiện tại (cents)
+        min_increment (int): Bước giá tối thiểu (cents)
+        max_price (int): Giá tối đa được phép đặt (cents)
         current_winner (str): Tên người đang thắng
         item_name (str): Tên vật phẩm đấu giá
         description (str): Mô tả vật phẩm
+        auction_id (str): ID của phiên đấu giá (dùng trong AuctionRegistry)
+        is_open (bool): Phiên còn nhận bid hay đã kết thúc
+        journal (BidJournal): Write-ahead bid journal (None = không ghi)
+        history (BidHistory): Lịch sử mọi bid được chấp nhận (dạng cột)
+        proxies (ProxyBook): Ceiling của các proxy bid (max-heap)
+        standing_seq (int): Số thứ tự của bid đang dẫn (phân xử khi bằng giá)
+        deadline (float): Deadline theo time.monotonic() (None khi chưa bắt đầu)
+        soft_close_window (float): Bid trong N giây cuối sẽ dời deadline (0 = tắt)
+        soft_close_extension (float): Số giây dời mỗi lần
+        soft_close_max (float): Tổng số giây được dời tối đa
+        extension_total (float): Tổng số giây đã dời
+        snapshot (AuctionSnapshot): Trạng thái công bố gần nhất (đọc không lock)
+        fast_rejects (AtomicCounter): Số bid bị từ chối trước lock (so với snapshot)
+        locked_rejects (int): Số bid vào được lock rồi mới bị từ chối
+        accepted_bids (int): Số bid thường được chấp nhận
         lock (threading.Lock): Lock để đồng bộ hóa truy cập
+            (ProfiledLock khi bật --lock-profile)
     """
     
-    def __init__(self, starting_price, item_name, description):
+    def __init__(self, starting_price, item_name, description, auction_id=DEFAULT_AUCTION_ID,
+                 min_increment=1, max_price=DEFAULT_MAX_PRICE * CENTS_PER_UNIT,
+                 soft_close_window=0, soft_close_extension=0, soft_close_max=0):
         """
         Khởi tạo trạng thái đấu giá
         
         Args:
-            starting_price (float): Giá khởi điểm
+            starting_price (int): Giá khởi điểm (cents)
             item_name (str): Tên vật phẩm đấu giá
             description (str): Mô tả vật phẩm
+            auction_id (str): ID của phiên đấu giá (mặc định "auction-1")
+            min_increment (int): Bước giá tối thiểu (cents, mặc định 1 cent)
+            max_price (int): Giá tối đa được phép đặt (cents)
+            soft_close_window (float): Soft-close - cửa sổ cuối phiên (giây, 0 = tắt)
+            soft_close_extension (float): Soft-close - số giây dời mỗi lần
+            soft_close_max (float): Soft-close - tổng số giây dời tối đa
         """
+        self.auction_id = auction_id
+        self.is_open = True
         self.starting_price = starting_price
         self.current_price = starting_price
+        self.min_increment = min_increment
+        self.max_price = max_price
         self.current_winner = None  # Chưa có người thắng ban đầu
         self.item_name = item_name
         self.description = description
+        self.journal = None  # main_server gán khi bật --journal
+        self.history = BidHistory()
+        self.proxies = ProxyBook()
+        self.standing_seq = 0
+        
+        # Deadline do AuctionTimer đặt khi bắt đầu; soft-close dời trong place_bid
+        self.deadline = None
+        self.soft_close_window = soft_close_window
+        self.soft_close_extension = soft_close_extension
+        self.soft_close_max = soft_close_max
+        self.extension_total = 0
+        
+        # Snapshot chỉ được thay (không sửa) bởi writer đang giữ lock
+        self.snapshot = AuctionSnapshot(0, starting_price, None, True, None)
+        
+        # Thống kê từ chối: trước lock (AtomicCounter) / trong lock (int, đã giữ lock)
+        self.fast_rejects = AtomicCounter()
+        self.locked_rejects = 0
+        self.accepted_bids = 0
         
         # QUAN TRỌNG: Lock để bảo vệ current_price và current_winner
         # Tránh Race Condition khi nhiều client threads truy cập đồng thời
-        self.lock = threading.Lock()
+        # (--lock-profile: ProfiledLock đo wait / hold / call site, xem lock_profile.py)
+        self.lock = lock_profiler.make_lock(f"AuctionState[{auction_id}]")
+        # Đường BID / PROXY_BID dùng bản bọc để đo lock_wait / lock_hold (latency.py)
+        self.timed_lock = TimedLock(self.lock)
         
         print(f"[AUCTION_LOGIC] Khởi tạo đấu giá: {item_name}")
-        print(f"[AUCTION_LOGIC] Giá khởi điểm: ${starting_price}")
+        print(f"[AUCTION_LOGIC] Giá khởi điểm: ${format_price(starting_price)}")
         print(f"[AUCTION_LOGIC] Mô tả: {description}")
     
     def place_bid(self, user, value):
@@ -56,83 +157,417 @@ class AuctionState:
         Xử lý đặt giá (BID) từ client
         
         Logic:
+        0. Fast path: so với snapshot (không lock) - bid đã cũ bị từ chối ngay
         1. Acquire lock để đảm bảo thread-safe
-        2. Kiểm tra giá đặt có hợp lệ không (phải > current_price)
+        2. Kiểm tra giá đặt có hợp lệ không (>= current_price + min_increment, <= max_price)
         3. Nếu hợp lệ: cập nhật current_price và current_winner
-        4. Release lock
-        5. Trả về (success, message)
+        4. Proxy có ceiling >= giá vừa đặt tự trả giá lại (có thể vượt ngay)
+        5. Bid trong cửa sổ soft-close → dời deadline (cùng lần lock)
+        6. Công bố snapshot mới, release lock
+        7. Trả về (success, message, update)
         
         Args:
             user (str): Tên người đặt giá
-            value (float): Giá đặt
+            value (int): Giá đặt (cents, đã parse bằng pricing.parse_price)
         
         Returns:
-            tuple: (success: bool, message: str)
-                - success=True: Bid thành công
-                - success=False: Bid thất bại (giá thấp hơn)
+            tuple: (success: bool, message: str, update: BidUpdate or None)
+                - success=True: Bid hợp lệ, update = giá + người dẫn đầu sau khi
+                  các proxy đã trả giá (winner có thể không phải user) + gia hạn
+                - success=False: Bid thất bại (giá thấp hơn / vượt giá tối đa)
         
         Thread-Safety:
         - Sử dụng 'with self.lock' để tự động acquire/release lock
         - Đảm bảo không có 2 threads cùng thay đổi current_price
         """
-        # CRITICAL SECTION - Bảo vệ bởi Lock
-        with self.lock:
-            # Validation: Giá phải lớn hơn giá hiện tại
-            if value <= self.current_price:
-                error_msg = f"Giá phải lớn hơn ${self.current_price}"
-                return False, error_msg
+        now = time.monotonic()
+        
+        error_msg = self.precheck_bid(value)
+        if error_msg is not None:
+            return False, error_msg, None
+        
+        # CRITICAL SECTION - Bảo vệ bởi Lock (chỉ bid có thể thắng)
+        with self.timed_lock:
+            # Validation: Phiên phải còn mở (kể cả khi sự kiện end chưa kịp chạy)
+            if not self.is_open or (self.deadline is not None and now >= self.deadline):
+                self.locked_rejects += 1
+                return False, "Phiên đấu giá đã kết thúc", None
+            
+            # Validation: Giá phải >= giá hiện tại + bước giá (giá có thể đã tăng
+            # từ lúc đọc snapshot)
+            error_msg = check_bid(value, self.current_price, self.min_increment, self.max_price)
+            if error_msg is not None:
+                self.locked_rejects += 1
+                return False, error_msg, None
             
             # Validation passed - Cập nhật trạng thái
-            self.current_price = value
-            self.current_winner = user
+            self.accepted_bids += 1
+            self._apply_bid(user, value, self.proxies.next_seq())
+            
+            # Proxy đặt trước có ceiling >= value sẽ trả giá lại ngay
+            self._resolve_proxies()
             
-            success_msg = f"Bid thành công: {user} = ${value}"
-            print(f"[AUCTION_LOGIC] {success_msg}")
+            if self.current_winner == user:
+                success_msg = f"Bid thành công: {user} = ${format_price(value)}"
+            else:
+                success_msg = (f"Bid ${format_price(value)} đã bị đấu giá tự động vượt: "
+                               f"{self.current_winner} = ${format_price(self.current_price)}")
+            log.info("AUCTION_LOGIC", "Bid được chấp nhận", auction_id=self.auction_id, user=user,
+                     value=value, winner=self.current_winner, price=self.current_price)
             
-            return True, success_msg
+            return True, success_msg, self._make_update(now)
     
-    def get_current_price(self):
+    def precheck_bid(self, value):
+        """
+        Fast path của place_bid - kiểm tra 1 bid với snapshot, không lock
+        
+        Giá trong snapshot <= giá hiện tại và phiên đã đóng thì không mở lại
+        → lỗi ở đây chắc chắn cũng là lỗi trong lock (bid bị từ chối được đếm
+        vào fast_rejects). Không lỗi chưa có nghĩa là hợp lệ: phải kiểm tra lại
+        trong lock.
+        
+        Args:
+            value (int): Giá đặt (cents)
+        
+        Returns:
+            str or None: Nội dung lỗi, None nếu bid có thể thắng
         """
-        Lấy giá hiện tại (thread-safe)
+        snapshot = self.snapshot
+        if not snapshot.is_open:
+            self.fast_rejects.increment()
+            return "Phiên đấu giá đã kết thúc"
+        
+        error_msg = check_bid(value, snapshot.price, self.min_increment, self.max_price)
+        if error_msg is not None:
+            self.fast_rejects.increment()
+        return error_msg
+    
+    def place_bid_batch(self, bids):
+        """
+        Xử lý 1 lượt (window) bid trong 1 lần lock (chế độ micro-batching)
+        
+        Logic:
+        1. Mọi bid trong lượt được kiểm tra với giá TRƯỚC lượt
+        2. Bid hợp lệ cao nhất thắng; bằng giá → bid đến trước thắng
+        3. Chỉ bid thắng được ghi (history, journal) → 1 NEW_PRICE cho cả lượt
+        4. Các bid hợp lệ còn lại bị từ chối vì đã bị vượt trong cùng lượt
+        
+        Args:
+            bids (list): Các (user, value, arrival) theo thứ tự đến;
+                value theo cents, arrival = time.monotonic() lúc nhận bid
         
         Returns:
-            float: Giá cao nhất hiện tại
+            tuple: (results, update)
+                - results: list (success, message) cùng thứ tự với bids
+                - update: BidUpdate nếu giá thay đổi, None nếu không
+        """
+        results = [None] * len(bids)
+        
+        with self.timed_lock:
+            best = None
+            for index, (user, value, arrival) in enumerate(bids):
+                # Deadline so với lúc bid đến (không phải lúc xử lý lượt)
+                if not self.is_open or (self.deadline is not None and arrival >= self.deadline):
+                    results[index] = (False, "Phiên đấu giá đã kết thúc")
+                    continue
+                
+                error_msg = check_bid(value, self.current_price, self.min_increment, self.max_price)
+                if error_msg is not None:
+                    results[index] = (False, error_msg)
+                    continue
+                
+                # Chỉ thay khi cao hơn hẳn → bằng giá thì bid đến trước giữ chỗ
+                if best is None or value > bids[best][1]:
+                    best = index
+            
+            if best is None:
+                self.locked_rejects += len(bids)
+                return results, None
+            
+            user, value, arrival = bids[best]
+            self.accepted_bids += 1
+            self.locked_rejects += len(bids) - 1
+            self._apply_bid(user, value, self.proxies.next_seq())
+            self._resolve_proxies()
+            
+            if self.current_winner == user:
+                success_msg = f"Bid thành công: {user} = ${format_price(value)}"
+            else:
+                success_msg = (f"Bid ${format_price(value)} đã bị đấu giá tự động vượt: "
+                               f"{self.current_winner} = ${format_price(self.current_price)}")
+            results[best] = (True, success_msg)
+            
+            outbid_msg = (f"Giá đã bị vượt trong cùng lượt: {self.current_winner} = "
+                          f"${format_price(self.current_price)}")
+            for index, result in enumerate(results):
+                if result is None:
+                    results[index] = (False, outbid_msg)
+            
+            log.info("AUCTION_LOGIC", "Lượt bid được xử lý", auction_id=self.auction_id, bids=len(bids),
+                     user=user, value=value, winner=self.current_winner, price=self.current_price)
+            return results, self._make_update(arrival)
+    
+    def place_proxy_bid(self, user, ceiling):
+        """
+        Đăng ký / nâng giá tối đa ẩn của 1 người chơi (PROXY_BID)
+        
+        Server tự trả giá thay người chơi tới ceiling: giá hiện tại chỉ lên
+        tới mức cần để vượt đối thủ mạnh nhất (second-price + bước giá).
+        
+        Args:
+            user (str): Tên người đặt giá
+            ceiling (int): Giá tối đa (cents) - không bao giờ gửi cho client khác
+        
+        Returns:
+            tuple: (success: bool, message: str, update: BidUpdate or None)
+                - update: có nếu giá/người dẫn đầu thay đổi, None nếu không đổi
+                  (VD: người dẫn đầu nâng ceiling)
+        """
+        now = time.monotonic()
+        
+        with self.timed_lock:
+            if not self.is_open or (self.deadline is not None and now >= self.deadline):
+                return False, "Phiên đấu giá đã kết thúc", None
+            
+            previous = self.proxies.get(user)
+            if previous is not None and ceiling <= previous:
+                return False, f"Giá tối đa mới phải lớn hơn ${format_price(previous)}", None
+            
+            if user == self.current_winner:
+                # Người dẫn đầu chỉ nâng ceiling, không cần vượt chính mình
+                if ceiling > self.max_price:
+                    return False, f"Giá tối đa là ${format_price(self.max_price)}", None
+            else:
+                error_msg = check_bid(ceiling, self.current_price, self.min_increment, self.max_price)
+                if error_msg is not None:
+                    return False, error_msg, None
+            
+            self.proxies.register(user, ceiling)
+            if self.journal is not None:
+                self.journal.record_proxy(self.auction_id, user, ceiling)
+            
+            changed = self._resolve_proxies()
+            
+            if self.current_winner == user:
+                success_msg = (f"Đấu giá tự động: {user} dẫn đầu với "
+                               f"${format_price(self.current_price)}")
+            else:
+                success_msg = (f"Đấu giá tự động: {user} đã bị vượt, "
+                               f"giá hiện tại ${format_price(self.current_price)}")
+            log.info("AUCTION_LOGIC", "Đấu giá tự động", auction_id=self.auction_id, user=user,
+                     winner=self.current_winner, price=self.current_price)
+            
+            return True, success_msg, self._make_update(now) if changed else None
+    
+    def _apply_bid(self, user, value, seq):
+        
+        # Cập nhật giá + người dẫn đầu (gọi trong lock)
+        self.current_price = value
+        self.current_winner = user
+        self.standing_seq = seq
+        self.history.append(user, value)
+        
+        # Ghi journal trong lock → thứ tự journal trùng thứ tự chấp nhận
+        # (chỉ thêm vào buffer, fsync do writer thread của journal làm)
+        if self.journal is not None:
+            self.journal.record_bid(self.auction_id, user, value)
+    
+    def _make_update(self, now):
+        
+        # Kết quả của 1 bid làm giá thay đổi (gọi trong lock) + soft-close
+        extended = self._extend_deadline(now)
+        snapshot = self._publish()
+        return BidUpdate(snapshot.price, snapshot.winner, extended, snapshot.deadline, snapshot.version)
+    
+    def _publish(self):
+        
+        # Công bố snapshot mới sau khi trạng thái đổi (gọi trong lock)
+        # Tạo object mới rồi gán 1 lần → reader không bao giờ thấy snapshot dở dang
+        snapshot = AuctionSnapshot(self.snapshot.version + 1, self.current_price,
+                                   self.current_winner, self.is_open, self.deadline)
+        self.snapshot = snapshot
+        return snapshot
+    
+    def _extend_deadline(self, now):
+        
+        # Soft-close: bid trong soft_close_window giây cuối dời deadline
+        # soft_close_extension giây, tổng không vượt soft_close_max (gọi trong lock)
+        # Returns: số giây vừa dời (0 nếu không dời)
+        if self.deadline is None or self.soft_close_window <= 0:
+            return 0
+        if self.deadline - now > self.soft_close_window:
+            return 0
+        
+        extended = min(self.soft_close_extension, self.soft_close_max - self.extension_total)
+        if extended <= 0:
+            return 0
+        
+        self.deadline += extended
+        self.extension_total += extended
+        if self.journal is not None:
+            self.journal.record_deadline(self.auction_id, self.deadline - now)
+        
+        log.info("AUCTION_LOGIC", "⏳ Soft-close dời deadline", auction_id=self.auction_id,
+                 extended=extended, total=self.extension_total, max=self.soft_close_max)
+        return extended
+    
+    def set_deadline(self, deadline):
+        """
+        Đặt deadline của phiên (AuctionTimer gọi khi bắt đầu / khi admin dời)
+        
+        Args:
+            deadline (float): Deadline theo time.monotonic()
         """
         with self.lock:
-            return self.current_price
+            self.deadline = deadline
+            self._publish()
+    
+    def _resolve_proxies(self):
+        
+        # Cho các proxy trả giá sau 1 thay đổi (gọi trong lock) - O(log n)
+        # Returns: True nếu giá / người dẫn đầu thay đổi
+        outcome = self.proxies.resolve(
+            self.current_price, self.current_winner, self.standing_seq, self.min_increment
+        )
+        if outcome is None:
+            return False
+        
+        price, winner, seq = outcome
+        self._apply_bid(winner, price, seq)
+        return True
+    
+    def get_snapshot(self):
+        """
+        Lấy snapshot trạng thái hiện tại (không lock)
+        
+        Returns:
+            AuctionSnapshot: (version, price, winner, is_open, deadline) nhất quán
+        """
+        return self.snapshot
+    
+    def get_current_price(self):
+        """
+        Lấy giá hiện tại (không lock - đọc từ snapshot)
+        
+        Returns:
+            int: Giá cao nhất hiện tại (cents)
+        """
+        return self.snapshot.price
     
     def get_current_winner(self):
         """
-        Lấy người thắng hiện tại (thread-safe)
+        Lấy người thắng hiện tại (không lock - đọc từ snapshot)
         
         Returns:
             str or None: Tên người đang thắng, hoặc None nếu chưa có
         """
-        with self.lock:
-            return self.current_winner
+        return self.snapshot.winner
     
     def get_auction_info(self):
         """
-        Lấy toàn bộ thông tin đấu giá (thread-safe)
+        Lấy toàn bộ thông tin đấu giá (không lock - giá và winner lấy từ cùng 1 snapshot)
+        
+        Returns:
+            dict: Dictionary chứa thông tin đấu giá (gửi thẳng cho client:
+                các giá theo đơn vị, kèm current_price_cents chính xác và version)
+        """
+        snapshot = self.snapshot
+        current_price = snapshot.price
+        current_winner = snapshot.winner
+        
+        return {
+            "item_name": self.item_name,
+            "description": self.description,
+            "starting_price": to_units(self.starting_price),
+            "current_price": to_units(current_price),
+            "current_price_cents": current_price,
+            "current_winner": current_winner,
+            "min_increment": to_units(self.min_increment),
+            "max_price": to_units(self.max_price),
+            "version": snapshot.version
+        }
+    
+    def get_bid_stats(self):
+        """
+        Thống kê bid thường (không lock - chỉ đọc các số nguyên)
+        
+        Returns:
+            dict: accepted, rejected_fast (trước lock), rejected_locked (trong lock)
+        """
+        return {
+            "accepted": self.accepted_bids,
+            "rejected_fast": self.fast_rejects.value,
+            "rejected_locked": self.locked_rejects
+        }
+    
+    def get_history(self, limit=None):
+        """
+        Lấy các bid gần nhất (thread-safe)
+        
+        Chỉ copy các cột trong lock; việc đổi sang list/JSON làm sau khi nhả lock
+        
+        Args:
+            limit (int, optional): Số bid gần nhất (None = toàn bộ)
+        
+        Returns:
+            tuple: (total: int, columns: dict) - columns xem BidHistory.to_columns
+        """
+        with self.lock:
+            total = len(self.history)
+            sliced = self.history.slice() if limit is None else self.history.last(limit)
+        
+        return total, self.history.to_columns(sliced)
+    
+    def close(self, now=None):
+        """
+        Đóng phiên đấu giá (hết giờ) - mọi bid sau đó bị từ chối
+        
+        Args:
+            now (float, optional): time.monotonic() lúc sự kiện end chạy.
+                Có now mà deadline đã bị soft-close dời qua now → không đóng.
         
         Returns:
-            dict: Dictionary chứa thông tin đấu giá
+            tuple or None: (current_winner, current_price) tại thời điểm đóng,
+                None nếu deadline đã bị dời (phiên vẫn mở)
         """
         with self.lock:
-            return {
-                "item_name": self.item_name,
-                "description": self.description,
-                "starting_price": self.starting_price,
-                "current_price": self.current_price,
-                "current_winner": self.current_winner
-            }
+            if now is not None and self.is_open and self.deadline is not None and now < self.deadline:
+                return None
+            if self.is_open and self.journal is not None:
+                self.journal.record_end(self.auction_id)
+            if self.is_open:
+                self.is_open = False
+                self._publish()
+            return self.current_winner, self.current_price
+    
+    def restore(self, current_price, current_winner, is_open=True, proxies=()):
+        """
+        Khôi phục trạng thái từ bid journal (khi server khởi động lại sau crash)
+        
+        Args:
+            current_price (int): Giá cao nhất đã ghi trong journal (cents)
+            current_winner (str): Người dẫn đầu đã ghi trong journal
+            is_open (bool): False nếu phiên đã kết thúc trước khi crash
+            proxies (iterable): Các (user, ceiling) theo thứ tự đăng ký
+        """
+        with self.lock:
+            self.current_price = current_price
+            self.current_winner = current_winner
+            self.is_open = is_open
+            for user, ceiling in proxies:
+                self.proxies.register(user, ceiling)
+            # Bid đang dẫn coi như mới nhất: không proxy nào thắng nhờ bằng giá
+            self.standing_seq = self.proxies.next_seq()
+            self._publish()
+        
+        print(f"[AUCTION_LOGIC] Khôi phục {self.auction_id}: ${format_price(current_price)} - {current_winner}")
     
     def reset(self, starting_price=None):
         """
         Reset trạng thái đấu giá (dùng cho multi-round)
         
         Args:
-            starting_price (float, optional): Giá khởi điểm mới
+            starting_price (int, optional): Giá khởi điểm mới (cents)
         """
         with self.lock:
             if starting_price is not None:
@@ -140,5 +575,14 @@ class AuctionState:
             
             self.current_price = self.starting_price
             self.current_winner = None
+            self.is_open = True
+            self.proxies = ProxyBook()
+            self.standing_seq = 0
+            self.deadline = None
+            self.extension_total = 0
+            self.fast_rejects.reset()
+            self.locked_rejects = 0
+            self.accepted_bids = 0
+            self._publish()
             
-            print(f"[AUCTION_LOGIC] Reset đấu giá: ${self.starting_price}")
+            log.info("AUCTION_LOGIC", "Reset đấu giá", auction_id=self.auction_id, price=self.starting_price)
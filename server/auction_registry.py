@@ -0,0 +1,137 @@
+"""
+Auction Registry Module - Quản lý nhiều phiên đấu giá đồng thời
+
+Nhiệm vụ chính:
+1. Lưu nhiều AuctionState (mỗi vật phẩm 1 phiên) theo auction_id
+2. Mỗi AuctionState có Lock riêng → bid trên 2 vật phẩm khác nhau không tranh chấp
+3. Theo dõi phiên nào đã kết thúc (để shutdown khi TẤT CẢ đã kết thúc)
+
+Thread-Safety:
+- Lock của registry chỉ dùng khi thêm phiên / đánh dấu kết thúc
+- Tra cứu theo auction_id (get) không cần lock: dict chỉ được ghi lúc khởi tạo
+"""
+
+import threading
+
+# auction_id mặc định khi config chỉ có 1 vật phẩm
+DEFAULT_AUCTION_ID = "auction-1"
+
+
+class AuctionRegistry:
+    """
+    Class quản lý danh mục các phiên đấu giá
+    
+    Attributes:
+        auctions (dict): Dictionary mapping {auction_id: AuctionState}
+        auction_ids (list): Thứ tự các phiên theo catalog
+        ended (set): Các auction_id đã kết thúc
+        lock (threading.Lock): Lock bảo vệ việc thêm phiên và tập ended
+    """
+    
+    def __init__(self):
+        self.auctions = {}  # {auction_id: AuctionState}
+        self.auction_ids = []
+        self.ended = set()
+        self.lock = threading.Lock()
+        
+        print("[AUCTION_REGISTRY] Khởi tạo Registry")
+    
+    def add_auction(self, auction_state):
+        """
+        Thêm 1 phiên đấu giá vào registry
+        
+        Args:
+            auction_state: AuctionState (phải có auction_id duy nhất)
+        
+        Raises:
+            ValueError: Nếu auction_id đã tồn tại
+        """
+        auction_id = auction_state.auction_id
+        
+        with self.lock:
+            if auction_id in self.auctions:
+                raise ValueError(f"auction_id bị trùng: {auction_id}")
+            
+            self.auctions[auction_id] = auction_state
+            self.auction_ids.append(auction_id)
+        
+        print(f"[AUCTION_REGISTRY] ➕ {auction_id}: {auction_state.item_name}")
+    
+    def get(self, auction_id):
+        """
+        Lấy AuctionState theo auction_id (không cần lock)
+        
+        Args:
+            auction_id (str): ID phiên đấu giá
+        
+        Returns:
+            AuctionState or None
+        """
+        return self.auctions.get(auction_id)
+    
+    def get_default(self):
+        """
+        Phiên mặc định (phiên đầu tiên trong catalog)
+        
+        Dùng cho client cũ gửi BID không kèm auction_id
+        
+        Returns:
+            AuctionState or None
+        """
+        if not self.auction_ids:
+            return None
+        return self.auctions[self.auction_ids[0]]
+    
+    def resolve(self, auction_id=None):
+        """
+        Tìm phiên cho 1 message: có auction_id → phiên đó, không có → phiên mặc định
+        
+        Args:
+            auction_id (str, optional): ID phiên đấu giá
+        
+        Returns:
+            AuctionState or None: None nếu auction_id không tồn tại
+        """
+        if auction_id is None:
+            return self.get_default()
+        return self.get(auction_id)
+    
+    def get_all(self):
+        """
+        Returns:
+            list: Các AuctionState theo thứ tự catalog
+        """
+        return [self.auctions[auction_id] for auction_id in self.auction_ids]
+    
+    def get_catalog_info(self):
+        """
+        Thông tin tóm tắt các phiên (gửi cho client trong CATALOG)
+        
+        Returns:
+            list: Các dict {auction_id, item_name, description, starting_price,
+                  current_price, current_winner, ended}
+        """
+        catalog = []
+        for auction_state in self.get_all():
+            info = auction_state.get_auction_info()
+            info["auction_id"] = auction_state.auction_id
+            info["ended"] = auction_state.auction_id in self.ended
+            catalog.append(info)
+        return catalog
+    
+    def mark_ended(self, auction_id):
+        """
+        Đánh dấu 1 phiên đã kết thúc
+        
+        Args:
+            auction_id (str): ID phiên vừa kết thúc
+        
+        Returns:
+            bool: True nếu TẤT CẢ các phiên đã kết thúc
+        """
+        with self.lock:
+            self.ended.add(auction_id)
+            return len(self.ended) >= len(self.auctions)
+    
+    def __len__(self):
+        return len(self.auction_ids)
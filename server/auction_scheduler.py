@@ -0,0 +1,663 @@
+"""
+Auction Scheduler Module - 1 thread lập lịch cho mọi phiên đấu giá
+
+Thay cho mô hình 1 TimerThread / phiên (mỗi thread poll wait_for_start 0.5s):
+- AuctionScheduler: 1 thread duy nhất + 1 heapq các sự kiện (thời điểm, loại, phiên)
+- AuctionTimer: trạng thái đếm ngược của 1 phiên, không có thread riêng
+
+Các sự kiện của 1 phiên:
+- "tick"    : chế độ tick - broadcast UPDATE_TIMER mỗi giây
+- "sync"    : chế độ deadline - TIMER_SYNC định kỳ mỗi sync_interval giây
+- "warning" : cảnh báo còn 10s và 5s
+- "end"     : hết giờ - broadcast WINNER / NO_WINNER
+- "extend"  : soft-close - 1 bid vừa dời deadline, lập lịch lại theo deadline mới
+- "shutdown": 5 giây sau khi phiên CUỐI CÙNG kết thúc - dừng server (SHUTDOWN)
+
+Chi phí:
+- Mỗi sự kiện: 1 heappush + 1 heappop (O(log n) với n = số sự kiện đang chờ,
+  mỗi phiên chỉ có tối đa vài sự kiện trong heap)
+- Phiên chưa bắt đầu hoặc đã kết thúc: không có sự kiện nào → không tốn CPU
+- Thread ngủ bằng Condition.wait() đến sự kiện gần nhất (không polling)
+
+Dời deadline (anti-snipe): AuctionTimer tăng generation và lập lịch lại;
+các sự kiện cũ còn trong heap bị bỏ qua khi được lấy ra (lazy deletion).
+Deadline gốc nằm trong AuctionState (dời trong place_bid, cùng lock với close):
+sự kiện end đến hạn mà deadline đã bị dời → phiên không đóng, timer đi theo
+deadline mới.
+
+Lập lịch không trôi (drift-free):
+- Mọi thời điểm được tính từ deadline theo time.monotonic()
+- Sự kiện bị trễ không kéo dài phiên; nhịp bị lỡ được bỏ qua, không dồn lại
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from bid_journal import RECORD_START
+from event_log import log
+from latency import latency
+from lock_profile import lock_profiler
+from pricing import format_price, to_units
+
+# Các chế độ timer hợp lệ
+TIMER_MODES = ("tick", "deadline")
+DEFAULT_SYNC_INTERVAL = 15
+
+# Các mốc cảnh báo (giây còn lại)
+WARNING_THRESHOLDS = (10, 5)
+
+# Thời gian chờ sau khi phiên cuối kết thúc trước khi dừng server
+SHUTDOWN_DELAY = 5
+
+# Thứ tự xử lý khi nhiều sự kiện cùng thời điểm (nhỏ hơn → trước)
+EVENT_PRIORITY = {"extend": 0, "tick": 0, "sync": 0, "warning": 1, "end": 2, "shutdown": 3}
+
+
+class AuctionScheduler(threading.Thread):
+    """
+    Thread lập lịch dùng chung cho mọi phiên đấu giá
+    
+    Attributes:
+        auction_hub: Reference đến AuctionHub để broadcast
+        auction_registry: AuctionRegistry (biết khi nào mọi phiên đã kết thúc)
+        on_all_ended (callable): Gọi SHUTDOWN_DELAY giây sau khi phiên cuối kết thúc
+        heap (list): Các entry (when, priority, seq, generation, kind, timer, arg)
+        condition (threading.Condition): Bảo vệ heap + đánh thức thread
+    """
+    
+    def __init__(self, auction_hub, auction_registry=None, on_all_ended=None):
+        """
+        Args:
+            auction_hub: Reference đến AuctionHub
+            auction_registry: AuctionRegistry (optional)
+            on_all_ended (callable): Callback dừng server khi mọi phiên đã kết thúc
+                (optional - không có thì scheduler tự broadcast SHUTDOWN)
+        """
+        super().__init__(name="AuctionScheduler", daemon=True)
+        self.auction_hub = auction_hub
+        self.auction_registry = auction_registry
+        self.on_all_ended = on_all_ended
+        
+        self.heap = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.is_running = True
+        self.shutdown_scheduled = False
+        
+        # Thống kê độ trễ sự kiện (thời điểm xử lý thực tế - thời điểm dự kiến)
+        self.event_count = 0
+        self.stale_events = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self.lag_total = 0.0
+    
+    def schedule(self, when, kind, timer=None, generation=None, arg=None):
+        """
+        Thêm 1 sự kiện vào heap (thread-safe)
+        
+        Args:
+            when (float): Thời điểm theo time.monotonic()
+            kind (str): Loại sự kiện (xem EVENT_PRIORITY)
+            timer (AuctionTimer): Phiên sở hữu sự kiện (None cho sự kiện server)
+            generation (int): Thế hệ deadline của timer lúc lập lịch
+                (None = không bao giờ cũ, VD: sự kiện extend)
+            arg: Tham số kèm theo (VD: số giây của cảnh báo)
+        """
+        entry = (when, EVENT_PRIORITY[kind], next(self.sequence), generation, kind, timer, arg)
+        
+        with self.condition:
+            heapq.heappush(self.heap, entry)
+            # Chỉ cần đánh thức nếu sự kiện mới là sự kiện sớm nhất
+            if self.heap[0] is entry:
+                self.condition.notify()
+    
+    def run(self):
+        """
+        Main loop: ngủ đến sự kiện gần nhất, xử lý mọi sự kiện đã đến hạn
+        """
+        print("[SCHEDULER] Thread khởi động - Đợi admin bắt đầu game...")
+        
+        while True:
+            with self.condition:
+                while self.is_running:
+                    if not self.heap:
+                        self.condition.wait()
+                        continue
+                    delay = self.heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.condition.wait(delay)
+                
+                if not self.is_running:
+                    print("[SCHEDULER] Scheduler đã dừng")
+                    return
+                
+                when, _, _, generation, kind, timer, arg = heapq.heappop(self.heap)
+                stale = timer is not None and generation is not None and generation != timer.generation
+            
+            if stale:
+                # Sự kiện của deadline cũ (đã bị dời) → bỏ qua
+                self.stale_events += 1
+                continue
+            
+            self.record_lag(time.monotonic() - when)
+            
+            try:
+                self.dispatch(kind, timer, arg)
+            except Exception as e:
+                log.error("SCHEDULER", "Lỗi xử lý sự kiện", kind=kind, error=e)
+    
+    def dispatch(self, kind, timer, arg):
+        """
+        Gọi handler tương ứng với loại sự kiện (chạy trên thread scheduler)
+        """
+        if kind == "tick":
+            timer.on_tick()
+        elif kind == "sync":
+            timer.on_sync()
+        elif kind == "warning":
+            timer.on_warning(arg)
+        elif kind == "end":
+            timer.on_end()
+        elif kind == "extend":
+            timer.apply_deadline(arg)
+        elif kind == "shutdown":
+            log.info("SCHEDULER", "Kích hoạt shutdown server")
+            if self.on_all_ended:
+                # Server gửi SHUTDOWN, đóng kết nối rồi mới cleanup
+                self.on_all_ended()
+            else:
+                self.broadcast_shutdown()
+    
+    def auction_ended(self, auction_id):
+        """
+        Được AuctionTimer gọi khi 1 phiên kết thúc
+        
+        Nếu đó là phiên cuối cùng: lập lịch dừng server sau SHUTDOWN_DELAY giây
+        (để clients kịp xử lý kết quả).
+        """
+        if self.auction_registry is not None:
+            if not self.auction_registry.mark_ended(auction_id):
+                log.info("SCHEDULER", "Phiên xong - các phiên khác vẫn đang diễn ra", auction_id=auction_id)
+                return
+        
+        with self.condition:
+            if self.shutdown_scheduled:
+                return
+            self.shutdown_scheduled = True
+        
+        log.info("SCHEDULER", "Đợi clients xử lý kết quả trước khi shutdown", seconds=SHUTDOWN_DELAY)
+        self.schedule(time.monotonic() + SHUTDOWN_DELAY, "shutdown")
+    
+    def broadcast_shutdown(self):
+        """
+        Gửi SHUTDOWN message trước khi tắt server
+        """
+        if self.auction_hub:
+            self.auction_hub.broadcast_message({
+                "type": "SHUTDOWN",
+                "message": "Server đang đóng. Cảm ơn bạn đã tham gia!"
+            })
+    
+    def record_lag(self, lag):
+        """
+        Ghi nhận độ trễ của 1 sự kiện
+        
+        Args:
+            lag: Thời điểm xử lý thực tế - thời điểm dự kiến (giây)
+        """
+        lag = max(0.0, lag)
+        self.event_count += 1
+        self.lag_last = lag
+        self.lag_total += lag
+        if lag > self.lag_max:
+            self.lag_max = lag
+    
+    def get_stats(self):
+        """
+        Thống kê của scheduler
+        
+        Returns:
+            dict: events, stale_events, pending, lag_last_ms, lag_max_ms, lag_avg_ms
+        """
+        avg = self.lag_total / self.event_count if self.event_count else 0.0
+        return {
+            "events": self.event_count,
+            "stale_events": self.stale_events,
+            "pending": len(self.heap),
+            "lag_last_ms": round(self.lag_last * 1000, 3),
+            "lag_max_ms": round(self.lag_max * 1000, 3),
+            "lag_avg_ms": round(avg * 1000, 3)
+        }
+    
+    def stop(self):
+        """
+        Dừng scheduler (được gọi khi server shutdown)
+        """
+        print("[SCHEDULER] Nhận lệnh dừng scheduler...")
+        with self.condition:
+            self.is_running = False
+            self.condition.notify()
+
+
+class AuctionTimer:
+    """
+    Bộ đếm ngược của 1 phiên đấu giá (chạy trên AuctionScheduler, không có thread riêng)
+    
+    Attributes:
+        auction_id (str): ID phiên đấu giá
+        duration (int): Thời gian đấu giá (giây)
+        timer_mode (str): "tick" hoặc "deadline"
+        deadline (float): Deadline tuyệt đối theo time.monotonic() (None khi chưa bắt đầu)
+        generation (int): Tăng mỗi khi deadline thay đổi (vô hiệu hóa sự kiện cũ)
+    """
+    
+    def __init__(self, duration, auction_hub, auction_state, scheduler, timer_mode="tick",
+                 sync_interval=DEFAULT_SYNC_INTERVAL):
+        """
+        Args:
+            duration: Thời gian đấu giá (giây) - VD: 120
+            auction_hub: Reference đến AuctionHub để broadcast messages
+            auction_state: Reference đến AuctionState để lấy thông tin winner
+            scheduler: AuctionScheduler dùng chung
+            timer_mode: "tick" (UPDATE_TIMER mỗi giây) hoặc "deadline" (client tự đếm)
+            sync_interval: Chế độ deadline - số giây giữa 2 lần TIMER_SYNC định kỳ
+        """
+        self.duration = duration
+        self.auction_hub = auction_hub
+        self.auction_state = auction_state
+        self.auction_id = auction_state.auction_id
+        self.scheduler = scheduler
+        self.remaining_time = duration
+        
+        self.game_started = False
+        self.ended = False
+        
+        # Chế độ timer + deadline tuyệt đối (theo time.monotonic() của server)
+        self.timer_mode = timer_mode if timer_mode in TIMER_MODES else "tick"
+        self.sync_interval = sync_interval
+        self.deadline = None
+        self.last_sync = None
+        self.generation = 0
+        
+        # Thống kê nhịp (tick mode)
+        self.tick_count = 0
+        self.skipped_ticks = 0
+        
+        # Flags để tracking đã gửi cảnh báo chưa
+        self.warnings_sent = set()
+    
+    # ========== LẬP LỊCH ==========
+    
+    def start_game(self, remaining=None):
+        """
+        Bắt đầu đếm ngược (admin nhấn Y)
+        
+        Args:
+            remaining (float, optional): Số giây còn lại khi tiếp tục phiên
+                khôi phục từ bid journal (mặc định: toàn bộ duration)
+        """
+        if self.game_started:
+            return
+        
+        if remaining is None:
+            remaining = self.duration
+            log.info("TIMER", "🎮 Admin đã bắt đầu phiên", auction_id=self.auction_id, duration=self.duration)
+        else:
+            remaining = max(0.0, remaining)
+            log.info("TIMER", "♻️ Tiếp tục phiên từ journal", auction_id=self.auction_id,
+                     remaining=round(remaining, 1))
+        
+        self.deadline = time.monotonic() + remaining
+        self.last_sync = time.monotonic()
+        self.game_started = True
+        self.auction_state.set_deadline(self.deadline)
+        
+        journal = self.auction_state.journal
+        if journal is not None:
+            journal.record_deadline(self.auction_id, remaining, RECORD_START)
+        
+        # Broadcast GAME_START message
+        if self.auction_hub:
+            message = {
+                "type": "GAME_START",
+                "message": "🎮 Phiên đấu giá đã bắt đầu!",
+                "duration": self.duration,
+                "auction_id": self.auction_id
+            }
+            
+            # Chế độ deadline: kèm deadline để client tự đếm ngược
+            if self.timer_mode == "deadline":
+                message.update(self.build_sync_message("GAME_START"))
+            
+            self.auction_hub.broadcast_message(message, self.auction_id)
+        
+        # Gửi initial timer update
+        if self.timer_mode == "tick":
+            self.broadcast_timer_update()
+        
+        self.schedule_events()
+    
+    def schedule_events(self):
+        """
+        Lập lịch (lại) mọi sự kiện của phiên theo deadline hiện tại
+        
+        Mỗi phiên chỉ có tối đa: 1 tick/sync + các cảnh báo chưa gửi + 1 end
+        """
+        self.generation += 1
+        generation = self.generation
+        now = time.monotonic()
+        schedule = self.scheduler.schedule
+        
+        if self.timer_mode == "tick":
+            when = self.next_tick_time(now)
+            if when is not None:
+                schedule(when, "tick", self, generation)
+        elif self.last_sync + self.sync_interval < self.deadline:
+            schedule(self.last_sync + self.sync_interval, "sync", self, generation)
+        
+        for seconds in WARNING_THRESHOLDS:
+            if seconds not in self.warnings_sent:
+                schedule(max(now, self.deadline - seconds), "warning", self, generation, seconds)
+        
+        schedule(self.deadline, "end", self, generation)
+    
+    def next_tick_time(self, now):
+        """
+        Thời điểm nhịp tiếp theo: khi remaining (làm tròn lên) giảm 1 đơn vị
+        
+        Returns:
+            float or None: None nếu nhịp tiếp theo là lúc hết giờ (đã có sự kiện end)
+        """
+        next_remaining = math.ceil(self.deadline - now) - 1
+        if next_remaining <= 0:
+            return None
+        return self.deadline - next_remaining
+    
+    # ========== HANDLERS (chạy trên thread scheduler) ==========
+    
+    def on_tick(self):
+        """
+        Chế độ tick: broadcast UPDATE_TIMER rồi lập lịch nhịp tiếp theo
+        """
+        now = time.monotonic()
+        previous = self.remaining_time
+        self.remaining_time = max(0, math.ceil(self.deadline - now))
+        self.tick_count += 1
+        if previous - self.remaining_time > 1:
+            # Sự kiện trước đó quá trễ → bỏ qua các nhịp đã lỡ
+            self.skipped_ticks += previous - self.remaining_time - 1
+        
+        if self.remaining_time <= 0:
+            return
+        
+        self.broadcast_timer_update()
+        
+        # Log mỗi 10 giây để tracking
+        if self.remaining_time % 10 == 0:
+            log.info("TIMER", "Thời gian còn lại", auction_id=self.auction_id, remaining=self.remaining_time)
+        
+        when = self.next_tick_time(now)
+        if when is not None:
+            self.scheduler.schedule(when, "tick", self, self.generation)
+    
+    def on_sync(self):
+        """
+        Chế độ deadline: TIMER_SYNC định kỳ rồi lập lịch lần tiếp theo
+        """
+        self.remaining_time = max(0, math.ceil(self.deadline - time.monotonic()))
+        self.broadcast_timer_sync()
+        
+        next_sync = self.last_sync + self.sync_interval
+        if next_sync < self.deadline:
+            self.scheduler.schedule(next_sync, "sync", self, self.generation)
+    
+    def on_warning(self, seconds):
+        """
+        Gửi cảnh báo còn X giây (bỏ qua nếu đã gửi cảnh báo gần hơn)
+        """
+        if seconds in self.warnings_sent:
+            return
+        
+        # Gửi cảnh báo này coi như đã gửi các mốc xa hơn
+        self.warnings_sent.update(s for s in WARNING_THRESHOLDS if s >= seconds)
+        self.broadcast_warning(seconds)
+    
+    def on_end(self):
+        """
+        Hết giờ - xử lý kết thúc phiên
+        
+        Đóng phiên trong lock của AuctionState: nếu 1 bid vừa dời deadline
+        (soft-close) thì phiên chưa đóng, timer lập lịch lại theo deadline mới
+        """
+        if self.ended:
+            return
+        
+        result = self.auction_state.close(time.monotonic())
+        if result is None:
+            self.apply_deadline(self.auction_state.deadline)
+            return
+        
+        self.remaining_time = 0
+        self.ended = True
+        log.info("TIMER", "Hết thời gian! Đang xử lý kết thúc", auction_id=self.auction_id)
+        log.info("TIMER", "Tick stats", auction_id=self.auction_id, tick=self.get_timer_stats(),
+                 scheduler=self.scheduler.get_stats())
+        log.info("TIMER", "Lịch sử bid", auction_id=self.auction_id, **self.auction_state.history.get_stats())
+        log.info("TIMER", "Bid stats", auction_id=self.auction_id, **self.auction_state.get_bid_stats())
+        # Độ trễ BID theo từng chặng (histogram dùng chung cho mọi phiên của server)
+        latency.log_summary("TIMER", auction_id=self.auction_id)
+        lock_profiler.log_report("TIMER")
+        self.handle_auction_end(result)
+        self.scheduler.auction_ended(self.auction_id)
+    
+    def apply_deadline(self, deadline):
+        """
+        Đi theo deadline mới do soft-close dời trong AuctionState.place_bid
+        
+        Client đã nhận deadline mới trong NEW_PRICE nên không broadcast lại;
+        chỉ mở lại các cảnh báo chưa tới và lập lịch lại mọi sự kiện.
+        
+        Args:
+            deadline (float): Deadline mới theo time.monotonic()
+        """
+        if self.ended or deadline is None or deadline <= self.deadline:
+            return
+        
+        self.deadline = deadline
+        remaining = deadline - time.monotonic()
+        self.warnings_sent = {seconds for seconds in self.warnings_sent if seconds >= remaining}
+        self.schedule_events()
+    
+    def on_bid_extension(self, update):
+        """
+        Được ClientSession gọi khi 1 bid vừa dời deadline (soft-close)
+        
+        Lập lịch sự kiện "extend" trên thread scheduler và trả về các trường
+        deadline để ghép vào chính NEW_PRICE (client nhận giá mới + deadline mới
+        trong 1 event duy nhất).
+        
+        Args:
+            update (BidUpdate): Kết quả của place_bid (extended > 0)
+        
+        Returns:
+            dict: {extended_by, deadline, server_time, remaining}
+        """
+        now = time.monotonic()
+        self.scheduler.schedule(now, "extend", self, None, update.deadline)
+        return {
+            "extended_by": update.extended,
+            "deadline": round(update.deadline, 3),
+            "server_time": round(now, 3),
+            "remaining": round(max(0.0, update.deadline - now), 3)
+        }
+    
+    # ========== BROADCAST ==========
+    
+    def get_timer_stats(self):
+        """
+        Thống kê nhịp của phiên
+        
+        Returns:
+            dict: ticks, skipped_ticks
+        """
+        return {
+            "ticks": self.tick_count,
+            "skipped_ticks": self.skipped_ticks
+        }
+    
+    def build_sync_message(self, msg_type="TIMER_SYNC"):
+        """
+        Tạo message đồng bộ deadline
+        
+        Client tính deadline cục bộ = monotonic_client + (deadline - server_time),
+        tức là monotonic_client + remaining.
+        
+        Args:
+            msg_type: "TIMER_SYNC" hoặc "GAME_START"
+        
+        Returns:
+            dict: {"type", "auction_id", "deadline", "server_time", "remaining"}
+        """
+        now = time.monotonic()
+        return {
+            "type": msg_type,
+            "auction_id": self.auction_id,
+            "deadline": round(self.deadline, 3),
+            "server_time": round(now, 3),
+            "remaining": round(max(0.0, self.deadline - now), 3)
+        }
+    
+    def broadcast_timer_sync(self):
+        """
+        Broadcast TIMER_SYNC (gọi định kỳ hoặc khi deadline thay đổi)
+        """
+        self.last_sync = time.monotonic()
+        
+        if self.auction_hub:
+            self.auction_hub.broadcast_message(self.build_sync_message(), self.auction_id)
+    
+    def extend_deadline(self, seconds):
+        """
+        Dời deadline thêm seconds giây, lập lịch lại và re-sync ngay cho mọi client
+        
+        Args:
+            seconds: Số giây cộng thêm (âm để rút ngắn)
+        """
+        if self.deadline is None or self.ended:
+            return
+        
+        self.deadline += seconds
+        self.auction_state.set_deadline(self.deadline)
+        
+        journal = self.auction_state.journal
+        if journal is not None:
+            journal.record_deadline(self.auction_id, self.deadline - time.monotonic())
+        
+        self.broadcast_timer_sync()
+        self.schedule_events()
+    
+    def broadcast_timer_update(self):
+        """
+        Gửi UPDATE_TIMER message cho tất cả clients
+        Format: {"type": "UPDATE_TIMER", "remaining": <seconds>, "auction_id": <id>}
+        """
+        self.remaining_time = max(0, math.ceil(self.deadline - time.monotonic()))
+        
+        # Broadcast qua auction_hub (frame được cache theo auction_id + remaining)
+        if self.auction_hub:
+            self.auction_hub.broadcast_timer(self.remaining_time, self.auction_id)
+    
+    def broadcast_warning(self, seconds):
+        """
+        Gửi WARNING message khi còn X giây
+        Format: {"type": "WARNING", "message": "...", "remaining": <seconds>}
+        
+        Args:
+            seconds: Số giây còn lại (10 hoặc 5)
+        """
+        message = {
+            "type": "WARNING",
+            "message": f"⚠️ Cảnh báo: Còn {seconds} giây!",
+            "remaining": seconds,
+            "auction_id": self.auction_id
+        }
+        
+        log.info("TIMER", "⚠️ CẢNH BÁO sắp hết giờ", auction_id=self.auction_id, remaining=seconds)
+        
+        if self.auction_hub:
+            self.auction_hub.broadcast_message(message, self.auction_id)
+    
+    def handle_auction_end(self, result=None):
+        """
+        Xử lý khi đấu giá kết thúc (hết giờ)
+        
+        Flow:
+        1. Đóng phiên (từ chối bid mới) và lấy winner + giá trong cùng 1 lần lock
+        2. Broadcast WINNER hoặc NO_WINNER
+        (SHUTDOWN do scheduler gửi sau khi phiên cuối cùng kết thúc)
+        
+        Args:
+            result (tuple, optional): (winner, price) đã lấy từ close() (on_end)
+        """
+        log.info("TIMER", "===== PHIÊN ĐẤU GIÁ KẾT THÚC =====", auction_id=self.auction_id)
+        
+        # Lấy thông tin winner (close() trả về cặp nhất quán)
+        winner_name, winner_price = result if result is not None else self.auction_state.close()
+        starting_price = self.auction_state.starting_price
+        
+        # Kiểm tra có winner hay không
+        if winner_name and winner_price > starting_price:
+            # Có người thắng
+            message = {
+                "type": "WINNER",
+                "user": winner_name,
+                "value": to_units(winner_price),
+                "value_cents": winner_price,
+                "auction_id": self.auction_id,
+                "item_name": self.auction_state.item_name,
+                "message": f"🎉 Chúc mừng {winner_name} đã thắng với giá ${format_price(winner_price)}!"
+            }
+            
+            log.info("TIMER", "🏆 WINNER", auction_id=self.auction_id, user=winner_name, price=winner_price)
+        
+        else:
+            # Không có người thắng (không ai đặt giá)
+            message = {
+                "type": "NO_WINNER",
+                "auction_id": self.auction_id,
+                "item_name": self.auction_state.item_name,
+                "message": "❌ Phiên đấu giá kết thúc mà không có người đặt giá!"
+            }
+            
+            log.info("TIMER", "❌ Không có người thắng", auction_id=self.auction_id)
+        
+        # Broadcast kết quả
+        if self.auction_hub:
+            self.auction_hub.broadcast_message(message, self.auction_id)
+    
+    def get_remaining_time(self):
+        """
+        Lấy thời gian còn lại
+        
+        Returns:
+            int: Số giây còn lại
+        """
+        if self.deadline is None:
+            return self.duration
+        return max(0, math.ceil(self.deadline - time.monotonic()))
+    
+    def format_time(self):
+        """
+        Format thời gian còn lại thành MM:SS
+        
+        Returns:
+            str: Thời gian dạng "MM:SS"
+        """
+        remaining = self.get_remaining_time()
+        minutes = remaining // 60
+        seconds = remaining % 60
+        return f"{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,184 @@
+"""
+Bid Batcher Module - Gom BID thành từng lượt ngắn (micro-batching)
+
+Nhiệm vụ chính:
+1. Client thread / event loop chỉ xếp BID vào hàng đợi rồi quay lại đọc tiếp
+2. 1 thread gom các BID đến trong window_ms mili giây (VD: 5-20ms) thành 1 lượt
+3. Mỗi phiên xử lý cả lượt trong 1 lần lock (AuctionState.place_bid_batch):
+   bid hợp lệ cao nhất thắng, bằng giá → bid đến trước thắng
+4. Cả lượt chỉ có 1 NEW_PRICE; mọi người đặt giá vẫn nhận kết quả riêng
+   (NEW_PRICE nếu thắng lượt, ERROR kèm lý do nếu bị từ chối)
+
+Hiệu năng:
+- Những giây cuối có hàng trăm BID / vài mili giây: thay vì hàng trăm lần
+  lock + print + broadcast, mỗi lượt chỉ 1 lần lock và 1 broadcast
+- BID đã thấp hơn snapshot bị từ chối ngay khi nhận (precheck_bid), không vào hàng đợi
+- Không có BID → thread ngủ hẳn (không thức dậy theo chu kỳ)
+
+Giới hạn:
+- Bid đến trước deadline vẫn hợp lệ dù lượt được xử lý sau deadline, nhưng
+  nếu sự kiện end đã đóng phiên trước khi lượt chạy thì bid bị từ chối
+  (trễ tối đa window_ms, tương đương jitter mạng)
+- PROXY_BID không đi qua batcher (đăng ký ceiling hiếm và không cần gom)
+"""
+
+import threading
+import time
+
+from counters import AtomicCounter
+from event_log import log
+from latency import latency
+
+DEFAULT_WINDOW_MS = 10
+
+
+class BidBatcher:
+    """
+    Gom BID thành từng lượt và xử lý mỗi lượt trong 1 lần lock
+    
+    Attributes:
+        window (float): Độ dài 1 lượt (giây)
+        pending (list): Các bid chờ (session, auction_state, user, value, arrival,
+            received_ns, submitted_ns)
+        condition (threading.Condition): Bảo vệ pending + đánh thức thread xử lý
+    """
+    
+    def __init__(self, window_ms=DEFAULT_WINDOW_MS):
+        """
+        Args:
+            window_ms (int): Độ dài 1 lượt gom bid (mili giây)
+        """
+        self.window = window_ms / 1000.0
+        
+        self.pending = []
+        self.condition = threading.Condition()
+        self.is_running = True
+        
+        # Thống kê
+        self.bids = AtomicCounter()
+        self.windows = AtomicCounter()
+        self.window_max = 0
+        
+        self.worker_thread = threading.Thread(
+            target=self._worker_loop,
+            name="BidBatcher",
+            daemon=True
+        )
+        self.worker_thread.start()
+        
+        print(f"[BID_BATCHER] Gom BID theo lượt {window_ms}ms")
+    
+    def submit(self, session, auction_state, user, value, received_ns=None):
+        """
+        Nhận 1 BID (gọi từ ClientSession, không chờ kết quả)
+        
+        Bid đã cũ so với snapshot được trả lời ngay; bid có thể thắng được
+        xếp vào lượt hiện tại, kết quả gửi qua session.finish_bid
+        
+        Args:
+            session (ClientSession): Session của người đặt giá
+            auction_state (AuctionState): Phiên được đặt giá
+            user (str): Người đặt giá
+            value (int): Giá đặt (cents)
+            received_ns (int, optional): perf_counter_ns lúc recv() BID (đo độ trễ)
+        """
+        error_msg = auction_state.precheck_bid(value)
+        if error_msg is not None:
+            session.finish_bid("BID", auction_state.auction_id, value, False, error_msg, None)
+            return
+        
+        arrival = time.monotonic()
+        submitted_ns = time.perf_counter_ns()
+        with self.condition:
+            if not self.is_running:
+                running = False
+            else:
+                running = True
+                self.pending.append((session, auction_state, user, value, arrival,
+                                     received_ns, submitted_ns))
+                # Bid đầu tiên mở lượt mới
+                if len(self.pending) == 1:
+                    self.condition.notify()
+        
+        if not running:
+            session.finish_bid("BID", auction_state.auction_id, value, False,
+                               "Server đang dừng", None)
+            return
+        
+        self.bids.increment()
+    
+    def _worker_loop(self):
+        """
+        Thread xử lý: đợi bid đầu tiên, gom thêm trong window rồi xử lý cả lượt
+        """
+        while True:
+            with self.condition:
+                while self.is_running and not self.pending:
+                    self.condition.wait()
+                if self.is_running:
+                    self.condition.wait(self.window)
+                batch = self.pending
+                self.pending = []
+                running = self.is_running
+            
+            if batch:
+                self._resolve(batch)
+            
+            if not running:
+                return
+    
+    def _resolve(self, batch):
+        
+        # Tách lượt theo phiên (giữ thứ tự đến), mỗi phiên 1 lần lock
+        started_ns = time.perf_counter_ns()
+        by_auction = {}
+        for entry in batch:
+            by_auction.setdefault(entry[1], []).append(entry)
+            latency.record("batch_wait", started_ns - entry[6])
+        
+        for auction_state, entries in by_auction.items():
+            try:
+                results, update = auction_state.place_bid_batch(
+                    [(user, value, arrival) for _, _, user, value, arrival, _, _ in entries]
+                )
+            except Exception as e:
+                log.error("BID_BATCHER", "❌ Lỗi xử lý lượt", auction_id=auction_state.auction_id, error=e)
+                results, update = [(False, "Lỗi server")] * len(entries), None
+            
+            for (session, _, _, value, _, received_ns, _), (success, message) in zip(entries, results):
+                # Chỉ bid thắng lượt mang update → 1 NEW_PRICE cho cả lượt
+                try:
+                    session.finish_bid("BID", auction_state.auction_id, value, success, message,
+                                       update if success else None, received_ns)
+                except Exception as e:
+                    log.error("BID_BATCHER", "❌ Lỗi gửi kết quả", client_id=session.client_id, error=e)
+        
+        self.windows.increment()
+        if len(batch) > self.window_max:
+            self.window_max = len(batch)
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: bids, windows, avg_window, window_max
+        """
+        windows = self.windows.value
+        return {
+            "bids": self.bids.value,
+            "windows": windows,
+            "avg_window": round(self.bids.value / windows, 1) if windows else 0.0,
+            "window_max": self.window_max
+        }
+    
+    def close(self):
+        """
+        Xử lý nốt lượt đang gom rồi dừng thread
+        """
+        with self.condition:
+            if not self.is_running:
+                return
+            self.is_running = False
+            self.condition.notify()
+        
+        self.worker_thread.join(timeout=5)
+        print(f"[BID_BATCHER] Đã dừng: {self.get_stats()}")
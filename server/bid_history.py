@@ -0,0 +1,169 @@
+"""
+Bid History Module - Lịch sử bid của 1 phiên, lưu dạng cột (columnar)
+
+Thay vì list các dict ({"user", "value", "time"} ~ vài trăm bytes / bid),
+mỗi trường được lưu trong 1 array kiểu nguyên thủy:
+- values     : array('q')  giá của từng bid (cents)              (8 bytes)
+- timestamps : array('q')  time.monotonic_ns() lúc bid được nhận (8 bytes)
+- user_ids   : array('I')  chỉ số vào bảng user đã intern        (4 bytes)
+→ ~20 bytes / bid: 1 triệu bid ≈ 20 MB
+
+Thread-Safety:
+- BidHistory KHÔNG có lock riêng: append() và các thao tác đọc được gọi
+  khi đang giữ AuctionState.lock (append là O(1) amortized)
+- slice()/export() copy ra array mới nên có thể dùng sau khi nhả lock
+"""
+
+import time
+from array import array
+
+from pricing import to_units
+
+
+class BidHistory:
+    """
+    Lịch sử bid dạng cột của 1 phiên đấu giá
+    
+    Attributes:
+        values (array): Giá của từng bid (cents)
+        timestamps (array): time.monotonic_ns() của từng bid
+        user_ids (array): Chỉ số user (vào self.users) của từng bid
+        users (list): Bảng user đã intern (mỗi tên chỉ lưu 1 lần)
+        user_index (dict): {user: chỉ số trong self.users}
+        epoch_offset_ns (int): time.time_ns() - time.monotonic_ns() lúc tạo
+            (để đổi timestamp monotonic sang thời gian thực khi export)
+    """
+    
+    def __init__(self):
+        self.values = array('q')
+        self.timestamps = array('q')
+        self.user_ids = array('I')
+        self.users = []
+        self.user_index = {}
+        self.epoch_offset_ns = time.time_ns() - time.monotonic_ns()
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def intern_user(self, user):
+        """
+        Lấy chỉ số của user, thêm vào bảng nếu chưa có
+        
+        Args:
+            user (str): Tên người đặt giá
+        
+        Returns:
+            int: Chỉ số trong self.users
+        """
+        user_id = self.user_index.get(user)
+        if user_id is None:
+            user_id = len(self.users)
+            self.users.append(user)
+            self.user_index[user] = user_id
+        return user_id
+    
+    def append(self, user, value, timestamp_ns=None):
+        """
+        Thêm 1 bid (O(1) amortized - gọi trong AuctionState.lock)
+        
+        Args:
+            user (str): Tên người đặt giá
+            value (int): Giá đặt (cents)
+            timestamp_ns (int, optional): time.monotonic_ns() (mặc định: bây giờ)
+        """
+        self.values.append(value)
+        self.timestamps.append(time.monotonic_ns() if timestamp_ns is None else timestamp_ns)
+        self.user_ids.append(self.intern_user(user))
+    
+    def slice(self, start=None, stop=None):
+        """
+        Copy 1 đoạn lịch sử (chỉ copy 3 array, không tạo object cho từng bid)
+        
+        Args:
+            start (int, optional): Chỉ số bắt đầu (cho phép số âm như list)
+            stop (int, optional): Chỉ số kết thúc
+        
+        Returns:
+            tuple: (values, timestamps, user_ids) - các array mới
+        """
+        index = slice(start, stop)
+        return self.values[index], self.timestamps[index], self.user_ids[index]
+    
+    def last(self, count):
+        """
+        Copy count bid gần nhất
+        
+        Returns:
+            tuple: (values, timestamps, user_ids)
+        """
+        if count <= 0:
+            return array('q'), array('q'), array('I')
+        return self.slice(-count, None)
+    
+    def export(self, start=None, stop=None):
+        """
+        Xuất 1 đoạn lịch sử thành các cột JSON-friendly
+        
+        Args:
+            start (int, optional): Chỉ số bắt đầu
+            stop (int, optional): Chỉ số kết thúc
+        
+        Returns:
+            dict: {"users", "values", "values_cents", "timestamps_ms"}
+                timestamps_ms là thời gian thực (epoch, mili giây)
+        """
+        return self.to_columns(self.slice(start, stop))
+    
+    def to_columns(self, sliced):
+        """
+        Đổi kết quả của slice()/last() thành các cột JSON-friendly
+        
+        Có thể gọi sau khi nhả AuctionState.lock: bảng user chỉ được thêm vào
+        cuối nên các chỉ số trong sliced luôn hợp lệ.
+        
+        Args:
+            sliced (tuple): (values, timestamps, user_ids)
+        
+        Returns:
+            dict: {"users": [...], "values": [...], "values_cents": [...],
+                   "timestamps_ms": [...]} - values theo đơn vị để hiển thị
+        """
+        values, timestamps, user_ids = sliced
+        users = self.users
+        offset = self.epoch_offset_ns
+        return {
+            "users": [users[user_id] for user_id in user_ids],
+            "values": [to_units(value) for value in values],
+            "values_cents": values.tolist(),
+            "timestamps_ms": [(timestamp + offset) // 1_000_000 for timestamp in timestamps]
+        }
+    
+    def get_stats(self):
+        """
+        Thống kê nhanh của lịch sử
+        
+        Returns:
+            dict: bids, bidders, first_value, last_value, duration_ms, bytes
+        """
+        count = len(self.values)
+        return {
+            "bids": count,
+            "bidders": len(self.users),
+            "first_value": self.values[0] if count else None,
+            "last_value": self.values[-1] if count else None,
+            "duration_ms": (self.timestamps[-1] - self.timestamps[0]) // 1_000_000 if count else 0,
+            "bytes": self.memory_usage()
+        }
+    
+    def memory_usage(self):
+        """
+        Ước lượng bộ nhớ của các cột (không tính bảng user)
+        
+        Returns:
+            int: Số bytes
+        """
+        return (
+            self.values.itemsize * len(self.values)
+            + self.timestamps.itemsize * len(self.timestamps)
+            + self.user_ids.itemsize * len(self.user_ids)
+        )
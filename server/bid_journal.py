@@ -0,0 +1,407 @@
+"""
+Bid Journal Module - Write-ahead log nhị phân cho các bid được chấp nhận
+
+Nhiệm vụ chính:
+1. Ghi mọi bid được chấp nhận theo đúng thứ tự của place_bid (append-only)
+2. Group commit: gom nhiều bản ghi rồi write + fsync 1 lần
+   (mỗi journal_interval_ms mili giây hoặc khi đủ journal_batch bản ghi)
+3. Khởi động lại sau crash: replay journal để khôi phục giá, người dẫn đầu
+   và thời gian còn lại của từng phiên
+
+Hiệu năng:
+- append() chỉ pack struct + thêm vào buffer trong RAM (gọi được khi đang
+  giữ AuctionState.lock mà không chờ I/O)
+- 1 writer thread duy nhất làm write() + fsync() ngoài mọi lock của server
+- Bid được broadcast trước khi fsync xong → crash có thể mất tối đa các bid
+  trong 1 chu kỳ group commit (journal_interval_ms)
+
+Định dạng file:
+    MAGIC (5 bytes) rồi các bản ghi:
+    [crc32: uint32][length: uint16][type: uint8][payload: length bytes]
+    crc32 tính trên type + payload; bản ghi cuối bị cắt dở / sai crc
+    (crash khi đang ghi) được bỏ qua và cắt khỏi file khi mở lại.
+
+Các loại bản ghi (thời điểm lưu theo time.time() vì monotonic không còn
+ý nghĩa sau khi process khởi động lại):
+- RECORD_START   : phiên bắt đầu, payload = deadline (epoch) + auction_id
+- RECORD_DEADLINE: deadline thay đổi (anti-snipe), payload như START
+- RECORD_BID     : bid được chấp nhận, payload = value (cents, int64) + timestamp
+                   + auction_id + user
+- RECORD_END     : phiên kết thúc, payload = auction_id
+- RECORD_PROXY   : đăng ký / nâng ceiling của proxy bid, payload = ceiling (cents)
+                   + auction_id + user (giá do proxy trả được ghi bằng RECORD_BID)
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+
+from counters import AtomicCounter
+
+# AUCJ2: value của RECORD_BID là int64 cents (AUCJ1 lưu double)
+MAGIC = b"AUCJ2"
+
+RECORD_START = 1
+RECORD_DEADLINE = 2
+RECORD_BID = 3
+RECORD_END = 4
+RECORD_PROXY = 5
+
+DEFAULT_INTERVAL_MS = 10
+DEFAULT_BATCH = 256
+
+_HEADER = struct.Struct("<IHB")       # crc32, payload length, type
+_DEADLINE = struct.Struct("<d")       # deadline (epoch seconds)
+_BID = struct.Struct("<qd")           # value (cents), timestamp (epoch seconds)
+_PROXY = struct.Struct("<q")          # ceiling (cents)
+_SHORT_LEN = struct.Struct("<B")      # độ dài auction_id
+_LONG_LEN = struct.Struct("<H")       # độ dài user
+
+
+def _pack_text(text, length_struct):
+    data = text.encode('utf-8')
+    limit = 255 if length_struct is _SHORT_LEN else 65535
+    if len(data) > limit:
+        # Cắt theo ranh giới ký tự: cắt giữa 1 ký tự UTF-8 thì replay không decode được
+        data = data[:limit].decode('utf-8', 'ignore').encode('utf-8')
+    return length_struct.pack(len(data)) + data
+
+
+def _unpack_text(payload, offset, length_struct):
+    (length,) = length_struct.unpack_from(payload, offset)
+    offset += length_struct.size
+    return payload[offset:offset + length].decode('utf-8'), offset + length
+
+
+def encode_record(record_type, payload):
+    """
+    Đóng gói 1 bản ghi journal
+    
+    Args:
+        record_type (int): RECORD_*
+        payload (bytes): Nội dung bản ghi
+    
+    Returns:
+        bytes: Header + payload
+    """
+    crc = zlib.crc32(payload, zlib.crc32(bytes((record_type,))))
+    return _HEADER.pack(crc, len(payload), record_type) + payload
+
+
+class BidJournal:
+    """
+    Write-ahead bid journal với group commit
+    
+    Attributes:
+        path (str): Đường dẫn file journal
+        interval (float): Chu kỳ group commit (giây)
+        batch (int): Số bản ghi chờ tối đa trước khi commit ngay
+        pending (list): Các bản ghi đã encode chưa được ghi xuống đĩa
+        condition (threading.Condition): Bảo vệ pending + đánh thức writer
+    """
+    
+    def __init__(self, path, interval_ms=DEFAULT_INTERVAL_MS, batch=DEFAULT_BATCH):
+        """
+        Args:
+            path (str): Đường dẫn file journal (tạo mới nếu chưa có)
+            interval_ms (int): fsync mỗi N mili giây
+            batch (int): fsync ngay khi có N bản ghi chờ
+        """
+        self.path = path
+        self.interval = interval_ms / 1000.0
+        self.batch = batch
+        
+        self.pending = []
+        self.condition = threading.Condition()
+        self.is_running = True
+        
+        # Thống kê
+        self.records = AtomicCounter()
+        self.commits = AtomicCounter()
+        self.bytes_written = AtomicCounter()
+        self.commit_max = 0.0
+        
+        self.file = self._open()
+        self.writer_thread = threading.Thread(
+            target=self._writer_loop,
+            name="BidJournal-writer",
+            daemon=True
+        )
+        self.writer_thread.start()
+        
+        print(f"[JOURNAL] Ghi bid journal vào {path} "
+              f"(group commit {interval_ms}ms / {batch} bản ghi)")
+    
+    def _open(self):
+        """
+        Mở file để append; file mới thì ghi MAGIC, file cũ thì cắt phần đuôi hỏng
+        
+        Raises:
+            ValueError: Nếu file đã tồn tại nhưng không phải bid journal
+        """
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        valid_end = scan_journal(self.path)[1] if size else 0
+        if size and valid_end == 0:
+            # Không ghi đè file không phải journal (VD: truyền nhầm đường dẫn)
+            raise ValueError(f"{self.path} không phải bid journal")
+        
+        journal_file = open(self.path, "ab")
+        if valid_end == 0:
+            journal_file.truncate(0)
+            journal_file.write(MAGIC)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        elif journal_file.tell() > valid_end:
+            print(f"[JOURNAL] ⚠️ Bỏ {journal_file.tell() - valid_end} bytes cuối bị ghi dở")
+            journal_file.truncate(valid_end)
+        return journal_file
+    
+    # ========== APPEND (gọi từ AuctionState / AuctionTimer) ==========
+    
+    def append(self, record_type, payload):
+        """
+        Thêm 1 bản ghi vào buffer (không chờ I/O)
+        
+        Args:
+            record_type (int): RECORD_*
+            payload (bytes): Nội dung bản ghi
+        """
+        record = encode_record(record_type, payload)
+        
+        with self.condition:
+            self.pending.append(record)
+            # Bản ghi đầu tiên mở cửa sổ group commit; đủ batch thì commit ngay
+            if len(self.pending) == 1 or len(self.pending) >= self.batch:
+                self.condition.notify()
+        
+        self.records.increment()
+    
+    def record_bid(self, auction_id, user, value):
+        """
+        Ghi 1 bid được chấp nhận (gọi trong AuctionState.lock để giữ thứ tự)
+        
+        Args:
+            auction_id (str): ID phiên
+            user (str): Người đặt giá
+            value (int): Giá (cents)
+        """
+        self.append(
+            RECORD_BID,
+            _BID.pack(value, time.time())
+            + _pack_text(auction_id, _SHORT_LEN)
+            + _pack_text(str(user), _LONG_LEN)
+        )
+    
+    def record_proxy(self, auction_id, user, ceiling):
+        """
+        Ghi ceiling của 1 proxy bid (gọi trong AuctionState.lock, trước các bid
+        mà proxy đó tự trả)
+        
+        Args:
+            auction_id (str): ID phiên
+            user (str): Người đăng ký
+            ceiling (int): Giá tối đa (cents)
+        """
+        self.append(
+            RECORD_PROXY,
+            _PROXY.pack(ceiling)
+            + _pack_text(auction_id, _SHORT_LEN)
+            + _pack_text(str(user), _LONG_LEN)
+        )
+    
+    def record_deadline(self, auction_id, remaining, record_type=RECORD_DEADLINE):
+        """
+        Ghi deadline của 1 phiên (lúc bắt đầu hoặc khi bị dời)
+        
+        Args:
+            auction_id (str): ID phiên
+            remaining (float): Số giây còn lại tính từ bây giờ
+            record_type (int): RECORD_START hoặc RECORD_DEADLINE
+        """
+        self.append(
+            record_type,
+            _DEADLINE.pack(time.time() + remaining) + _pack_text(auction_id, _SHORT_LEN)
+        )
+    
+    def record_end(self, auction_id):
+        """
+        Ghi phiên đã kết thúc
+        """
+        self.append(RECORD_END, _pack_text(auction_id, _SHORT_LEN))
+    
+    # ========== GROUP COMMIT ==========
+    
+    def _writer_loop(self):
+        """
+        Writer thread: mỗi chu kỳ (hoặc khi đủ batch) ghi toàn bộ buffer + fsync 1 lần
+        
+        Không có bid → writer ngủ hẳn (không thức dậy theo chu kỳ)
+        """
+        while True:
+            with self.condition:
+                while self.is_running and not self.pending:
+                    self.condition.wait()
+                # Cửa sổ group commit: gom thêm bản ghi trong interval
+                if self.is_running and len(self.pending) < self.batch:
+                    self.condition.wait(self.interval)
+                records = self.pending
+                self.pending = []
+                running = self.is_running
+            
+            if records:
+                self._commit(records)
+            
+            if not running:
+                return
+    
+    def _commit(self, records):
+        started = time.monotonic()
+        data = b"".join(records)
+        
+        try:
+            self.file.write(data)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except OSError as e:
+            print(f"[JOURNAL] ❌ Lỗi ghi journal: {e}")
+            return
+        
+        elapsed = time.monotonic() - started
+        self.commits.increment()
+        self.bytes_written.increment(len(data))
+        if elapsed > self.commit_max:
+            self.commit_max = elapsed
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: records, commits, bytes, avg_batch, commit_max_ms
+        """
+        commits = self.commits.value
+        return {
+            "records": self.records.value,
+            "commits": commits,
+            "bytes": self.bytes_written.value,
+            "avg_batch": round(self.records.value / commits, 1) if commits else 0.0,
+            "commit_max_ms": round(self.commit_max * 1000, 3)
+        }
+    
+    def close(self):
+        """
+        Commit nốt các bản ghi còn lại, fsync và đóng file
+        """
+        with self.condition:
+            if not self.is_running:
+                return
+            self.is_running = False
+            self.condition.notify()
+        
+        self.writer_thread.join(timeout=5)
+        try:
+            self.file.close()
+        except OSError:
+            pass
+        
+        print(f"[JOURNAL] Đã đóng journal: {self.get_stats()}")
+
+
+# ========== REPLAY ==========
+
+def scan_journal(path):
+    """
+    Đọc toàn bộ journal, dừng ở bản ghi hỏng đầu tiên
+    
+    Args:
+        path (str): Đường dẫn file journal
+    
+    Returns:
+        tuple: (records: list[(type, payload)], valid_end: int)
+            valid_end = offset ngay sau bản ghi hợp lệ cuối cùng
+            (0 nếu file không phải journal)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    
+    if not data.startswith(MAGIC):
+        return [], 0
+    
+    records = []
+    offset = len(MAGIC)
+    
+    while offset + _HEADER.size <= len(data):
+        crc, length, record_type = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        payload = data[start:start + length]
+        
+        if len(payload) < length:
+            break
+        if zlib.crc32(payload, zlib.crc32(bytes((record_type,)))) != crc:
+            break
+        
+        records.append((record_type, payload))
+        offset = start + length
+    
+    return records, offset
+
+
+def replay_journal(path, on_bid=None):
+    """
+    Dựng lại trạng thái các phiên từ journal
+    
+    Args:
+        path (str): Đường dẫn file journal
+        on_bid (callable, optional): Gọi với (auction_id, user, value, timestamp)
+            (value theo cents)
+            cho từng bid theo đúng thứ tự (VD: để dựng lại BidHistory)
+    
+    Returns:
+        dict: {auction_id: {"current_price", "current_winner", "bids",
+                            "proxies", "deadline", "ended"}}
+            deadline là epoch seconds (None nếu phiên chưa bắt đầu),
+            current_price theo cents, proxies = [(user, ceiling)] theo thứ tự ghi
+    """
+    auctions = {}
+    
+    def get_auction(auction_id):
+        return auctions.setdefault(auction_id, {
+            "current_price": None,
+            "current_winner": None,
+            "bids": 0,
+            "proxies": [],
+            "deadline": None,
+            "ended": False
+        })
+    
+    records, _ = scan_journal(path)
+    
+    for record_type, payload in records:
+        if record_type == RECORD_BID:
+            value, timestamp = _BID.unpack_from(payload, 0)
+            auction_id, offset = _unpack_text(payload, _BID.size, _SHORT_LEN)
+            user, _ = _unpack_text(payload, offset, _LONG_LEN)
+            auction = get_auction(auction_id)
+            auction["current_price"] = value
+            auction["current_winner"] = user
+            auction["bids"] += 1
+            if on_bid is not None:
+                on_bid(auction_id, user, value, timestamp)
+        
+        elif record_type == RECORD_PROXY:
+            (ceiling,) = _PROXY.unpack_from(payload, 0)
+            auction_id, offset = _unpack_text(payload, _PROXY.size, _SHORT_LEN)
+            user, _ = _unpack_text(payload, offset, _LONG_LEN)
+            get_auction(auction_id)["proxies"].append((user, ceiling))
+        
+        elif record_type in (RECORD_START, RECORD_DEADLINE):
+            (deadline,) = _DEADLINE.unpack_from(payload, 0)
+            auction_id, _ = _unpack_text(payload, _DEADLINE.size, _SHORT_LEN)
+            get_auction(auction_id)["deadline"] = deadline
+        
+        elif record_type == RECORD_END:
+            auction_id, _ = _unpack_text(payload, 0, _SHORT_LEN)
+            get_auction(auction_id)["ended"] = True
+    
+    print(f"[JOURNAL] Replay {len(records)} bản ghi từ {path}")
+    return auctions
@@ -1,137 +1,338 @@
 import threading
 import socket
-import json
+import time
 
+from message_framing import LineFramer
+from event_log import log
+from latency import latency
+from pricing import PriceError, parse_cents, parse_price, to_units
+from rate_limit import RATE_LIMITED_FRAME
 
-class ClientThread(threading.Thread):
+# GET_HISTORY: số bid trả về mặc định / tối đa cho 1 request
+DEFAULT_HISTORY_LIMIT = 20
+MAX_HISTORY_LIMIT = 1000
+
+
+class ClientSession:
     
-    def __init__(self, client_socket, client_address, client_id, auction_hub, auction_state):
+    # Logic xử lý giao thức của 1 client (WELCOME, BID, PROXY_BID, SUBSCRIBE, UNSUBSCRIBE,
+    # GET_HISTORY, ERROR)
+    # Dùng chung cho ClientThread (mỗi client 1 thread) và AsyncClientSession
+    # (chế độ asyncio). Mọi message gửi đi đều qua outbox của client trong Hub.
     
-        # Khởi tạo client thread
+    def __init__(self, client_socket, client_address, client_id, auction_hub, auction_state,
+                 auction_registry=None):
         
         # Args:
-        #     client_socket: Socket của client
+        #     client_socket: Socket (hoặc object giống socket) của client
         #     client_address: Address (IP, port) của client
         #     client_id: ID duy nhất cho client
         #     auction_hub: Reference đến AuctionHub để broadcast
-        #     auction_state: Reference đến AuctionState để xử lý bids
-    
-        super().__init__()
+        #     auction_state: AuctionState mặc định (BID không kèm auction_id)
+        #     auction_registry: AuctionRegistry khi server có nhiều phiên (optional)
+        
         self.client_socket = client_socket
         self.client_address = client_address
         self.client_id = client_id
         self.auction_hub = auction_hub
         self.auction_state = auction_state
+        self.auction_registry = auction_registry
         self.is_running = True
-        self.daemon = True  # Thread sẽ tự động kết thúc khi main thread kết thúc
-    
-    def run(self):
+        
+        # Buffer tách frame: TCP có thể gộp nhiều BID vào 1 lần recv
+        # hoặc cắt 1 BID thành nhiều lần recv
+        self.framer = LineFramer()
+        
+        # Token bucket BID của riêng kết nối này (None = không giới hạn)
+        rate_limiter = auction_hub.rate_limiter
+        self.bid_bucket = rate_limiter.new_connection_bucket() if rate_limiter else None
+        # Khóa bucket user: (địa chỉ client, tên trong BID đầu tiên) - gán 1 lần,
+        # đổi trường "user" ở các BID sau không chuyển sang / rút cạn bucket khác
+        self.rate_limit_key = None
+        
+        # Mốc thời gian (perf_counter_ns) của khối bytes đang xử lý - đo độ trễ BID
+        self.received_ns = 0
+        self.decoded_ns = 0
 
-        # Main loop của thread - nhận và xử lý messages từ client
-        print(f"[{self.client_id}] Thread started")
+    def process_data(self, data):
         
-        # Gửi welcome message
-        self.send_welcome()
+        # Xử lý 1 khối bytes nhận được từ client
+        # Decode mọi message hoàn chỉnh trong khối, giữ lại phần chưa đủ
+        self.received_ns = time.perf_counter_ns()
+        self.auction_hub.traffic.bytes_in.increment(len(data))
+        messages, errors = self.framer.feed(data)
+        self.decoded_ns = time.perf_counter_ns()
+        if messages:
+            latency.record("recv", self.decoded_ns - self.received_ns)
         
-        try:
-            while self.is_running:
-                # Nhận data từ client
-                data = self.client_socket.recv(4096)
-                
-                if not data:
-                    # Client đã ngắt kết nối
-                    print(f"[{self.client_id}] Ngắt kết nối")
-                    break
-                
-                # Parse JSON message
-                try:
-                    message = json.loads(data.decode('utf-8'))
-                    self.handle_message(message)
-                except json.JSONDecodeError as e:
-                    print(f"[{self.client_id}] Lỗi parse JSON: {e}")
-                    self.send_error("Invalid JSON format")
-                except Exception as e:
-                    print(f"[{self.client_id}] Lỗi xử lý message: {e}")
-                    self.send_error(f"Error: {str(e)}")
+        for error in errors:
+            log.warning("CLIENT", "Lỗi parse JSON", client_id=self.client_id, error=error)
+            self.send_error("Invalid JSON format")
         
-        except Exception as e:
-            print(f"[{self.client_id}] Exception: {e}")
-        finally:
-            self.cleanup()
+        for message in messages:
+            try:
+                self.handle_message(message)
+            except Exception as e:
+                log.error("CLIENT", "Lỗi xử lý message", client_id=self.client_id, error=e)
+                self.send_error(f"Error: {str(e)}")
     
     def send_welcome(self):
-        current_price = self.auction_state.get_current_price()
-        current_winner = self.auction_state.get_current_winner()
-        
-        # Lấy thông tin vật phẩm từ auction_state
-        item_name = getattr(self.auction_state, 'item_name', 'Sản phẩm bí mật')
-        description = getattr(self.auction_state, 'description', 'Một món đồ đặc biệt')
-        starting_price = getattr(self.auction_state, 'starting_price', current_price)
-        
-        welcome_msg = {
-            "type": "WELCOME",
-            "message": f"Chào mừng {self.client_id}!",
-            "current_price": current_price,
+        frame = self.build_welcome_frame()
+        if not self.auction_hub.send_frame_to_client(self.client_socket, frame, "WELCOME"):
+            self.is_running = False
+            return
+        
+        # Nhiều phiên: gửi danh mục để client chọn auction_id khi đặt giá
+        if self.auction_registry is not None and len(self.auction_registry) > 1:
+            self.send_message({
+                "type": "CATALOG",
+                "auctions": self.auction_registry.get_catalog_info()
+            })
+        
+        # Chế độ deadline: client vào giữa phiên cần deadline để tự đếm ngược
+        self.send_timer_sync(self.auction_state.auction_id)
+    
+    def build_welcome_frame(self):
+        
+        # Frame WELCOME của client này (benchmark.py đo riêng hàm này)
+        # Giá hiển thị + current_price_cents + version (get_auction_info đọc 1 snapshot, không lock)
+        info = self.auction_state.get_auction_info()
+        current_winner = info["current_winner"]
+        
+        snapshot = {
+            "auction_id": self.auction_state.auction_id,
+            "current_price": info["current_price"],
+            "current_price_cents": info["current_price_cents"],
             "current_winner": current_winner if current_winner else "Chưa có người đấu giá",
             # Thông tin vật phẩm đấu giá
-            "item_name": item_name,
-            "description": description,
-            "starting_price": starting_price
+            "item_name": info["item_name"],
+            "description": info["description"],
+            "starting_price": info["starting_price"],
+            "min_increment": info["min_increment"],
+            "max_price": info["max_price"],
+            "version": info["version"]
         }
-        self.send_message(welcome_msg)
+        
+        # Phần snapshot được encode 1 lần cho mọi client cùng trạng thái
+        return self.auction_hub.frame_cache.welcome_frame(
+            f"Chào mừng {self.client_id}!", snapshot
+        )
+    
+    def send_timer_sync(self, auction_id):
+        
+        # Gửi TIMER_SYNC của 1 phiên (chỉ chế độ deadline, phiên đã bắt đầu)
+        timer = self.auction_hub.auction_timers.get(auction_id)
+        if timer is not None and timer.timer_mode == "deadline" and timer.deadline is not None:
+            self.send_message(timer.build_sync_message())
     
     def handle_message(self, message):
+        if not isinstance(message, dict):
+            self.send_error("Message must be a JSON object")
+            return
+        
         msg_type = message.get("type")
         
-        if msg_type == "BID":
-            # Xử lý bid request
-            user = message.get("user", self.client_id)
-            value = message.get("value")
-            
-            if value is None:
-                self.send_error("Missing bid value")
-                return
-            
-            try:
-                value = float(value)
-            except ValueError:
-                self.send_error("Bid value must be a number")
-                return
-            
-            # Gọi auction_state để xử lý bid
-            success, result_message = self.auction_state.place_bid(user, value)
-            
-            if success:
-                # Bid thành công - broadcast NEW_PRICE
-                self.auction_hub.broadcast_new_price(user, value)
-                print(f"[{self.client_id}] BID accepted: {user} = ${value}")
+        if msg_type in ("BID", "PROXY_BID"):
+            self.handle_bid(message, msg_type)
+        
+        elif msg_type == "GET_HISTORY":
+            self.handle_get_history(message.get("auction_id"), message.get("limit"))
+        
+        elif msg_type == "SUBSCRIBE":
+            self.handle_subscribe(message.get("auction_id"))
+        
+        elif msg_type == "UNSUBSCRIBE":
+            auction_id = message.get("auction_id")
+            if self.auction_hub.unsubscribe(self.client_socket, auction_id):
+                self.send_message({"type": "UNSUBSCRIBED", "auction_id": auction_id})
             else:
-                # Bid thất bại - gửi ERROR
-                self.send_error(result_message)
-                print(f"[{self.client_id}] BID rejected: {result_message}")
+                self.send_error(f"Not subscribed: {auction_id}")
         
         else:
             self.send_error(f"Unknown message type: {msg_type}")
     
-    def send_message(self, message_dict):
+    def read_price(self, message, field):
+        
+        # Giá → số nguyên cents ngay tại đây (<field>_cents nếu client gửi,
+        # không thì parse <field> mà không đi qua float)
+        # Returns: cents, hoặc None nếu thiếu / sai (đã gửi ERROR)
         try:
-            message_json = json.dumps(message_dict) + "\n"
-            self.client_socket.sendall(message_json.encode('utf-8'))
-        except Exception as e:
-            print(f"[{self.client_id}] Lỗi gửi message: {e}")
+            if f"{field}_cents" in message:
+                return parse_cents(message[f"{field}_cents"])
+            if message.get(field) is not None:
+                return parse_price(message[field])
+        except PriceError as e:
+            self.send_error(str(e))
+            return None
+        
+        self.send_error("Missing bid value")
+        return None
+    
+    def handle_bid(self, message, msg_type):
+        
+        # BID: đặt giá thường | PROXY_BID: đăng ký giá tối đa ẩn (max_value),
+        # server tự trả giá thay người chơi (xem proxy_bidding.py)
+        user = message.get("user", self.client_id)
+        is_proxy = msg_type == "PROXY_BID"
+        
+        # Rate limit: kiểm tra trước khi parse giá và lấy lock của phiên.
+        # Bid bị chặn chỉ được đếm (không print) và nhận frame ERROR encode sẵn
+        rate_limiter = self.auction_hub.rate_limiter
+        if rate_limiter is not None:
+            if self.rate_limit_key is None:
+                host = self.client_address[0] if self.client_address else self.client_id
+                self.rate_limit_key = (host, user)
+            if not rate_limiter.allow(self.bid_bucket, self.rate_limit_key):
+                self.auction_hub.send_frame_to_client(self.client_socket, RATE_LIMITED_FRAME, "ERROR")
+                return
+        
+        value = self.read_price(message, "max_value" if is_proxy else "value")
+        if value is None:
+            return
+        
+        # Tìm phiên đấu giá (mỗi phiên có lock riêng)
+        auction_state = self.resolve_auction(message.get("auction_id"))
+        if auction_state is None:
+            self.send_error(f"Unknown auction_id: {message.get('auction_id')}")
+            return
+        
+        # Hết chặng parse: frame đã tách xong → bắt đầu đặt giá
+        latency.record("parse", time.perf_counter_ns() - self.decoded_ns)
+        received_ns = self.received_ns
+        
+        # Micro-batching: BID vào lượt hiện tại, kết quả trả qua finish_bid
+        bid_batcher = self.auction_hub.bid_batcher
+        if bid_batcher is not None and not is_proxy:
+            bid_batcher.submit(self, auction_state, user, value, received_ns)
+            return
+        
+        # Gọi auction_state để xử lý bid
+        if is_proxy:
+            success, result_message, update = auction_state.place_proxy_bid(user, value)
+        else:
+            success, result_message, update = auction_state.place_bid(user, value)
+        
+        self.finish_bid(msg_type, auction_state.auction_id, value, success, result_message, update,
+                        received_ns)
+    
+    def finish_bid(self, msg_type, auction_id, value, success, result_message, update,
+                   received_ns=None):
+        
+        # Gửi kết quả 1 bid: ERROR nếu bị từ chối, BID_ACCEPTED / PROXY_ACCEPTED + NEW_PRICE
+        # nếu được nhận
+        # Gọi từ handle_bid hoặc từ thread của BidBatcher (mọi lần gửi đều qua outbox)
+        # received_ns: lúc recv() BID này → NEW_PRICE được đo tới khi gửi xong (latency.py)
+        if not success:
+            # Bid thất bại - gửi ERROR
+            self.send_error(result_message)
+            log.info("CLIENT", f"{msg_type} rejected", client_id=self.client_id, auction_id=auction_id,
+                     value=value, reason=result_message)
+            return
+        
+        # Người đặt giá phải nhận được NEW_PRICE của phiên mình đặt
+        if not self.auction_hub.is_subscribed(self.client_socket, auction_id):
+            self.auction_hub.subscribe(self.client_socket, auction_id)
+        
+        if msg_type == "PROXY_BID":
+            # Ceiling chỉ gửi riêng cho người đăng ký
+            self.send_message({
+                "type": "PROXY_ACCEPTED",
+                "auction_id": auction_id,
+                "max_value": to_units(value),
+                "max_value_cents": value,
+                "message": result_message
+            })
+        elif update is not None:
+            # Trả lời riêng cho người đặt: NEW_PRICE có thể bị gộp trong outbox
+            # (client chậm) nên không đủ làm xác nhận của từng bid
+            self.send_message({
+                "type": "BID_ACCEPTED",
+                "auction_id": auction_id,
+                "value": to_units(value),
+                "value_cents": value,
+                "version": update.version,
+                "message": result_message
+            })
+        
+        # Giá mới sau khi các proxy đã tự trả giá (1 NEW_PRICE cho cả chuỗi)
+        if update is not None:
+            # Soft-close: deadline mới đi kèm chính NEW_PRICE
+            extension = None
+            if update.extended:
+                timer = self.auction_hub.auction_timers.get(auction_id)
+                if timer is not None:
+                    extension = timer.on_bid_extension(update)
+            
+            self.auction_hub.broadcast_new_price(update.winner, update.price, auction_id, extension,
+                                                 update.version, received_ns)
+            log.info("CLIENT", f"{msg_type} accepted", client_id=self.client_id, auction_id=auction_id,
+                     winner=update.winner, price=update.price)
+    
+    def handle_get_history(self, auction_id, limit):
+        
+        # Trả về các bid gần nhất của 1 phiên (dạng cột: users, values, timestamps_ms)
+        auction_state = self.resolve_auction(auction_id)
+        if auction_state is None:
+            self.send_error(f"Unknown auction_id: {auction_id}")
+            return
+        
+        try:
+            limit = DEFAULT_HISTORY_LIMIT if limit is None else int(limit)
+        except (TypeError, ValueError):
+            self.send_error("History limit must be a number")
+            return
+        limit = max(0, min(limit, MAX_HISTORY_LIMIT))
+        
+        total, columns = auction_state.get_history(limit)
+        message = {"type": "HISTORY", "auction_id": auction_state.auction_id, "total": total}
+        message.update(columns)
+        self.send_message(message)
+    
+    def handle_subscribe(self, auction_id):
+        
+        # Vào phòng của 1 phiên: từ giờ chỉ nhận sự kiện của các phòng đã SUBSCRIBE
+        # Trả về SUBSCRIBED kèm trạng thái hiện tại của phiên (như WELCOME)
+        auction_state = self.resolve_auction(auction_id) if auction_id is not None else None
+        if auction_state is None:
+            self.send_error(f"Unknown auction_id: {auction_id}")
+            return
+        
+        self.auction_hub.subscribe(self.client_socket, auction_id)
+        
+        info = auction_state.get_auction_info()
+        info["type"] = "SUBSCRIBED"
+        info["auction_id"] = auction_id
+        self.send_message(info)
+        self.send_timer_sync(auction_id)
+    
+    def resolve_auction(self, auction_id):
+        
+        # Tìm AuctionState cho 1 BID
+        # Không có registry: chỉ chấp nhận phiên mặc định
+        # Returns: AuctionState, hoặc None nếu auction_id không tồn tại
+        if self.auction_registry is None:
+            if auction_id is None or auction_id == self.auction_state.auction_id:
+                return self.auction_state
+            return None
+        
+        return self.auction_registry.resolve(auction_id)
+    
+    def send_message(self, message_dict):
+        # Gửi qua outbox của client trong Hub (cùng hàng đợi với broadcast
+        # nên các frame không bị ghi xen kẽ trên socket)
+        if not self.auction_hub.send_to_client(self.client_socket, message_dict):
+            log.warning("CLIENT", "Lỗi gửi message: client không còn kết nối", client_id=self.client_id)
             self.is_running = False
     
     def send_error(self, error_message):
 
-        error_msg = {
-            "type": "ERROR",
-            "message": error_message
-        }
-        self.send_message(error_msg)
+        # Frame ERROR lấy từ cache của Hub (các lỗi hay gặp không bị encode lại)
+        if not self.auction_hub.send_error_to_client(self.client_socket, error_message):
+            self.is_running = False
     
     def cleanup(self):
 
-        print(f"[{self.client_id}] Cleaning up...")
+        log.debug("CLIENT", "Cleaning up", client_id=self.client_id)
         
         # Xóa client khỏi hub
         self.auction_hub.remove_client(self.client_socket)
@@ -142,4 +343,45 @@ class ClientThread(threading.Thread):
         except:
             pass
         
-        print(f"[{self.client_id}] Thread terminated")
+        log.info("CLIENT", "Session terminated", client_id=self.client_id)
+
+
+class ClientThread(ClientSession, threading.Thread):
+    
+    def __init__(self, client_socket, client_address, client_id, auction_hub, auction_state,
+                 auction_registry=None):
+        
+        # Khởi tạo client thread (chế độ thread-per-client)
+        
+        # Args: giống ClientSession
+        
+        threading.Thread.__init__(self)
+        ClientSession.__init__(self, client_socket, client_address, client_id,
+                               auction_hub, auction_state, auction_registry)
+        self.daemon = True  # Thread sẽ tự động kết thúc khi main thread kết thúc
+    
+    def run(self):
+        
+        # Main loop của thread - nhận và xử lý messages từ client
+        log.debug("CLIENT", "Thread started", client_id=self.client_id)
+        
+        # Gửi welcome message
+        self.send_welcome()
+        
+        try:
+            while self.is_running:
+                # Nhận data từ client
+                data = self.client_socket.recv(4096)
+                
+                if not data:
+                    # Client đã ngắt kết nối
+                    log.info("CLIENT", "Ngắt kết nối", client_id=self.client_id)
+                    break
+                
+                # Parse JSON message
+                self.process_data(data)
+        
+        except Exception as e:
+            log.error("CLIENT", "Exception", client_id=self.client_id, error=e)
+        finally:
+            self.cleanup()
@@ -0,0 +1,92 @@
+"""
+Counters Module - Bộ đếm thread-safe cho thống kê server
+
+Dùng cho các số liệu được cập nhật từ nhiều threads (ClientThread,
+AuctionScheduler, writer threads) và được đọc mà không cần lock của Hub/State.
+"""
+
+import threading
+
+
+class AtomicCounter:
+    """
+    Bộ đếm số nguyên thread-safe
+    
+    Lock riêng của counter chỉ giữ trong thời gian cộng 1 số nên gần như
+    không bao giờ tranh chấp.
+    
+    Attributes:
+        value (int): Giá trị hiện tại
+    """
+    
+    def __init__(self, value=0):
+        """
+        Args:
+            value (int): Giá trị khởi tạo (mặc định 0)
+        """
+        self._value = value
+        self._lock = threading.Lock()
+    
+    def increment(self, amount=1):
+        """
+        Tăng counter
+        
+        Args:
+            amount (int): Lượng tăng (mặc định 1)
+        
+        Returns:
+            int: Giá trị sau khi tăng
+        """
+        with self._lock:
+            self._value += amount
+            return self._value
+    
+    @property
+    def value(self):
+        """
+        Đọc giá trị hiện tại (đọc 1 int là atomic nên không cần lock)
+        """
+        return self._value
+    
+    def reset(self):
+        """
+        Đưa counter về 0
+        """
+        with self._lock:
+            self._value = 0
+
+
+class TrafficStats:
+    """
+    Thống kê kết nối và lưu lượng của server (Hub giữ 1 instance dùng chung)
+    
+    Được cập nhật ngay tại chỗ xảy ra (add/remove client, recv, writer gửi xong)
+    nên /metrics đọc được mà không cần lock của Hub.
+    
+    Attributes:
+        connected (AtomicCounter): Số client đang kết nối
+        connections (AtomicCounter): Tổng số kết nối đã nhận
+        bytes_in (AtomicCounter): Tổng số bytes nhận từ clients
+        bytes_out (AtomicCounter): Tổng số bytes đã gửi cho clients
+        frames_out (AtomicCounter): Tổng số frame đã gửi cho clients
+    """
+    
+    def __init__(self):
+        self.connected = AtomicCounter()
+        self.connections = AtomicCounter()
+        self.bytes_in = AtomicCounter()
+        self.bytes_out = AtomicCounter()
+        self.frames_out = AtomicCounter()
+    
+    def to_dict(self):
+        """
+        Returns:
+            dict: Giá trị hiện tại của các counters
+        """
+        return {
+            "connected": self.connected.value,
+            "connections": self.connections.value,
+            "bytes_in": self.bytes_in.value,
+            "bytes_out": self.bytes_out.value,
+            "frames_out": self.frames_out.value
+        }
@@ -0,0 +1,319 @@
+"""
+Event Log Module - Ghi log có cấu trúc ở background (thay print trong hot path)
+
+Nhiệm vụ chính:
+1. Thread gọi log (ClientThread, scheduler, batcher...) chỉ đưa 1 tuple vào
+   hàng đợi - không format, không I/O, không lock → gọi được khi đang giữ
+   AuctionState.lock / Hub.lock mà không làm chậm ai
+2. 1 writer thread duy nhất format và ghi ra stdout theo từng đợt
+3. Level (DEBUG/INFO/WARNING/ERROR) lọc ngay lúc gọi (message bị lọc không vào hàng đợi)
+4. Trường có cấu trúc (client_id, auction_id, price, ...) truyền riêng với message
+5. Chặn lặp: cùng 1 (module, message) quá REPEAT_BURST lần / REPEAT_WINDOW giây
+   → chỉ đếm, hết cửa sổ in 1 dòng tóm tắt số dòng đã bỏ
+
+Định dạng:
+- "text" (mặc định): 12:00:01.123 INFO  [AUCTION_HUB] 📢 Broadcast NEW_PRICE | auction_id=auction-1 price=$1100
+- "json": 1 object JSON / dòng {"ts", "level", "module", "msg", ...fields}
+  (giá giữ nguyên số nguyên cents)
+
+Hàng đợi:
+- collections.deque: append/popleft là thao tác nguyên tử (không cần lock)
+- Giới hạn MAX_PENDING bản ghi: stdout bị nghẽn thì bỏ bản ghi cũ nhất
+  thay vì làm đầy RAM (số bản ghi bị bỏ được đếm)
+- Writer chỉ được đánh thức khi đang ngủ (Event), không thức dậy theo chu kỳ
+
+Khởi động:
+- Tạo EventLog không tạo thread; writer chỉ chạy sau start() (main_server gọi
+  lúc khởi động). Chưa start thì log() bỏ qua bản ghi → import module server từ
+  tests / benchmark.py / load_test.py không in log ra stdout, caller tự quyết
+  định có bật logger hay không
+"""
+
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+from counters import AtomicCounter
+from pricing import format_price
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+LOG_FORMATS = ("text", "json")
+
+DEFAULT_LEVEL = "INFO"
+DEFAULT_FORMAT = "text"
+
+MAX_PENDING = 100_000
+
+# Chặn lặp: tối đa REPEAT_BURST dòng cùng (module, message) mỗi REPEAT_WINDOW giây
+REPEAT_WINDOW = 1.0
+REPEAT_BURST = 10
+
+# Trường giá (cents) - dạng text in "$1100.10"
+PRICE_FIELDS = ("price", "value", "ceiling")
+
+
+class EventLog:
+    """
+    Logger bất đồng bộ: hàng đợi không lock + 1 writer thread
+    
+    Attributes:
+        level (int): Level thấp nhất được ghi
+        fmt (str): "text" hoặc "json"
+        pending (deque): Các bản ghi (ts, level, module, message, fields) chờ ghi
+        wakeup (threading.Event): Đánh thức writer khi có bản ghi mới
+        repeats (dict): {(module, message): [window_start, count, suppressed, level]}
+            - chỉ writer thread dùng
+    """
+    
+    def __init__(self, level=DEFAULT_LEVEL, fmt=DEFAULT_FORMAT, stream=None):
+        """
+        Args:
+            level (str): "DEBUG", "INFO", "WARNING" hoặc "ERROR"
+            fmt (str): "text" hoặc "json"
+            stream: File object để ghi (mặc định sys.stdout lúc ghi)
+        """
+        self.level = LEVELS[level]
+        self.fmt = fmt
+        self.stream = stream
+        
+        self.pending = deque(maxlen=MAX_PENDING)
+        self.wakeup = threading.Event()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.is_running = False
+        self.repeats = {}
+        
+        # Thống kê
+        self.written = AtomicCounter()
+        self.suppressed = AtomicCounter()
+        self.dropped = AtomicCounter()
+        
+        self.writer_thread = None
+    
+    def start(self):
+        """
+        Chạy writer thread (gọi 1 lần; gọi lại không có tác dụng)
+        """
+        if self.writer_thread is not None:
+            return
+        self.is_running = True
+        self.writer_thread = threading.Thread(
+            target=self._writer_loop,
+            name="EventLog-writer",
+            daemon=True
+        )
+        self.writer_thread.start()
+        atexit.register(self.close)
+    
+    def configure(self, level=None, fmt=None):
+        """
+        Đổi level / định dạng (main_server gọi sau khi đọc config)
+        
+        Args:
+            level (str, optional): "DEBUG", "INFO", "WARNING" hoặc "ERROR"
+            fmt (str, optional): "text" hoặc "json"
+        """
+        if level is not None:
+            self.level = LEVELS[level]
+        if fmt is not None:
+            self.fmt = fmt
+    
+    # ========== GHI LOG (gọi từ mọi thread) ==========
+    
+    def log(self, level, module, message, **fields):
+        """
+        Đưa 1 bản ghi vào hàng đợi (không format, không I/O, không lock)
+        
+        Args:
+            level (int): DEBUG / INFO / WARNING / ERROR
+            module (str): Tên module (VD: "AUCTION_HUB")
+            message (str): Nội dung cố định (phần thay đổi để trong fields →
+                các dòng cùng loại gộp được khi chặn lặp)
+            **fields: Trường có cấu trúc (client_id, auction_id, price, ...)
+        """
+        if level < self.level or not self.is_running:
+            return
+        
+        pending = self.pending
+        if len(pending) >= MAX_PENDING:
+            # deque có maxlen tự bỏ bản ghi cũ nhất
+            self.dropped.increment()
+        pending.append((time.time(), level, module, message, fields))
+        
+        if not self.wakeup.is_set():
+            self.wakeup.set()
+    
+    def debug(self, module, message, **fields):
+        self.log(DEBUG, module, message, **fields)
+    
+    def info(self, module, message, **fields):
+        self.log(INFO, module, message, **fields)
+    
+    def warning(self, module, message, **fields):
+        self.log(WARNING, module, message, **fields)
+    
+    def error(self, module, message, **fields):
+        self.log(ERROR, module, message, **fields)
+    
+    # ========== WRITER THREAD ==========
+    
+    def _writer_loop(self):
+        """
+        Writer thread: ngủ đến khi có bản ghi, ghi toàn bộ hàng đợi trong 1 lần write()
+        """
+        while True:
+            # Còn cửa sổ chặn lặp chưa tóm tắt → thức dậy sau REPEAT_WINDOW để in tóm tắt
+            self.wakeup.wait(REPEAT_WINDOW if self.repeats else None)
+            self.idle.clear()
+            self.wakeup.clear()
+            
+            self._drain()
+            
+            self.idle.set()
+            if not self.is_running and not self.pending:
+                self._write(self._flush_repeats(None))
+                return
+    
+    def _drain(self):
+        pending = self.pending
+        # Tóm tắt các cửa sổ chặn lặp đã hết hạn (1 lần mỗi đợt, không phải mỗi bản ghi)
+        lines = self._flush_repeats(time.time())
+        while pending:
+            try:
+                record = pending.popleft()
+            except IndexError:
+                break
+            
+            if self._allow(record, lines):
+                lines.append(self._format(*record))
+            
+            # Ghi theo đợt để stdout không giữ quá nhiều dòng trong RAM
+            if len(lines) >= 1000:
+                self._write(lines)
+                lines = []
+        
+        self._write(lines)
+    
+    def _allow(self, record, lines):
+        
+        # Chặn lặp theo (module, message) trong cửa sổ REPEAT_WINDOW giây
+        ts, level, module, message, _ = record
+        key = (module, message)
+        state = self.repeats.get(key)
+        if state is None or ts - state[0] >= REPEAT_WINDOW:
+            if state is not None and state[2]:
+                # Cửa sổ cũ còn dòng bị bỏ mà chưa tóm tắt (do _flush_repeats chưa quét tới)
+                lines.append(self._summary(key, state))
+            self.repeats[key] = [ts, 1, 0, level]
+            return True
+        
+        state[1] += 1
+        if state[1] <= REPEAT_BURST:
+            return True
+        state[2] += 1
+        self.suppressed.increment()
+        return False
+    
+    def _flush_repeats(self, now):
+        
+        # Tóm tắt các cửa sổ đã hết hạn (now=None → mọi cửa sổ) và dọn dict
+        if not self.repeats:
+            return []
+        lines = []
+        expired = [key for key, state in self.repeats.items()
+                   if now is None or now - state[0] >= REPEAT_WINDOW]
+        for key in expired:
+            state = self.repeats.pop(key)
+            if state[2]:
+                lines.append(self._summary(key, state))
+        return lines
+    
+    def _summary(self, key, state):
+        module, message = key
+        return self._format(time.time(), state[3], module, message,
+                            {"repeated": state[2], "window_s": REPEAT_WINDOW})
+    
+    def _format(self, ts, level, module, message, fields):
+        if self.fmt == "json":
+            record = {"ts": round(ts, 3), "level": LEVEL_NAMES[level], "module": module,
+                      "msg": message}
+            record.update(fields)
+            return json.dumps(record, ensure_ascii=False, default=str)
+        
+        clock = time.strftime("%H:%M:%S", time.localtime(ts)) + f".{int(ts * 1000) % 1000:03d}"
+        line = f"{clock} {LEVEL_NAMES[level]:<5} [{module}] {message}"
+        if fields:
+            parts = []
+            for name, value in fields.items():
+                if name in PRICE_FIELDS and isinstance(value, int) and not isinstance(value, bool):
+                    value = f"${format_price(value)}"
+                parts.append(f"{name}={value}")
+            line += " | " + " ".join(parts)
+        return line
+    
+    def _write(self, lines):
+        if not lines:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except (OSError, ValueError):
+            # stdout đã đóng (VD: lúc thoát) - bỏ qua
+            return
+        self.written.increment(len(lines))
+    
+    # ========== ĐỒNG BỘ / DỪNG ==========
+    
+    def flush(self, timeout=2.0):
+        """
+        Đợi writer ghi hết hàng đợi (VD: trước khi in thông tin shutdown bằng print)
+        
+        Returns:
+            bool: True nếu hàng đợi đã rỗng
+        """
+        if self.writer_thread is None:
+            return not self.pending
+        deadline = time.monotonic() + timeout
+        while self.writer_thread.is_alive():
+            if not self.pending and self.idle.is_set() and not self.wakeup.is_set():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return not self.pending
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: written, suppressed, dropped, pending
+        """
+        return {
+            "written": self.written.value,
+            "suppressed": self.suppressed.value,
+            "dropped": self.dropped.value,
+            "pending": len(self.pending)
+        }
+    
+    def close(self):
+        """
+        Ghi nốt hàng đợi (kể cả tóm tắt chặn lặp) rồi dừng writer thread
+        """
+        if not self.is_running:
+            return
+        self.is_running = False
+        self.wakeup.set()
+        self.writer_thread.join(timeout=5)
+
+
+# Logger dùng chung cho mọi module của server (main_server gọi log.start())
+log = EventLog()
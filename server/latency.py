@@ -0,0 +1,277 @@
+"""
+Latency Module - Histogram độ trễ theo từng chặng của 1 BID (log-bucketed, kiểu HDR)
+
+Các chặng (time.perf_counter_ns, đơn vị ns):
+- recv:              recv() trả về → tách xong frame (LineFramer.feed)
+- parse:             tách xong frame → bắt đầu xử lý bid (dispatch, rate limit,
+                     parse giá, tìm phiên)
+- batch_wait:        chờ trong lượt của BidBatcher (chỉ khi bật micro-batching)
+- lock_wait:         đợi AuctionState.lock (đường BID / PROXY_BID)
+- lock_hold:         giữ AuctionState.lock
+- broadcast_enqueue: đưa NEW_PRICE vào outbox của mọi người nhận
+- last_send:         đưa vào outbox xong → writer của người nhận CUỐI CÙNG gửi xong
+- total:             recv() → người nhận cuối cùng gửi xong
+
+Histogram:
+- Bucket theo lũy thừa 2, mỗi khoảng [2^k, 2^(k+1)) chia 8 bucket con
+  → sai số tương đối <= 12.5%, giá trị tới ~18 phút chỉ cần ~300 bucket
+- Mỗi histogram chia STRIPES dải theo thread, mỗi dải 1 lock riêng: ghi 1 mẫu
+  chỉ là vài phép tính + 1 lock gần như không tranh chấp
+- Đọc (get_stats) gộp các dải - dùng được lúc server đang chạy (lệnh "L" của
+  admin) và được in khi phiên kết thúc, cạnh kết quả WINNER
+"""
+
+import threading
+import time
+
+from event_log import log
+
+STAGES = ("recv", "parse", "batch_wait", "lock_wait", "lock_hold",
+          "broadcast_enqueue", "last_send", "total")
+
+SUB_BUCKET_BITS = 3                     # 8 bucket con mỗi lũy thừa 2
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_VALUE_BITS = 40                     # 2^40 ns ≈ 18 phút (lớn hơn → bucket cuối)
+BUCKET_COUNT = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+STRIPES = 8
+
+PERCENTILES = (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("p999", 0.999))
+
+
+def bucket_index(value):
+    """
+    Bucket của 1 giá trị (ns): < 16 → bucket tuyến tính, còn lại theo
+    (số mũ, 3 bit cao tiếp theo)
+    """
+    bits = value.bit_length()
+    if bits <= SUB_BUCKET_BITS + 1:
+        return value if value > 0 else 0
+    shift = bits - SUB_BUCKET_BITS - 1
+    index = (shift << SUB_BUCKET_BITS) + (value >> shift)
+    return index if index < BUCKET_COUNT else BUCKET_COUNT - 1
+
+
+def bucket_upper(index):
+    """
+    Giá trị lớn nhất thuộc 1 bucket (dùng khi báo percentile)
+    """
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = (index & (SUB_BUCKETS - 1)) + SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Histogram log-bucketed của 1 chặng
+    
+    Attributes:
+        stripes (list): STRIPES phần [lock, counts, count, total, max]
+    """
+    
+    def __init__(self):
+        self.stripes = [[threading.Lock(), [0] * BUCKET_COUNT, 0, 0, 0] for _ in range(STRIPES)]
+    
+    def record(self, value):
+        """
+        Ghi 1 mẫu (ns)
+        """
+        if value < 0:
+            value = 0
+        index = bucket_index(value)
+        stripe = self.stripes[(threading.get_ident() >> 8) % STRIPES]
+        with stripe[0]:
+            stripe[1][index] += 1
+            stripe[2] += 1
+            stripe[3] += value
+            if value > stripe[4]:
+                stripe[4] = value
+    
+    def merged(self):
+        """
+        Gộp các dải
+        
+        Returns:
+            tuple: (counts, count, total, max)
+        """
+        counts = [0] * BUCKET_COUNT
+        count = total = maximum = 0
+        for stripe in self.stripes:
+            with stripe[0]:
+                # Chép trong lock rồi cộng ngoài lock
+                stripe_counts = list(stripe[1])
+                count += stripe[2]
+                total += stripe[3]
+                maximum = max(maximum, stripe[4])
+            for index, value in enumerate(stripe_counts):
+                if value:
+                    counts[index] += value
+        return counts, count, total, maximum
+    
+    def percentiles(self, fractions):
+        """
+        Percentile theo bucket (biên trên của bucket chứa mẫu đó, không quá max)
+        
+        Args:
+            fractions (list): Các phân vị tăng dần (VD: [0.5, 0.99])
+        
+        Returns:
+            tuple: (count, total, max, values) - values (ns) cùng thứ tự fractions,
+                rỗng nếu chưa có mẫu
+        """
+        counts, count, total, maximum = self.merged()
+        if count == 0:
+            return 0, 0, 0, []
+        
+        targets = [max(1, int(fraction * count + 0.5)) for fraction in fractions]
+        values = []
+        seen = 0
+        for index, value in enumerate(counts):
+            if not value:
+                continue
+            seen += value
+            while len(values) < len(targets) and seen >= targets[len(values)]:
+                values.append(min(bucket_upper(index), maximum))
+            if len(values) == len(targets):
+                break
+        return count, total, maximum, values
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: count, mean_us, p50_us, p90_us, p99_us, p999_us, max_us
+        """
+        count, total, maximum, values = self.percentiles([fraction for _, fraction in PERCENTILES])
+        stats = {"count": count}
+        if count == 0:
+            return stats
+        
+        stats["mean_us"] = round(total / count / 1000, 1)
+        for (name, _), value in zip(PERCENTILES, values):
+            stats[f"{name}_us"] = round(value / 1000, 1)
+        stats["max_us"] = round(maximum / 1000, 1)
+        return stats
+    
+    def reset(self):
+        for stripe in self.stripes:
+            with stripe[0]:
+                stripe[1] = [0] * BUCKET_COUNT
+                stripe[2] = stripe[3] = stripe[4] = 0
+
+
+class LatencyStats:
+    """
+    Bộ histogram của mọi chặng (1 instance dùng chung: latency)
+    """
+    
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+    
+    def record(self, stage, value):
+        """
+        Ghi 1 mẫu độ trễ (ns) của 1 chặng
+        """
+        self.histograms[stage].record(value)
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: {stage: stats} - chỉ các chặng đã có mẫu
+        """
+        result = {}
+        for stage, histogram in self.histograms.items():
+            stats = histogram.get_stats()
+            if stats["count"]:
+                result[stage] = stats
+        return result
+    
+    def log_summary(self, module, **fields):
+        """
+        Ghi mỗi chặng 1 dòng log (in khi phiên kết thúc / lệnh "L" của admin)
+        """
+        stats = self.get_stats()
+        if not stats:
+            log.info(module, "Latency: chưa có mẫu", **fields)
+            return
+        for stage, values in stats.items():
+            log.info(module, f"Latency {stage}", **fields, **values)
+    
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+
+class TimedLock:
+    """
+    Bọc 1 lock: ghi lock_wait / lock_hold cho mỗi lần dùng trong `with`
+    
+    1 instance dùng chung cho mọi thread: acquired chỉ được ghi khi đã giữ lock
+    và được đọc trước khi nhả lock
+    """
+    
+    __slots__ = ("lock", "acquired")
+    
+    def __init__(self, lock):
+        self.lock = lock
+        self.acquired = 0
+    
+    def __enter__(self):
+        started = time.perf_counter_ns()
+        self.lock.acquire()
+        self.acquired = time.perf_counter_ns()
+        latency.record("lock_wait", self.acquired - started)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        held = time.perf_counter_ns() - self.acquired
+        self.lock.release()
+        latency.record("lock_hold", held)
+        return False
+
+
+class FanoutTimer:
+    """
+    Theo dõi 1 NEW_PRICE đến khi writer của người nhận cuối cùng gửi xong
+    
+    remaining = số người nhận + 1 (phần của broadcaster, trả khi đưa vào
+    outbox xong) → người trả cuối cùng ghi last_send và total
+    """
+    
+    __slots__ = ("received_ns", "enqueued_ns", "remaining", "lock")
+    
+    def __init__(self, received_ns, recipients):
+        """
+        Args:
+            received_ns (int): perf_counter_ns lúc recv() BID gây ra NEW_PRICE này
+            recipients (int): Số outbox được đưa frame
+        """
+        self.received_ns = received_ns
+        self.enqueued_ns = None
+        self.remaining = recipients + 1
+        self.lock = threading.Lock()
+    
+    def enqueued(self, started_ns):
+        """
+        Broadcaster đã đưa frame vào mọi outbox
+        """
+        self.enqueued_ns = time.perf_counter_ns()
+        latency.record("broadcast_enqueue", self.enqueued_ns - started_ns)
+        self.done()
+    
+    def done(self):
+        """
+        1 người nhận đã gửi xong (hoặc không cần gửi: frame bị gộp / client đã ngắt)
+        """
+        with self.lock:
+            self.remaining -= 1
+            if self.remaining:
+                return
+        now = time.perf_counter_ns()
+        latency.record("last_send", now - self.enqueued_ns)
+        latency.record("total", now - self.received_ns)
+
+
+# Histogram dùng chung cho mọi module của server
+latency = LatencyStats()
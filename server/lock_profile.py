@@ -0,0 +1,219 @@
+"""
+Lock Profile Module - Đo tranh chấp AuctionState.lock / AuctionHub.lock (tùy chọn --lock-profile)
+
+Nhiệm vụ chính:
+1. make_lock(name): tắt profile → trả threading.Lock thường (không tốn gì thêm),
+   bật → trả ProfiledLock bọc quanh 1 threading.Lock
+2. ProfiledLock ghi cho mỗi lần lấy lock: thời gian đợi, thời gian giữ,
+   số lần lấy và call site (file:dòng hàm) đã lấy lock
+3. Báo cáo: phân vị wait / hold của từng lock + các call site giữ lock lâu nhất
+   (in khi server dừng, lệnh "L" của admin, và trên /metrics)
+
+Dùng để trả lời: đoạn đứng hình lúc kết thúc phiên là do tranh chấp lock
+(wait cao, hold cao ở call site nào) hay do I/O (lock rảnh nhưng last_send cao)
+
+Lưu ý:
+- Bật / tắt lúc khởi động (configure trước khi tạo AuctionState / AuctionHub),
+  lock đã tạo không đổi loại
+- Số liệu được ghi SAU khi nhả lock → không kéo dài thời gian giữ lock
+- Composable: TimedLock (latency.py) bọc được ProfiledLock vì chỉ dùng
+  acquire() / release()
+"""
+
+import os
+import sys
+import threading
+import time
+
+from event_log import log
+from latency import LatencyHistogram
+
+# Số call site in trong báo cáo của mỗi lock
+TOP_SITES = 5
+
+# Frame của các file này bị bỏ qua khi tìm call site (wrapper, không phải nơi dùng lock)
+WRAPPER_FILES = ("lock_profile.py", "latency.py", "threading.py")
+
+
+def find_call_site():
+    """
+    Call site đầu tiên ngoài các wrapper lock
+    
+    Returns:
+        str: "file.py:dòng hàm"
+    """
+    frame = sys._getframe(2)
+    while frame is not None and os.path.basename(frame.f_code.co_filename) in WRAPPER_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}"
+
+
+class LockStats:
+    """
+    Thống kê của 1 lock
+    
+    Attributes:
+        name (str): Tên lock (VD: "AuctionHub.lock")
+        wait (LatencyHistogram): Thời gian đợi lấy lock (ns)
+        hold (LatencyHistogram): Thời gian giữ lock (ns)
+        sites (dict): {call site: [count, hold_total, hold_max, wait_total]}
+        lock (threading.Lock): Bảo vệ sites
+    """
+    
+    def __init__(self, name):
+        self.name = name
+        self.wait = LatencyHistogram()
+        self.hold = LatencyHistogram()
+        self.sites = {}
+        self.lock = threading.Lock()
+    
+    def record(self, site, wait, held):
+        """
+        Ghi 1 lần lấy lock (gọi sau khi đã nhả lock)
+        """
+        self.wait.record(wait)
+        self.hold.record(held)
+        with self.lock:
+            stats = self.sites.get(site)
+            if stats is None:
+                self.sites[site] = [1, held, held, wait]
+                return
+            stats[0] += 1
+            stats[1] += held
+            if held > stats[2]:
+                stats[2] = held
+            stats[3] += wait
+    
+    def top_sites(self, limit=TOP_SITES):
+        """
+        Returns:
+            list: (site, count, hold_total, hold_max, wait_total) theo tổng thời gian giữ giảm dần
+        """
+        with self.lock:
+            sites = [(site, *stats) for site, stats in self.sites.items()]
+        sites.sort(key=lambda item: item[2], reverse=True)
+        return sites[:limit]
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: acquisitions, wait_total_ms, wait_p99_us, wait_max_us,
+                hold_total_ms, hold_p99_us, hold_max_us
+        """
+        count, wait_total, wait_max, wait_values = self.wait.percentiles([0.99])
+        _, hold_total, hold_max, hold_values = self.hold.percentiles([0.99])
+        if count == 0:
+            return {"acquisitions": 0}
+        return {
+            "acquisitions": count,
+            "wait_total_ms": round(wait_total / 1e6, 3),
+            "wait_p99_us": round(wait_values[0] / 1000, 1),
+            "wait_max_us": round(wait_max / 1000, 1),
+            "hold_total_ms": round(hold_total / 1e6, 3),
+            "hold_p99_us": round(hold_values[0] / 1000, 1),
+            "hold_max_us": round(hold_max / 1000, 1)
+        }
+
+
+class ProfiledLock:
+    """
+    threading.Lock có đo wait / hold / call site
+    
+    acquire() / release() / with giống threading.Lock. Mốc thời gian của lần
+    giữ hiện tại lưu trên chính object: chỉ thread đang giữ lock ghi / đọc
+    """
+    
+    __slots__ = ("lock", "stats", "acquired_ns", "wait_ns", "site")
+    
+    def __init__(self, stats):
+        """
+        Args:
+            stats (LockStats): Nơi ghi số liệu của lock này
+        """
+        self.lock = threading.Lock()
+        self.stats = stats
+        self.acquired_ns = 0
+        self.wait_ns = 0
+        self.site = None
+    
+    def acquire(self, blocking=True, timeout=-1):
+        # Tìm call site trước khi đợi lock → không tính vào wait / hold
+        site = find_call_site()
+        started = time.perf_counter_ns()
+        if not self.lock.acquire(blocking, timeout):
+            return False
+        self.acquired_ns = time.perf_counter_ns()
+        self.wait_ns = self.acquired_ns - started
+        self.site = site
+        return True
+    
+    def release(self):
+        held = time.perf_counter_ns() - self.acquired_ns
+        wait = self.wait_ns
+        site = self.site
+        self.lock.release()
+        self.stats.record(site, wait, held)
+    
+    def locked(self):
+        return self.lock.locked()
+    
+    __enter__ = acquire
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class LockProfiler:
+    """
+    Tạo lock cho AuctionState / AuctionHub và gom báo cáo (1 instance dùng chung: lock_profiler)
+    
+    Attributes:
+        enabled (bool): True → make_lock trả ProfiledLock
+        locks (list): LockStats của các lock đã tạo khi bật
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.locks = []
+    
+    def configure(self, enabled):
+        """
+        Bật / tắt profile (main_server gọi sau khi đọc config, trước khi tạo lock)
+        """
+        self.enabled = enabled
+    
+    def make_lock(self, name):
+        """
+        Args:
+            name (str): Tên lock trong báo cáo
+        
+        Returns:
+            threading.Lock hoặc ProfiledLock (khi bật profile)
+        """
+        if not self.enabled:
+            return threading.Lock()
+        stats = LockStats(name)
+        self.locks.append(stats)
+        return ProfiledLock(stats)
+    
+    def log_report(self, module):
+        """
+        Ghi mỗi lock 1 dòng tổng hợp + các call site giữ lock lâu nhất
+        """
+        if not self.enabled:
+            return
+        for stats in self.locks:
+            log.info(module, f"Lock {stats.name}", **stats.get_stats())
+            for site, count, hold_total, hold_max, wait_total in stats.top_sites():
+                log.info(module, f"Lock {stats.name} site", site=site, acquisitions=count,
+                         hold_total_ms=round(hold_total / 1e6, 3),
+                         hold_max_us=round(hold_max / 1000, 1),
+                         wait_total_ms=round(wait_total / 1e6, 3))
+
+
+# Profiler dùng chung cho mọi module của server
+lock_profiler = LockProfiler()
@@ -2,19 +2,36 @@ import socket
 import threading
 import sys
 import signal
+import asyncio
+import os
+import time
 
 # Import các module cần thiết 
-from timer_thread import TimerThread
+from auction_scheduler import AuctionScheduler, AuctionTimer
 from client_thread import ClientThread
 from auction_config import load_auction_config
 
 # Import các module Logic và Hub (Người 2)
 from auction_logic import AuctionState
 from auction_hub import AuctionHub
+from auction_registry import AuctionRegistry
+from bid_journal import BidJournal, replay_journal
+from bid_history import BidHistory
+from pricing import parse_price
+from rate_limit import BidRateLimiter
+from bid_batcher import BidBatcher
+from event_log import log
+from latency import latency
+from lock_profile import lock_profiler
+from metrics import MetricsCollector, MetricsServer
+
+# Chế độ server asyncio (tùy chọn --mode async)
+from async_server import AsyncAuctionServer, raise_fd_limit
 
 # CẤU HÌNH SERVER 
 HOST = '0.0.0.0'  # Lắng nghe trên tất cả network interfaces
 PORT = 9999        # Port để clients kết nối
+ASYNC_BACKLOG = 1024  # Queue pending connections cho chế độ async
 
 # AUCTION CONFIG (sẽ được load từ file/args)
 auction_config = None
@@ -22,30 +39,64 @@ auction_config = None
 # BIẾN TOÀN CỤC 
 server_socket = None
 auction_hub = None
-timer_thread = None
-auction_state = None
+scheduler = None        # 1 thread lập lịch dùng chung cho mọi phiên
+auction_timers = {}     # {auction_id: AuctionTimer} - mỗi phiên 1 bộ đếm
+auction_state = None    # Phiên mặc định (BID không kèm auction_id)
+auction_registry = None
+bid_journal = None      # Write-ahead bid journal (--journal)
+metrics_server = None   # HTTP endpoint /metrics (--metrics-port)
+recovered_auctions = {} # Trạng thái các phiên replay từ journal
 shutdown_flag = threading.Event()
 
 def signal_handler(sig, frame):
     print("\n[SERVER] Nhận tín hiệu dừng server (Ctrl+C)...")
     shutdown_server()
 
+def read_admin_command():
+    """
+    Đọc 1 dòng lệnh admin từ stdin
+    
+    Dùng os.read thay input(): thread admin vẫn chờ nhập khi server thoát, nếu
+    đang giữ lock của sys.stdin thì interpreter bị crash lúc shutdown
+    (Fatal Python error: _enter_buffered_busy)
+    
+    Raises:
+        EOFError: Nếu stdin đã đóng
+    """
+    line = b""
+    while not line.endswith(b"\n"):
+        chunk = os.read(sys.stdin.fileno(), 1)
+        if not chunk:
+            if line:
+                break
+            raise EOFError
+        line += chunk
+    return line.decode("utf-8", errors="replace")
+
 def wait_for_admin_start():
     """
     Thread để đợi admin nhấn Y/N để bắt đầu game
-    """
-    global timer_thread
     
+    Sau khi bắt đầu vẫn đọc tiếp: 'L' in histogram độ trễ BID hiện tại
+    """
+    started = False
     while not shutdown_flag.is_set():
         try:
-            user_input = input().strip().upper()
+            user_input = read_admin_command().strip().upper()
             
-            if user_input == 'Y':
+            if user_input == 'L':
+                latency.log_summary("SERVER")
+                lock_profiler.log_report("SERVER")
+            elif started:
+                print("❌ Game đã bắt đầu - nhấn 'L' để xem độ trễ BID")
+            elif user_input == 'Y':
                 print("\n" + "=" * 60)
                 print("🚀 ADMIN ĐÃ BẮT ĐẦU GAME!")
                 print("=" * 60)
-                timer_thread.start_game()
-                break
+                # Bắt đầu đồng thời mọi phiên trong catalog
+                for auction_timer in list(auction_timers.values()):
+                    auction_timer.start_game()
+                started = True
             elif user_input == 'N':
                 print("\n[SERVER] Admin đã hủy - Đang shutdown...")
                 shutdown_server()
@@ -56,18 +107,33 @@ def wait_for_admin_start():
             break
 
 def shutdown_server():
+    # Ghi hết log đang chờ để thông báo shutdown (print) không lẫn vào giữa
+    log.flush()
     print("[SERVER] Đang shutdown server...")
     shutdown_flag.set()
     
+    # Xử lý nốt lượt BID đang gom (kết quả vẫn đến được client, trước khi đóng journal)
+    if auction_hub and auction_hub.bid_batcher:
+        auction_hub.bid_batcher.close()
+    
     # Đóng tất cả client connections
     if auction_hub:
         auction_hub.broadcast_shutdown()
         auction_hub.close_all_clients()
     
-    # Dừng timer thread
-    if timer_thread:
-        timer_thread.stop()
-        timer_thread.join(timeout=2)
+    # Dừng endpoint /metrics
+    if metrics_server:
+        metrics_server.close()
+    
+    # Dừng scheduler
+    if scheduler:
+        scheduler.stop()
+        if scheduler is not threading.current_thread():
+            scheduler.join(timeout=2)
+    
+    # Commit + fsync nốt các bid còn trong buffer của journal
+    if bid_journal:
+        bid_journal.close()
     
     # Đóng server socket
     if server_socket:
@@ -77,12 +143,188 @@ def shutdown_server():
         except Exception as e:
             print(f"[SERVER] Lỗi khi đóng socket: {e}")
     
+    # Tranh chấp lock trong cả quá trình chạy, kể cả lúc đóng phiên / đóng clients
+    lock_profiler.log_report("SERVER")
+    log.flush()
+    print(f"[SERVER] Log: {log.get_stats()}")
     print("[SERVER] Server đã dừng hoàn toàn")
     sys.exit(0)
 
+def end_after_last_auction():
+    """
+    Scheduler gọi khi phiên cuối cùng đã kết thúc (sau SHUTDOWN_DELAY giây)
+    
+    Gửi SHUTDOWN và đóng mọi kết nối TRƯỚC khi set shutdown_flag: accept loop
+    đợi (join) các ClientThread trước khi gọi shutdown_server, client đang ngồi
+    chờ trong recv() phải được ngắt ngay thay vì mỗi thread đợi hết timeout
+    """
+    if auction_hub:
+        auction_hub.broadcast_shutdown()
+        auction_hub.close_all_clients()
+    shutdown_flag.set()
+
+def start_timer_and_admin():
+    """
+    Khởi động Scheduler + AuctionTimer cho mỗi phiên (CHƯA BẮT ĐẦU ĐẾM NGƯỢC)
+    và Admin Input Thread. Dùng chung cho chế độ thread và async
+    """
+    global scheduler
+    
+    print("[TIMER] Khởi động scheduler...")
+    # Phiên cuối kết thúc → gửi SHUTDOWN, đóng clients, rồi để accept loop / event loop tự cleanup
+    scheduler = AuctionScheduler(
+        auction_hub=auction_hub,
+        auction_registry=auction_registry,
+        on_all_ended=end_after_last_auction
+    )
+    durations = {item["auction_id"]: item["auction_duration"]
+                 for item in auction_config.get_catalog()}
+    
+    for state in auction_registry.get_all():
+        auction_timer = AuctionTimer(
+            duration=durations[state.auction_id],
+            auction_hub=auction_hub,
+            auction_state=state,
+            scheduler=scheduler,
+            timer_mode=auction_config.timer_mode,
+            sync_interval=auction_config.sync_interval
+        )
+        auction_timers[state.auction_id] = auction_timer
+        print(f"[TIMER] Timer {state.auction_id} đã sẵn sàng ({auction_timer.duration} giây)")
+    
+    auction_hub.auction_timers = auction_timers
+    scheduler.start()
+    
+    # Phiên đang chạy dở trước khi crash → tiếp tục ngay, không đợi admin
+    for auction_id, recovered in recovered_auctions.items():
+        if recovered["deadline"] is not None and not recovered["ended"]:
+            auction_timers[auction_id].start_game(remaining=recovered["deadline"] - time.time())
+    print("-" * 60)
+    print()
+    print("⏸️  GAME CHƯA BẮT ĐẦU - Đợi admin...")
+    print("📢 Nhấn 'Y' và Enter để BẮT ĐẦU đấu giá")
+    print("📢 Nhấn 'N' và Enter để HỦY và thoát")
+    print("📢 Nhấn 'L' và Enter để xem độ trễ BID (cả khi game đang chạy)")
+    print("-" * 60)
+    
+    admin_thread = threading.Thread(target=wait_for_admin_start, daemon=True)
+    admin_thread.start()
+
+def start_metrics_server():
+    """
+    Bật HTTP endpoint /metrics (--metrics-port > 0) - gọi sau khi scheduler đã chạy
+    """
+    global metrics_server
+    
+    if auction_config.metrics_port <= 0:
+        return
+    
+    collector = MetricsCollector(auction_hub, auction_registry, scheduler)
+    try:
+        metrics_server = MetricsServer(collector, auction_config.metrics_port,
+                                       host=auction_config.metrics_host)
+    except OSError as e:
+        # Không có metrics vẫn chạy được phiên đấu giá
+        print(f"[ERROR] Không thể mở endpoint metrics: {e}")
+        return
+    metrics_server.start()
+
+def open_bid_journal():
+    """
+    Bật write-ahead bid journal (--journal) và khôi phục trạng thái sau crash
+    
+    Flow:
+    1. Replay journal cũ (nếu có) → giá, người dẫn đầu, deadline của từng phiên
+    2. Nếu mọi phiên trong journal đã kết thúc → đổi tên journal cũ, bắt đầu mới
+    3. Khôi phục AuctionState + gắn journal để ghi các bid tiếp theo
+    """
+    global bid_journal, recovered_auctions
+    
+    path = auction_config.journal_path
+    
+    def restore_history(auction_id, user, value, timestamp):
+        # Dựng lại lịch sử bid (timestamp trong journal là epoch seconds)
+        state = auction_registry.get(auction_id)
+        if state is not None:
+            history = state.history
+            history.append(user, value, int(timestamp * 1e9) - history.epoch_offset_ns)
+    
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        recovered_auctions = {
+            auction_id: recovered
+            for auction_id, recovered in replay_journal(path, on_bid=restore_history).items()
+            if auction_registry.get(auction_id) is not None
+        }
+        
+        if recovered_auctions and all(r["ended"] for r in recovered_auctions.values()):
+            archived = f"{path}.{int(time.time())}"
+            os.replace(path, archived)
+            print(f"[JOURNAL] Các phiên trong journal đã kết thúc - lưu trữ thành {archived}")
+            recovered_auctions = {}
+            for state in auction_registry.get_all():
+                state.history = BidHistory()
+    
+    bid_journal = BidJournal(
+        path,
+        interval_ms=auction_config.journal_interval_ms,
+        batch=auction_config.journal_batch
+    )
+    
+    for state in auction_registry.get_all():
+        recovered = recovered_auctions.get(state.auction_id)
+        if recovered is not None:
+            if recovered["bids"]:
+                state.restore(recovered["current_price"], recovered["current_winner"],
+                              is_open=not recovered["ended"], proxies=recovered["proxies"])
+            elif recovered["ended"]:
+                state.restore(state.current_price, None, is_open=False)
+            if recovered["ended"]:
+                auction_registry.mark_ended(state.auction_id)
+        state.journal = bid_journal
+
+def run_async_server():
+    """
+    Chạy server ở chế độ asyncio (--mode async)
+    
+    Accept, đọc, xử lý BID và broadcast đều chạy trên 1 event loop,
+    không tạo thread riêng cho từng client.
+    """
+    fd_limit = raise_fd_limit()
+    if fd_limit:
+        print(f"[SERVER] Giới hạn file descriptor: {fd_limit}")
+    
+    print(f"[SERVER] Chế độ asyncio - lắng nghe tại {HOST}:{PORT}")
+    print(f"[SERVER] Thời gian đấu giá: {auction_config.auction_duration} giây")
+    print("-" * 60)
+    
+    start_timer_and_admin()
+    start_metrics_server()
+    
+    async_server = AsyncAuctionServer(
+        host=HOST,
+        port=PORT,
+        auction_hub=auction_hub,
+        auction_state=auction_state,
+        backlog=ASYNC_BACKLOG,
+        auction_registry=auction_registry
+    )
+    
+    print("[SERVER] Sẵn sàng chấp nhận clients...")
+    print("[SERVER] Nhấn Ctrl+C để dừng server\n")
+    
+    try:
+        asyncio.run(async_server.serve(shutdown_flag))
+    except KeyboardInterrupt:
+        print("\n[SERVER] Nhận KeyboardInterrupt...")
+    except OSError as e:
+        print(f"[ERROR] Không thể khởi động server: {e}")
+    finally:
+        print("\n[SERVER] Đang cleanup...")
+        shutdown_server()
+
 def start_server():
 
-    global server_socket, auction_hub, timer_thread, auction_state, auction_config
+    global server_socket, auction_hub, auction_state, auction_registry, auction_config
     
     print("=" * 60)
     print("🎯 SIMPLE AUCTION GAME - SERVER")
@@ -91,21 +333,58 @@ def start_server():
     # BƯỚC 0: Load Auction Config
     print("[CONFIG] Đang load cấu hình đấu giá...")
     auction_config = load_auction_config()
+    log.configure(level=auction_config.log_level, fmt=auction_config.log_format)
+    log.start()
+    # Phải bật trước khi tạo AuctionState / AuctionHub (loại lock chọn lúc tạo)
+    lock_profiler.configure(auction_config.lock_profile)
     print()
     
-    # BƯỚC 1: Khởi tạo Auction State 
+    # BƯỚC 1: Khởi tạo Auction State cho mỗi vật phẩm trong catalog
     print("[INIT] Khởi tạo Auction State...")
-    # Sử dụng config từ file/args
-    auction_state = AuctionState(
-        starting_price=auction_config.starting_price,
-        item_name=auction_config.item_name,
-        description=auction_config.description
-    )
+    # Sử dụng config từ file/args - mỗi phiên có lock riêng
+    auction_registry = AuctionRegistry()
+    for item in auction_config.get_catalog():
+        # Giá trong config theo đơn vị → AuctionState làm việc với cents
+        auction_registry.add_auction(AuctionState(
+            starting_price=parse_price(item["starting_price"]),
+            item_name=item["item_name"],
+            description=item["description"],
+            auction_id=item["auction_id"],
+            min_increment=parse_price(item["min_increment"]),
+            max_price=parse_price(item["max_price"]),
+            soft_close_window=auction_config.soft_close_window,
+            soft_close_extension=auction_config.soft_close_extension,
+            soft_close_max=auction_config.soft_close_max
+        ))
+    auction_state = auction_registry.get_default()
+    
+    # BƯỚC 1b: Bid journal (tùy chọn) - khôi phục trạng thái nếu server vừa crash
+    if auction_config.journal_path:
+        open_bid_journal()
 
     # BƯỚC 2: Khởi tạo Auction Hub
     print("[INIT] Khởi tạo Auction Hub...")
-    auction_hub = AuctionHub(auction_state)
+    auction_hub = AuctionHub(
+        auction_state,
+        outbox_size=auction_config.outbox_size,
+        overflow_policy=auction_config.overflow_policy
+    )
+    # Rate limit mặc định tắt (không tạo limiter → read path không tốn gì thêm)
+    if auction_config.bid_rate > 0 or auction_config.user_bid_rate > 0:
+        auction_hub.rate_limiter = BidRateLimiter(
+            rate=auction_config.bid_rate,
+            burst=auction_config.bid_burst,
+            user_rate=auction_config.user_bid_rate,
+            user_burst=auction_config.user_bid_burst
+        )
+    if auction_config.bid_batch_ms > 0:
+        auction_hub.bid_batcher = BidBatcher(auction_config.bid_batch_ms)
 
+    # Chế độ asyncio: accept/đọc/broadcast chạy trên 1 event loop
+    if auction_config.server_mode == "async":
+        run_async_server()
+        return
+    
     # BƯỚC 3: Tạo Server Socket
     try:
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -120,25 +399,9 @@ def start_server():
         print(f"[ERROR] Không thể khởi động server: {e}")
         sys.exit(1)
     
-    #  BƯỚC 4: Khởi động Timer Thread (CHƯA BẮT ĐẦU ĐẾM NGƯỢC)
-    print("[TIMER] Khởi động timer thread...")
-    timer_thread = TimerThread(
-        duration=auction_config.auction_duration,
-        auction_hub=auction_hub,
-        auction_state=auction_state
-    )
-    timer_thread.start()
-    print(f"[TIMER] Timer đã sẵn sàng ({auction_config.auction_duration} giây)")
-    print("-" * 60)
-    print()
-    print("⏸️  GAME CHƯA BẮT ĐẦU - Đợi admin...")
-    print("📢 Nhấn 'Y' và Enter để BẮT ĐẦU đấu giá")
-    print("📢 Nhấn 'N' và Enter để HỦY và thoát")
-    print("-" * 60)
-    
-    # BƯỚC 5: Start Admin Input Thread
-    admin_thread = threading.Thread(target=wait_for_admin_start, daemon=True)
-    admin_thread.start()
+    #  BƯỚC 4 + 5: Khởi động Timer Thread và Admin Input Thread
+    start_timer_and_admin()
+    start_metrics_server()
     
     # BƯỚC 6: Accept Loop (Main Server Loop)
     client_counter = 0
@@ -164,7 +427,14 @@ def start_server():
                 client_counter += 1
                 client_id = f"Client-{client_counter}"
                 
-                print(f"[CONNECT] {client_id} kết nối từ {client_address}")
+                # Tắt Nagle (như chế độ async): BID_ACCEPTED và NEW_PRICE là 2 frame
+                # nhỏ liên tiếp, frame sau không được đợi ACK của frame trước
+                try:
+                    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                except OSError:
+                    pass
+                
+                log.info("CONNECT", "Client kết nối", client_id=client_id, address=client_address)
                 
                 # Tạo thread mới cho client này
                 client_thread = ClientThread(
@@ -172,7 +442,8 @@ def start_server():
                     client_address=client_address,
                     client_id=client_id,
                     auction_hub=auction_hub,
-                    auction_state=auction_state
+                    auction_state=auction_state,
+                    auction_registry=auction_registry
                 )
                 
                 # Đăng ký client vào hub
@@ -182,7 +453,7 @@ def start_server():
                 client_thread.start()
                 active_threads.append(client_thread)
                 
-                print(f"[SERVER] Tổng số clients đang kết nối: {auction_hub.get_client_count()}")
+                log.debug("SERVER", "Tổng số clients đang kết nối", clients=auction_hub.get_client_count())
                 
                 # Cleanup các threads đã kết thúc
                 active_threads = [t for t in active_threads if t.is_alive()]
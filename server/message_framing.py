@@ -0,0 +1,237 @@
+"""
+Message Framing Module - Đóng khung message JSON theo từng dòng (newline-delimited)
+
+Nhiệm vụ chính:
+1. Gom bytes nhận được từ socket vào buffer (TCP không giữ ranh giới message)
+2. Tách TẤT CẢ message hoàn chỉnh trong 1 lần đọc (1 pass duy nhất)
+3. Giữ lại phần message chưa nhận đủ cho lần đọc sau
+4. Giới hạn kích thước tối đa của 1 frame để tránh client gửi dòng vô hạn
+
+Dùng chung cho:
+- Server: ClientSession (chế độ thread và async)
+- Client: client_main.py và client_ui.py
+
+Ví dụ:
+    framer = LineFramer()
+    messages, errors = framer.feed(sock.recv(4096))
+    for message in messages:
+        handle(message)
+
+Phía gửi: mỗi sự kiện chỉ được encode 1 lần thành 1 frame bytes (immutable)
+và cùng 1 object bytes được đưa cho mọi writer. FrameCache giữ sẵn các frame
+hay gửi (WELCOME, UPDATE_TIMER, ERROR) để khỏi json.dumps lại.
+"""
+
+import json
+import threading
+
+# Kích thước tối đa của 1 message (bytes, không tính ký tự newline)
+MAX_FRAME_SIZE = 64 * 1024
+
+# Ký tự phân cách giữa các message
+FRAME_DELIMITER = b"\n"
+
+# Số frame tối đa mỗi loại trong FrameCache
+MAX_CACHED_FRAMES = 4096
+
+
+def encode_message(message_dict):
+    """
+    Encode 1 message dict thành frame bytes (JSON + newline)
+    
+    Args:
+        message_dict (dict): Message cần gửi
+    
+    Returns:
+        bytes: Frame sẵn sàng để sendall()
+    """
+    return (json.dumps(message_dict) + "\n").encode('utf-8')
+
+
+class LineFramer:
+    """
+    Bộ tách frame tăng dần cho luồng bytes newline-delimited JSON
+    
+    Attributes:
+        max_frame_size (int): Kích thước tối đa của 1 frame
+        buffer (bytearray): Phần dữ liệu chưa đủ 1 frame
+        discarding (bool): Đang bỏ qua phần còn lại của 1 frame quá lớn
+    """
+    
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        """
+        Args:
+            max_frame_size (int): Kích thước tối đa của 1 frame (mặc định 64KB)
+        """
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+        self.discarding = False
+    
+    def feed(self, data):
+        """
+        Đưa thêm bytes vào framer và decode mọi message hoàn chỉnh
+        
+        Logic:
+        1. Nối data vào buffer
+        2. Cắt buffer tại newline CUỐI CÙNG → phần trước là các frame đầy đủ
+        3. Decode từng frame; frame lỗi được báo trong errors (không làm mất các frame khác)
+        4. Phần sau newline cuối được giữ lại cho lần feed tiếp theo
+        
+        Args:
+            data (bytes): Dữ liệu vừa nhận từ socket
+        
+        Returns:
+            tuple: (messages: list, errors: list[str])
+                - messages: Các message (dict) đã decode theo đúng thứ tự
+                - errors: Mô tả lỗi của các frame không hợp lệ
+        """
+        messages = []
+        errors = []
+        
+        self.buffer += data
+        last_newline = self.buffer.rfind(FRAME_DELIMITER)
+        
+        if last_newline < 0:
+            # Chưa có frame hoàn chỉnh - chỉ kiểm tra kích thước
+            self._check_partial(errors)
+            return messages, errors
+        
+        complete = bytes(self.buffer[:last_newline])
+        del self.buffer[:last_newline + 1]
+        
+        for frame in complete.split(FRAME_DELIMITER):
+            if self.discarding:
+                # Đây là đuôi của frame quá lớn đã báo lỗi trước đó
+                self.discarding = False
+                continue
+            
+            if len(frame) > self.max_frame_size:
+                errors.append(f"Frame too large ({len(frame)} bytes)")
+                continue
+            
+            if not frame.strip():
+                continue
+            
+            try:
+                messages.append(json.loads(frame))
+            except ValueError as e:
+                # JSONDecodeError và UnicodeDecodeError đều là ValueError
+                errors.append(f"Invalid JSON format: {e}")
+        
+        self._check_partial(errors)
+        return messages, errors
+    
+    def _check_partial(self, errors):
+        """
+        Bỏ phần frame dở dang nếu đã vượt quá max_frame_size
+        """
+        if len(self.buffer) > self.max_frame_size:
+            if not self.discarding:
+                errors.append(f"Frame too large (> {self.max_frame_size} bytes)")
+            self.buffer.clear()
+            self.discarding = True
+    
+    def reset(self):
+        """
+        Xóa buffer (dùng khi kết nối lại)
+        """
+        self.buffer.clear()
+        self.discarding = False
+
+
+class FrameCache:
+    """
+    Cache các frame đã encode sẵn (bytes immutable, dùng chung cho mọi client)
+    
+    - UPDATE_TIMER: 1 frame cho mỗi giá trị remaining
+    - ERROR: 1 frame cho mỗi nội dung lỗi
+    - WELCOME: phần snapshot (giá, người dẫn đầu, vật phẩm) được encode 1 lần
+      cho mỗi trạng thái; chỉ lời chào theo client_id được ghép thêm
+    
+    Attributes:
+        max_frames (int): Số frame tối đa mỗi loại (vượt quá → bỏ frame cũ nhất)
+        lock (threading.Lock): Bảo vệ các dict cache
+    """
+    
+    WELCOME_PREFIX = b'{"type": "WELCOME", "message": '
+    
+    def __init__(self, max_frames=MAX_CACHED_FRAMES):
+        """
+        Args:
+            max_frames (int): Số frame tối đa mỗi loại
+        """
+        self.max_frames = max_frames
+        self.timer_frames = {}   # {(auction_id, remaining): bytes}
+        self.error_frames = {}   # {error_text: bytes}
+        self.welcome_key = None
+        self.welcome_suffix = None
+        self.lock = threading.Lock()
+    
+    def _get_or_build(self, cache, key, message_dict):
+        frame = cache.get(key)
+        if frame is not None:
+            return frame
+        
+        frame = encode_message(message_dict)
+        with self.lock:
+            if len(cache) >= self.max_frames:
+                # Bỏ frame cũ nhất (dict giữ thứ tự insert)
+                del cache[next(iter(cache))]
+            cache[key] = frame
+        return frame
+    
+    def timer_frame(self, remaining, auction_id=None):
+        """
+        Frame UPDATE_TIMER cho 1 giá trị remaining
+        
+        Args:
+            remaining (int): Số giây còn lại
+            auction_id (str, optional): Phiên đấu giá (catalog nhiều vật phẩm)
+        
+        Returns:
+            bytes: Frame đã encode
+        """
+        message = {"type": "UPDATE_TIMER", "remaining": remaining}
+        if auction_id is not None:
+            message["auction_id"] = auction_id
+        
+        return self._get_or_build(self.timer_frames, (auction_id, remaining), message)
+    
+    def error_frame(self, error_message):
+        """
+        Frame ERROR cho 1 nội dung lỗi
+        
+        Args:
+            error_message (str): Nội dung lỗi
+        
+        Returns:
+            bytes: Frame đã encode
+        """
+        return self._get_or_build(
+            self.error_frames,
+            error_message,
+            {"type": "ERROR", "message": error_message}
+        )
+    
+    def welcome_frame(self, greeting, snapshot):
+        """
+        Frame WELCOME = lời chào riêng + snapshot trạng thái (encode 1 lần / trạng thái)
+        
+        Args:
+            greeting (str): Lời chào riêng của client (trường "message")
+            snapshot (dict): Các trường còn lại của WELCOME (giá trị phải hashable)
+        
+        Returns:
+            bytes: Frame WELCOME hoàn chỉnh
+        """
+        key = tuple(snapshot.items())
+        
+        with self.lock:
+            if key != self.welcome_key:
+                # '{"current_price": ...}\n' → bỏ '{' đầu để nối sau trường "message"
+                self.welcome_suffix = encode_message(snapshot)[1:]
+                self.welcome_key = key
+            suffix = self.welcome_suffix
+        
+        separator = b", " if suffix != b"}\n" else b""
+        return self.WELCOME_PREFIX + json.dumps(greeting).encode('utf-8') + separator + suffix
@@ -0,0 +1,252 @@
+"""
+Metrics Module - HTTP endpoint /metrics dạng Prometheus text (tùy chọn --metrics-port)
+
+Nhiệm vụ chính:
+1. 1 HTTP server nhỏ (thư viện chuẩn) chạy ở daemon thread riêng, mặc định
+   chỉ lắng nghe 127.0.0.1
+2. Mỗi lần scrape đọc các counter được cập nhật nguyên tử tại chỗ xảy ra
+   (AtomicCounter, TrafficStats, BackpressureStats, histogram latency.py)
+3. KHÔNG lấy AuctionState.lock / AuctionHub.lock: scrape liên tục cũng không
+   làm chậm BID hay broadcast
+
+Số liệu:
+- Kết nối: client đang kết nối, tổng số kết nối, bytes nhận/gửi, frame đã gửi
+- BID: chấp nhận / từ chối (trước lock, trong lock, rate limit) theo phiên.
+  Là counter → tốc độ / giây tính bằng rate() của Prometheus
+- Độ trễ BID theo chặng (summary): lock_wait / lock_hold là thời gian tranh
+  chấp lock, broadcast_enqueue / last_send là thời gian fan-out
+- Hàng đợi gửi: tổng số frame đang chờ và hàng đợi dài nhất, số lần overflow
+- Scheduler: độ trễ sự kiện timer (lần cuối, lớn nhất, tổng)
+
+Đọc không lock:
+- Counter / int / float: đọc 1 giá trị là atomic
+- Danh sách outbox: tuple(dict.values()) chạy trọn trong C khi giữ GIL nên
+  không thấy dict đang thay đổi dở; độ dài hàng đợi là len(deque)
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from event_log import log
+from latency import STAGES, latency
+from lock_profile import lock_profiler
+from pricing import to_units
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Phân vị của summary độ trễ BID
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def format_labels(labels):
+    """
+    {"auction_id": "a-1"} → '{auction_id="a-1"}' (escape theo Prometheus text format)
+    """
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class MetricsCollector:
+    """
+    Dựng nội dung /metrics từ các thành phần của server
+    
+    Attributes:
+        auction_hub (AuctionHub): Nguồn traffic, backpressure, outbox, rate limiter
+        auction_registry (AuctionRegistry): Các phiên đấu giá
+        scheduler (AuctionScheduler): Nguồn độ trễ timer (None = không có)
+    """
+    
+    def __init__(self, auction_hub, auction_registry, scheduler=None):
+        self.auction_hub = auction_hub
+        self.auction_registry = auction_registry
+        self.scheduler = scheduler
+    
+    def render(self):
+        """
+        Returns:
+            str: Toàn bộ số liệu theo Prometheus text format 0.0.4
+        """
+        lines = []
+        
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{format_labels(labels)} {value}")
+        
+        self._traffic(metric)
+        self._bids(metric)
+        self._latency(lines)
+        self._outboxes(metric)
+        self._timer(metric)
+        self._locks(lines)
+        
+        return "\n".join(lines) + "\n"
+    
+    def _traffic(self, metric):
+        traffic = self.auction_hub.traffic
+        metric("auction_connected_clients", "gauge", "Số client đang kết nối",
+               [({}, traffic.connected.value)])
+        metric("auction_connections_total", "counter", "Tổng số kết nối đã nhận",
+               [({}, traffic.connections.value)])
+        metric("auction_received_bytes_total", "counter", "Tổng số bytes nhận từ clients",
+               [({}, traffic.bytes_in.value)])
+        metric("auction_sent_bytes_total", "counter", "Tổng số bytes đã gửi cho clients",
+               [({}, traffic.bytes_out.value)])
+        metric("auction_sent_frames_total", "counter", "Tổng số frame đã gửi cho clients",
+               [({}, traffic.frames_out.value)])
+    
+    def _bids(self, metric):
+        accepted = []
+        rejected = []
+        prices = []
+        for state in self.auction_registry.get_all():
+            labels = {"auction_id": state.auction_id}
+            stats = state.get_bid_stats()
+            accepted.append((labels, stats["accepted"]))
+            rejected.append(({**labels, "stage": "fast"}, stats["rejected_fast"]))
+            rejected.append(({**labels, "stage": "locked"}, stats["rejected_locked"]))
+            prices.append((labels, to_units(state.snapshot.price)))
+        
+        metric("auction_bids_accepted_total", "counter", "Số BID được chấp nhận", accepted)
+        metric("auction_bids_rejected_total", "counter",
+               "Số BID bị từ chối (fast = trước lock, locked = trong lock)", rejected)
+        
+        rate_limiter = self.auction_hub.rate_limiter
+        if rate_limiter is not None:
+            metric("auction_bids_rate_limited_total", "counter", "Số BID bị chặn bởi rate limit", [
+                ({"scope": "connection"}, rate_limiter.connection_rejected.value),
+                ({"scope": "user"}, rate_limiter.user_rejected.value)
+            ])
+        
+        metric("auction_current_price", "gauge", "Giá hiện tại của phiên", prices)
+    
+    def _latency(self, lines):
+        # Summary: phân vị lấy từ histogram log-bucketed (sai số <= 12.5%)
+        name = "auction_bid_stage_seconds"
+        lines.append(f"# HELP {name} Độ trễ BID theo chặng (xem latency.py)")
+        lines.append(f"# TYPE {name} summary")
+        for stage in STAGES:
+            count, total, _, values = latency.histograms[stage].percentiles(QUANTILES)
+            for quantile, value in zip(QUANTILES, values):
+                labels = format_labels({"stage": stage, "quantile": quantile})
+                lines.append(f"{name}{labels} {value / 1e9}")
+            labels = format_labels({"stage": stage})
+            lines.append(f"{name}_sum{labels} {total / 1e9}")
+            lines.append(f"{name}_count{labels} {count}")
+    
+    def _outboxes(self, metric):
+        outboxes = tuple(self.auction_hub.outboxes.values())
+        depths = [outbox.pending() for outbox in outboxes]
+        metric("auction_outbox_queued_frames", "gauge", "Tổng số frame đang chờ gửi",
+               [({}, sum(depths))])
+        metric("auction_outbox_max_queued_frames", "gauge", "Hàng đợi gửi dài nhất",
+               [({}, max(depths, default=0))])
+        
+        stats = self.auction_hub.backpressure_stats.to_dict()
+        metric("auction_outbox_overflow_total", "counter",
+               "Số lần chính sách overflow / gộp frame được kích hoạt",
+               [({"kind": kind}, value) for kind, value in stats.items()])
+    
+    def _timer(self, metric):
+        scheduler = self.scheduler
+        if scheduler is None:
+            return
+        metric("auction_timer_events_total", "counter", "Số sự kiện timer đã xử lý",
+               [({}, scheduler.event_count)])
+        metric("auction_timer_lag_seconds_total", "counter", "Tổng độ trễ của các sự kiện timer",
+               [({}, scheduler.lag_total)])
+        metric("auction_timer_lag_last_seconds", "gauge", "Độ trễ của sự kiện timer gần nhất",
+               [({}, scheduler.lag_last)])
+        metric("auction_timer_lag_max_seconds", "gauge", "Độ trễ lớn nhất của sự kiện timer",
+               [({}, scheduler.lag_max)])
+    
+    def _locks(self, lines):
+        # Chỉ có khi bật --lock-profile (xem lock_profile.py)
+        if not lock_profiler.locks:
+            return
+        for name, kind in (("auction_lock_wait_seconds", "wait"), ("auction_lock_hold_seconds", "hold")):
+            lines.append(f"# HELP {name} Thời gian {kind} của lock (--lock-profile)")
+            lines.append(f"# TYPE {name} summary")
+            for stats in lock_profiler.locks:
+                histogram = stats.wait if kind == "wait" else stats.hold
+                count, total, _, values = histogram.percentiles(QUANTILES)
+                for quantile, value in zip(QUANTILES, values):
+                    labels = format_labels({"lock": stats.name, "quantile": quantile})
+                    lines.append(f"{name}{labels} {value / 1e9}")
+                labels = format_labels({"lock": stats.name})
+                lines.append(f"{name}_sum{labels} {total / 1e9}")
+                lines.append(f"{name}_count{labels} {count}")
+
+
+class MetricsServer:
+    """
+    HTTP server phục vụ GET /metrics ở daemon thread riêng
+    
+    Attributes:
+        collector (MetricsCollector): Dựng nội dung mỗi lần scrape
+        httpd (ThreadingHTTPServer): HTTP server (mỗi request 1 thread ngắn)
+    """
+    
+    def __init__(self, collector, port, host=DEFAULT_METRICS_HOST):
+        """
+        Args:
+            collector (MetricsCollector): Nguồn số liệu
+            port (int): Port lắng nghe
+            host (str): Địa chỉ lắng nghe (mặc định chỉ local)
+        
+        Raises:
+            OSError: Nếu không bind được port
+        """
+        self.collector = collector
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                try:
+                    body = collector.render().encode("utf-8")
+                except Exception as e:
+                    log.error("METRICS", "❌ Lỗi dựng metrics", error=e)
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, fmt, *args):
+                log.debug("METRICS", "Scrape", client=self.client_address[0], request=fmt % args)
+        
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            name="MetricsServer",
+            daemon=True
+        )
+        
+        print(f"[METRICS] Phục vụ http://{host}:{self.httpd.server_address[1]}/metrics")
+    
+    def start(self):
+        """
+        Khởi động thread phục vụ HTTP
+        """
+        self.thread.start()
+    
+    def close(self):
+        """
+        Dừng HTTP server (gọi nhiều lần được)
+        """
+        if self.thread.is_alive():
+            self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,409 @@
+"""
+Outbound Queue Module - Hàng đợi gửi riêng cho từng client (có backpressure)
+
+Nhiệm vụ chính:
+1. Mỗi kết nối có 1 hàng đợi gửi giới hạn (bounded) + 1 writer riêng
+2. Broadcast chỉ đưa frame vào hàng đợi → không bao giờ block vì 1 client chậm
+3. Khi hàng đợi đầy: áp dụng chính sách overflow (OVERFLOW_POLICIES)
+4. Đếm số lần mỗi chính sách được kích hoạt (BackpressureStats)
+
+Chính sách overflow:
+- "drop_timer": bỏ frame UPDATE_TIMER cũ nhất (đã lỗi thời)
+- "latest_price": bỏ mọi UPDATE_TIMER cũ và NEW_PRICE cũ cùng phiên với frame mới,
+  giá chưa gửi của các phiên khác (client xem nhiều phòng) được giữ nguyên
+- "disconnect": ngắt kết nối client chậm ngay lập tức
+Nếu chính sách không giải phóng được chỗ trống → ngắt kết nối client.
+
+Coalescing (luôn bật, không đợi hàng đợi đầy):
+- NEW_PRICE / UPDATE_TIMER là sự kiện trạng thái: frame mới thay thế frame
+  cùng loại, cùng phiên còn chưa gửi (frame cũ bị bỏ, frame mới vào cuối hàng)
+- NEW_PRICE có version: broadcast song song (chế độ thread) có thể xếp hàng
+  lệch thứ tự → frame đến sau nhưng version nhỏ hơn frame đang chờ bị bỏ
+  (frame đang chờ mới hơn được giữ lại)
+- WINNER / NO_WINNER / SHUTDOWN là sự kiện kết thúc: luôn được gửi, đúng thứ tự,
+  và không frame nào được gộp qua chúng
+→ client chậm chỉ nhận trạng thái mới nhất, ít bytes nhất
+"""
+
+import threading
+import socket
+from collections import deque
+
+from counters import AtomicCounter, TrafficStats
+from event_log import log
+
+# Các chính sách khi hàng đợi đầy
+OVERFLOW_POLICIES = ("drop_timer", "latest_price", "disconnect")
+
+DEFAULT_OUTBOX_SIZE = 256
+DEFAULT_OVERFLOW_POLICY = "drop_timer"
+
+# Các loại message có thể bỏ khi client chậm (đã bị message mới hơn thay thế)
+TIMER_TYPES = ("UPDATE_TIMER",)
+PRICE_TYPES = ("NEW_PRICE",)
+
+# Sự kiện trạng thái được gộp theo (loại, phiên) / sự kiện kết thúc không bao giờ bị gộp qua
+COALESCE_TYPES = PRICE_TYPES + TIMER_TYPES
+TERMINAL_TYPES = ("WINNER", "NO_WINNER", "SHUTDOWN")
+
+
+class BackpressureStats:
+    """
+    Thống kê số lần các chính sách overflow được kích hoạt
+    
+    Attributes:
+        dropped_timer (AtomicCounter): Số frame UPDATE_TIMER đã bỏ
+        collapsed_price (AtomicCounter): Số frame NEW_PRICE đã gộp vào giá mới nhất
+        disconnected (AtomicCounter): Số client chậm đã bị ngắt kết nối
+        coalesced (AtomicCounter): Số frame chưa gửi đã bị frame mới hơn thay thế
+    """
+    
+    def __init__(self):
+        self.dropped_timer = AtomicCounter()
+        self.collapsed_price = AtomicCounter()
+        self.disconnected = AtomicCounter()
+        self.coalesced = AtomicCounter()
+    
+    def to_dict(self):
+        """
+        Returns:
+            dict: Giá trị hiện tại của các counters
+        """
+        return {
+            "dropped_timer": self.dropped_timer.value,
+            "collapsed_price": self.collapsed_price.value,
+            "disconnected": self.disconnected.value,
+            "coalesced": self.coalesced.value
+        }
+
+
+class ClientOutbox:
+    """
+    Hàng đợi gửi giới hạn của 1 client (phần logic chung)
+    
+    Lớp con cài đặt writer thực sự:
+    - ThreadedOutbox: writer thread + socket.sendall (chế độ thread)
+    - AsyncOutbox (async_server.py): writer task + StreamWriter (chế độ async)
+    
+    Attributes:
+        client_id (str): ID của client
+        max_size (int): Số frame tối đa trong hàng đợi
+        policy (str): Chính sách overflow
+        stats (BackpressureStats): Thống kê dùng chung của Hub
+        traffic (TrafficStats): Thống kê lưu lượng dùng chung của Hub (bytes/frame đã gửi)
+        queue (deque): Các entry (msg_type, frame, key, fanout, version) chờ gửi
+            (fanout: FanoutTimer của NEW_PRICE đang được đo độ trễ, hoặc None;
+            version: version snapshot của NEW_PRICE, hoặc None)
+        latest (dict): {(msg_type, key): entry} - sự kiện trạng thái chưa gửi
+            mới nhất (để gộp)
+        lock (threading.Lock): Bảo vệ queue
+        closed (bool): Outbox đã đóng (không nhận thêm frame)
+    """
+    
+    def __init__(self, client_id, max_size=DEFAULT_OUTBOX_SIZE,
+                 policy=DEFAULT_OVERFLOW_POLICY, stats=None, on_disconnect=None, traffic=None):
+        """
+        Args:
+            client_id (str): ID của client
+            max_size (int): Số frame tối đa trong hàng đợi
+            policy (str): Chính sách overflow (xem OVERFLOW_POLICIES)
+            stats (BackpressureStats): Thống kê dùng chung
+            on_disconnect (callable): Gọi với (outbox) khi phải ngắt client
+                (hàng đợi tràn hoặc lỗi gửi)
+            traffic (TrafficStats): Thống kê lưu lượng dùng chung
+        """
+        self.client_id = client_id
+        self.max_size = max_size
+        self.policy = policy if policy in OVERFLOW_POLICIES else DEFAULT_OVERFLOW_POLICY
+        self.stats = stats if stats is not None else BackpressureStats()
+        self.traffic = traffic if traffic is not None else TrafficStats()
+        self.on_disconnect = on_disconnect
+        self.queue = deque()
+        self.latest = {}
+        self.lock = threading.Lock()
+        self.closed = False
+    
+    def put(self, frame, msg_type=None, key=None, fanout=None, version=None):
+        """
+        Đưa 1 frame vào hàng đợi (không block)
+        
+        Args:
+            frame (bytes): Frame đã encode
+            msg_type (str): Loại message (để áp dụng chính sách overflow / gộp)
+            key (str): Phiên của message (NEW_PRICE / UPDATE_TIMER chỉ gộp
+                với frame cùng phiên)
+            fanout (FanoutTimer, optional): Báo done() khi frame đã gửi
+                (hoặc bị gộp / bỏ) - xem latency.py
+            version (int, optional): Version snapshot của NEW_PRICE - frame cũ
+                hơn frame cùng khóa đang chờ thì bị bỏ thay vì thay thế nó
+        
+        Returns:
+            bool: True nếu frame được nhận, False nếu client đã/bị ngắt
+        """
+        overflow = False
+        
+        with self.lock:
+            if self.closed:
+                return False
+            
+            if msg_type in COALESCE_TYPES:
+                if not self._coalesce(msg_type, key, version):
+                    # Đã có frame mới hơn đang chờ → frame này lỗi thời ngay khi đến
+                    self.stats.coalesced.increment()
+                    if fanout is not None:
+                        fanout.done()
+                    return True
+            elif msg_type in TERMINAL_TYPES:
+                # Frame sau sự kiện kết thúc không được gộp với frame trước nó
+                self.latest.clear()
+            
+            if len(self.queue) >= self.max_size:
+                self._make_room(msg_type, key)
+            
+            if len(self.queue) < self.max_size:
+                entry = (msg_type, frame, key, fanout, version)
+                self.queue.append(entry)
+                if msg_type in COALESCE_TYPES:
+                    self.latest[(msg_type, key)] = entry
+            elif msg_type in TIMER_TYPES and self.policy != "disconnect":
+                # Không còn chỗ → bỏ chính frame timer mới (timer sau sẽ thay thế)
+                self.stats.dropped_timer.increment()
+                return True
+            else:
+                overflow = True
+                self.closed = True
+        
+        if overflow:
+            self.stats.disconnected.increment()
+            log.warning("OUTBOX", "⚠️ Client quá chậm (hàng đợi đầy) - ngắt kết nối", client_id=self.client_id)
+            self._wake_writer()
+            if self.on_disconnect:
+                self.on_disconnect(self)
+            return False
+        
+        self._wake_writer()
+        return True
+    
+    def _coalesce(self, msg_type, key, version):
+        """
+        Bỏ frame cùng loại, cùng phiên còn chưa gửi (gọi khi đang giữ lock)
+        
+        Frame mới luôn vào cuối hàng → không vượt qua frame nào đã xếp trước nó
+        
+        Returns:
+            bool: False nếu frame đang chờ có version lớn hơn version của frame
+                mới (frame mới phải bị bỏ, frame đang chờ giữ nguyên)
+        """
+        previous = self.latest.get((msg_type, key))
+        if previous is None:
+            return True
+        if version is not None and previous[4] is not None and version < previous[4]:
+            return False
+        
+        del self.latest[(msg_type, key)]
+        try:
+            self.queue.remove(previous)
+        except ValueError:
+            # Đã bị _make_room bỏ
+            return True
+        self.stats.coalesced.increment()
+        if previous[3] is not None:
+            previous[3].done()
+        return True
+    
+    def _take_frames(self):
+        """
+        Lấy toàn bộ frame đang chờ và làm rỗng hàng đợi (gọi khi đang giữ lock)
+        
+        Returns:
+            tuple: (frames, fanouts) - writer gọi fanout.done() sau khi gửi xong
+        """
+        frames = [entry[1] for entry in self.queue]
+        fanouts = [entry[3] for entry in self.queue if entry[3] is not None]
+        self.queue.clear()
+        self.latest.clear()
+        return frames, fanouts
+    
+    def _discard_queue(self):
+        """
+        Bỏ mọi frame chưa gửi khi client bị ngắt (gọi khi đang giữ lock)
+        """
+        for entry in self.queue:
+            if entry[3] is not None:
+                entry[3].done()
+        self.queue.clear()
+    
+    def _make_room(self, msg_type, key):
+        """
+        Áp dụng chính sách overflow khi hàng đợi đầy (gọi khi đang giữ lock)
+        
+        Args:
+            msg_type (str): Loại của frame sắp được thêm
+            key (str): Khóa gộp (phiên) của frame sắp được thêm
+        """
+        if self.policy == "drop_timer":
+            # Bỏ frame UPDATE_TIMER cũ nhất
+            for index, entry in enumerate(self.queue):
+                if entry[0] in TIMER_TYPES:
+                    del self.queue[index]
+                    self._forget(entry)
+                    self.stats.dropped_timer.increment()
+                    return
+        
+        elif self.policy == "latest_price":
+            # Bỏ mọi timer cũ, và NEW_PRICE cũ cùng (loại, khóa) nếu frame mới là
+            # NEW_PRICE. Chỉ bỏ giá còn trong latest: giá đứng trước 1 sự kiện kết
+            # thúc vẫn phải được gửi, giá của phiên khác không bị giá này thay thế
+            replaced = self.latest.get((msg_type, key)) if msg_type in PRICE_TYPES else None
+            kept = deque()
+            for entry in self.queue:
+                queued_type = entry[0]
+                if entry is replaced:
+                    self.stats.collapsed_price.increment()
+                    self._forget(entry)
+                    if entry[3] is not None:
+                        entry[3].done()
+                elif queued_type in TIMER_TYPES:
+                    self.stats.dropped_timer.increment()
+                    self._forget(entry)
+                else:
+                    kept.append(entry)
+            self.queue = kept
+        
+        # policy == "disconnect": không giải phóng gì
+    
+    def _forget(self, entry):
+        """
+        Xóa entry đã bị bỏ khỏi latest (gọi khi đang giữ lock) - entry cũ còn
+        trong latest sẽ chặn nhầm frame mới có version nhỏ hơn nó
+        """
+        latest_key = (entry[0], entry[2])
+        if self.latest.get(latest_key) is entry:
+            del self.latest[latest_key]
+    
+    def pop_all(self):
+        """
+        Lấy toàn bộ frame đang chờ (writer gọi)
+        
+        Returns:
+            tuple: (frames, fanouts) - các frame bytes theo đúng thứ tự
+        """
+        with self.lock:
+            return self._take_frames()
+    
+    def pending(self):
+        """
+        Returns:
+            int: Số frame đang chờ gửi
+        """
+        return len(self.queue)
+    
+    def close(self):
+        """
+        Đóng outbox - writer dừng sau khi thấy closed
+        """
+        with self.lock:
+            self.closed = True
+        self._wake_writer()
+    
+    def flush(self, timeout):
+        """
+        Đợi hàng đợi gửi hết (tối đa timeout giây)
+        
+        Returns:
+            bool: True nếu đã gửi hết
+        """
+        return self.pending() == 0
+    
+    def _wake_writer(self):
+        """
+        Báo cho writer có frame mới (lớp con cài đặt)
+        """
+        raise NotImplementedError
+    
+    def _count_sent(self, frames):
+        """
+        Cộng lưu lượng của 1 đợt frame đã gửi (writer gọi, 2 lần cộng mỗi đợt)
+        """
+        self.traffic.frames_out.increment(len(frames))
+        self.traffic.bytes_out.increment(sum(map(len, frames)))
+
+
+class ThreadedOutbox(ClientOutbox):
+    """
+    Outbox cho chế độ thread: 1 writer thread gọi sendall() blocking
+    
+    Chỉ writer thread bị block khi client chậm; ClientThread, AuctionScheduler
+    và các broadcaster khác chỉ đưa frame vào hàng đợi.
+    """
+    
+    def __init__(self, client_socket, client_id, **kwargs):
+        """
+        Args:
+            client_socket: Socket của client
+            client_id (str): ID của client
+            **kwargs: max_size, policy, stats, on_disconnect, traffic (xem ClientOutbox)
+        """
+        super().__init__(client_id, **kwargs)
+        self.client_socket = client_socket
+        self.condition = threading.Condition(self.lock)
+        self.sending = False
+        self.writer_thread = threading.Thread(
+            target=self._writer_loop,
+            name=f"{client_id}-writer",
+            daemon=True
+        )
+    
+    def start(self):
+        """
+        Khởi động writer thread
+        """
+        self.writer_thread.start()
+    
+    def _wake_writer(self):
+        with self.condition:
+            self.condition.notify_all()
+    
+    def _writer_loop(self):
+        """
+        Vòng lặp của writer thread: lấy frame và sendall() lần lượt
+        """
+        while True:
+            with self.condition:
+                while not self.queue and not self.closed:
+                    self.condition.wait()
+                
+                if not self.queue and self.closed:
+                    return
+                
+                frames, fanouts = self._take_frames()
+                self.sending = True
+            
+            try:
+                # Cả đợt trong 1 lần sendall (1 syscall, không chia thành nhiều segment nhỏ)
+                self.client_socket.sendall(b"".join(frames))
+                self._count_sent(frames)
+            except (socket.error, OSError) as e:
+                with self.lock:
+                    already_closed = self.closed
+                    self.closed = True
+                    self._discard_queue()
+                if not already_closed:
+                    log.warning("OUTBOX", "⚠️ Không gửi được đến client", client_id=self.client_id, error=e)
+                    if self.on_disconnect:
+                        self.on_disconnect(self)
+                return
+            finally:
+                for fanout in fanouts:
+                    fanout.done()
+                with self.condition:
+                    self.sending = False
+                    # Báo cho flush() là đã gửi xong
+                    self.condition.notify_all()
+    
+    def flush(self, timeout):
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: (not self.queue and not self.sending) or self.closed,
+                timeout=timeout
+            )
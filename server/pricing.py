@@ -0,0 +1,162 @@
+"""
+Pricing Module - Biểu diễn giá bằng số nguyên (cents) cho toàn bộ hệ thống
+
+Nhiệm vụ chính:
+1. Parse giá từ wire / bàn phím thành số nguyên cents (không đi qua float)
+2. Đổi cents → số hiển thị (value trong message JSON) và chuỗi "$1500.10"
+3. Kiểm tra bước giá tối thiểu và giá tối đa bằng phép so sánh số nguyên
+
+Quy ước:
+- 1 đơn vị = CENTS_PER_UNIT cents, tối đa PRICE_DECIMALS chữ số thập phân
+- AuctionState, BidHistory và BidJournal chỉ làm việc với cents (int)
+- Message gửi đi giữ trường "value"/"current_price" là số đơn vị (để client cũ
+  vẫn hiển thị đúng) và thêm "value_cents" là giá trị chính xác
+
+Dùng chung cho:
+- Server: ClientSession, AuctionState, AuctionConfig
+- Client: client_main.py và client_ui.py (parse giá người dùng nhập)
+"""
+
+import math
+import re
+
+CENTS_PER_UNIT = 100
+PRICE_DECIMALS = 2
+
+# Giá tối đa mặc định (đơn vị) - trước đây client tự chặn bằng số chữ số
+DEFAULT_MAX_PRICE = 999_999_999
+
+# "1500", "1500.5", "1500.50", ".5" - không dấu, không số mũ, không khoảng trắng giữa
+_PRICE_PATTERN = re.compile(r"(\d*)(?:\.(\d*))?")
+
+
+class PriceError(ValueError):
+    """
+    Giá không hợp lệ (sai định dạng, âm, quá nhiều chữ số thập phân...)
+    """
+
+
+def parse_price(raw):
+    """
+    Parse 1 giá trị giá thành số nguyên cents
+    
+    Logic:
+    - int: nhân thẳng với CENTS_PER_UNIT
+    - str: tách phần nguyên / phần thập phân bằng regex, không qua float
+    - float (json.loads trả về cho "1500.1"): dùng repr() - chuỗi ngắn nhất
+      round-trip, trùng với literal trên wire khi giá ≤ 15 chữ số có nghĩa
+    
+    Args:
+        raw (int | float | str): Giá nhận được
+    
+    Returns:
+        int: Giá theo cents (>= 0)
+    
+    Raises:
+        PriceError: Nếu giá không hợp lệ
+    """
+    if isinstance(raw, bool):
+        raise PriceError("Bid value must be a number")
+    
+    if isinstance(raw, int):
+        if raw < 0:
+            raise PriceError("Bid value must be positive")
+        return raw * CENTS_PER_UNIT
+    
+    if isinstance(raw, float):
+        if not math.isfinite(raw):
+            raise PriceError("Bid value must be a number")
+        text = repr(raw)
+    elif isinstance(raw, str):
+        text = raw.strip()
+    else:
+        raise PriceError("Bid value must be a number")
+    
+    match = _PRICE_PATTERN.fullmatch(text)
+    if match is None or not (match.group(1) or match.group(2)):
+        if text.startswith("-"):
+            raise PriceError("Bid value must be positive")
+        raise PriceError("Bid value must be a number")
+    
+    whole, fraction = match.group(1), match.group(2) or ""
+    if len(fraction) > PRICE_DECIMALS:
+        # "1500.10" từ repr() không bao giờ có số 0 thừa → chỉ số 0 do người dùng gõ
+        if fraction[PRICE_DECIMALS:].strip("0"):
+            raise PriceError(f"Bid value must have at most {PRICE_DECIMALS} decimal places")
+        fraction = fraction[:PRICE_DECIMALS]
+    
+    return int(whole or "0") * CENTS_PER_UNIT + int(fraction.ljust(PRICE_DECIMALS, "0"))
+
+
+def parse_cents(raw):
+    """
+    Parse trường value_cents (đã là số nguyên cents trên wire)
+    
+    Args:
+        raw (int | str): Giá theo cents
+    
+    Returns:
+        int: Giá theo cents (>= 0)
+    
+    Raises:
+        PriceError: Nếu không phải số nguyên không âm
+    """
+    if isinstance(raw, bool):
+        raise PriceError("value_cents must be an integer")
+    if isinstance(raw, str) and raw.isdigit():
+        raw = int(raw)
+    if not isinstance(raw, int):
+        raise PriceError("value_cents must be an integer")
+    if raw < 0:
+        raise PriceError("Bid value must be positive")
+    return raw
+
+
+def to_units(cents):
+    """
+    Đổi cents → số đơn vị để đưa vào message JSON
+    
+    Returns:
+        int | float: int nếu chẵn đơn vị (1500), float nếu lẻ (1500.1)
+    """
+    if cents % CENTS_PER_UNIT == 0:
+        return cents // CENTS_PER_UNIT
+    return cents / CENTS_PER_UNIT
+
+
+def format_price(cents):
+    """
+    Chuỗi hiển thị của 1 giá (không có ký hiệu $)
+    
+    Returns:
+        str: "1500" hoặc "1500.10"
+    """
+    whole, fraction = divmod(cents, CENTS_PER_UNIT)
+    if fraction == 0:
+        return str(whole)
+    return f"{whole}.{fraction:0{PRICE_DECIMALS}d}"
+
+
+def check_bid(value, current_price, min_increment, max_price):
+    """
+    Kiểm tra 1 giá đặt so với giá hiện tại (toàn bộ là phép so sánh số nguyên)
+    
+    Args:
+        value (int): Giá đặt (cents)
+        current_price (int): Giá hiện tại (cents)
+        min_increment (int): Bước giá tối thiểu (cents)
+        max_price (int): Giá tối đa (cents)
+    
+    Returns:
+        str or None: Nội dung lỗi, None nếu hợp lệ
+    """
+    if value > max_price:
+        return f"Giá tối đa là ${format_price(max_price)}"
+    
+    minimum = current_price + min_increment
+    if value < minimum:
+        if min_increment > 1:
+            return f"Giá phải ít nhất ${format_price(minimum)} (bước giá ${format_price(min_increment)})"
+        return f"Giá phải lớn hơn ${format_price(current_price)}"
+    
+    return None
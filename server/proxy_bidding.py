@@ -0,0 +1,143 @@
+"""
+Proxy Bidding Module - Đấu giá tự động (proxy bid) theo kiểu eBay
+
+Người chơi đăng ký 1 giá tối đa ẩn (ceiling); server tự đặt giá thay họ:
+- Người có ceiling cao nhất dẫn đầu (bằng nhau → ai đăng ký trước thắng)
+- Giá = min(ceiling cao nhất, đối thủ mạnh nhất + bước giá)
+  (đối thủ = ceiling cao thứ 2 hoặc bid thường đang dẫn đầu)
+→ kết quả giống hệt như 2 bên tự bid tăng dần, nhưng không cần round-trip nào
+
+Cấu trúc dữ liệu:
+- Max-heap (heapq với khóa (-ceiling, seq)) chứa ceiling của mọi người chơi
+- Xóa lười (lazy deletion): nâng ceiling chỉ push bản ghi mới, bản ghi cũ bị
+  bỏ qua khi nổi lên đỉnh heap; proxy đã cạn (không thể vượt giá hiện tại)
+  cũng bị loại khi nổi lên đỉnh
+→ mỗi bid / mỗi lần đăng ký chỉ tốn O(log n), không phụ thuộc số proxy
+
+Thread-Safety:
+- ProxyBook KHÔNG có lock riêng: mọi hàm được gọi khi đang giữ AuctionState.lock
+"""
+
+import heapq
+import itertools
+
+
+class ProxyBook:
+    """
+    Sổ ceiling của các proxy bid trong 1 phiên
+    
+    Attributes:
+        heap (list): Các bản ghi (-ceiling, seq, user) - đỉnh là ceiling cao nhất
+        ceilings (dict): {user: (ceiling, seq)} - bản ghi còn hiệu lực của mỗi user
+        sequence (itertools.count): Thứ tự đặt giá (dùng chung với bid thường
+            để phân xử khi bằng giá: ai đặt trước thắng)
+    """
+    
+    def __init__(self):
+        self.heap = []
+        self.ceilings = {}
+        self.sequence = itertools.count(1)
+    
+    def __len__(self):
+        return len(self.ceilings)
+    
+    def next_seq(self):
+        """
+        Lấy số thứ tự cho 1 bid thường (cùng dãy với proxy)
+        
+        Returns:
+            int: Số thứ tự tăng dần
+        """
+        return next(self.sequence)
+    
+    def get(self, user):
+        """
+        Returns:
+            int or None: Ceiling hiện tại của user (cents)
+        """
+        entry = self.ceilings.get(user)
+        return entry[0] if entry is not None else None
+    
+    def register(self, user, ceiling):
+        """
+        Đăng ký / nâng ceiling của 1 user - O(log n)
+        
+        Args:
+            user (str): Người chơi
+            ceiling (int): Giá tối đa (cents)
+        
+        Returns:
+            int: Số thứ tự của lần đăng ký
+        """
+        seq = next(self.sequence)
+        self.ceilings[user] = (ceiling, seq)
+        heapq.heappush(self.heap, (-ceiling, seq, user))
+        return seq
+    
+    def _can_beat(self, ceiling, seq, price, standing_seq, min_increment):
+        # Vượt bid đang dẫn: cao hơn ít nhất 1 bước giá, hoặc bằng giá nhưng đặt trước
+        return ceiling >= price + min_increment or (ceiling >= price and seq < standing_seq)
+    
+    def _clean(self, price, winner, standing_seq, min_increment):
+        """
+        Bỏ các bản ghi trên đỉnh heap đã cũ hoặc đã cạn
+        
+        Proxy không phải người dẫn đầu mà không vượt được giá hiện tại thì không
+        bao giờ vượt được nữa (giá chỉ tăng) → xóa hẳn.
+        """
+        heap = self.heap
+        while heap:
+            negative, seq, user = heap[0]
+            if self.ceilings.get(user) != (-negative, seq):
+                heapq.heappop(heap)
+            elif user != winner and not self._can_beat(-negative, seq, price, standing_seq,
+                                                       min_increment):
+                heapq.heappop(heap)
+                del self.ceilings[user]
+            else:
+                return
+    
+    def resolve(self, price, winner, standing_seq, min_increment):
+        """
+        Tính kết quả sau khi giá / người dẫn đầu / các ceiling thay đổi
+        
+        Chỉ cần xét 2 ceiling cao nhất: sau mỗi lần resolve không proxy nào khác
+        vượt được bid đang dẫn, nên chỉ thay đổi vừa xảy ra mới tạo ra kết quả mới.
+        
+        Args:
+            price (int): Giá hiện tại (cents)
+            winner (str): Người đang dẫn đầu (None nếu chưa có bid)
+            standing_seq (int): Số thứ tự của bid đang dẫn
+            min_increment (int): Bước giá (cents)
+        
+        Returns:
+            tuple or None: (price, winner, standing_seq) mới, None nếu không đổi
+        """
+        self._clean(price, winner, standing_seq, min_increment)
+        if not self.heap:
+            return None
+        
+        # Tạm lấy đỉnh ra để xem ceiling cao thứ 2 (đối thủ mạnh nhất)
+        top = heapq.heappop(self.heap)
+        self._clean(price, winner, standing_seq, min_increment)
+        second = self.heap[0] if self.heap else None
+        heapq.heappush(self.heap, top)
+        
+        ceiling, seq, user = -top[0], top[1], top[2]
+        
+        # Đối thủ mạnh nhất: ceiling thứ 2, hoặc bid đang dẫn nếu proxy cao nhất
+        # không phải của người dẫn đầu. Ceiling bằng nhau → bản ghi đặt trước
+        # nằm trên đỉnh heap nên thắng với giá = ceiling.
+        if user == winner:
+            if second is None:
+                return None
+            rival = -second[0]
+        else:
+            rival = price
+            if second is not None and -second[0] > rival:
+                rival = -second[0]
+        
+        new_price = min(ceiling, rival + min_increment)
+        if new_price == price and user == winner:
+            return None
+        return new_price, user, seq
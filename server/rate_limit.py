@@ -0,0 +1,196 @@
+"""
+Rate Limit Module - Token bucket giới hạn tốc độ BID của từng kết nối / từng user
+
+Nhiệm vụ chính:
+1. Mỗi kết nối có 1 bucket riêng (chặn 1 socket gửi BID liên tục)
+2. Mỗi user có 1 bucket dùng chung giữa các kết nối (chặn bot mở nhiều socket
+   với cùng 1 tên). Danh tính do server gán: (địa chỉ client, tên trong BID
+   đầu tiên của kết nối) - trường "user" client tự điền, nếu dùng làm khóa thì
+   kết nối khác gửi BID dưới tên "victim" là rút cạn được bucket của người thật
+3. Kiểm tra ngay trong read path, TRƯỚC khi parse giá và lấy AuctionState.lock
+   → bot bị chặn không chiếm thời gian giữ lock của người chơi thật
+4. Bid bị chặn chỉ được đếm (không print) và trả về 1 frame ERROR encode sẵn
+
+Token bucket:
+- Bucket đầy = burst token, nạp lại rate token / giây
+- Mỗi BID tiêu 1 token; hết token → từ chối
+
+Mặc định TẮT (rate 0) như server gốc; bật bằng --bid-rate / --user-bid-rate
+"""
+
+import threading
+import time
+
+from counters import AtomicCounter
+from message_framing import encode_message
+
+DEFAULT_BID_RATE = 0           # BID / giây cho mỗi kết nối (0 = không giới hạn, VD: 20)
+DEFAULT_BID_BURST = 40
+DEFAULT_USER_BID_RATE = 0      # BID / giây cho mỗi user (0 = không giới hạn, VD: 10)
+DEFAULT_USER_BID_BURST = 20
+
+# Số user bucket tối đa trước khi dọn các bucket đã đầy (user không còn bid)
+MAX_USER_BUCKETS = 100_000
+
+# Frame ERROR encode 1 lần, gửi cho mọi bid bị chặn
+RATE_LIMITED_FRAME = encode_message({
+    "type": "ERROR",
+    "code": "RATE_LIMITED",
+    "message": "Bạn đặt giá quá nhanh, vui lòng thử lại sau"
+})
+
+
+class TokenBucket:
+    """
+    Token bucket (rate token / giây, tối đa burst token)
+    
+    Attributes:
+        rate (float): Số token nạp lại mỗi giây
+        burst (float): Dung lượng bucket
+        tokens (float): Số token hiện có
+        updated (float): time.monotonic() lần nạp gần nhất
+        lock (threading.Lock): None với bucket chỉ 1 thread dùng (bucket kết nối)
+    """
+    
+    def __init__(self, rate, burst, shared=False):
+        """
+        Args:
+            rate (float): Token / giây
+            burst (float): Dung lượng bucket (bucket mới bắt đầu đầy)
+            shared (bool): True nếu nhiều thread cùng dùng (bucket user)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock() if shared else None
+    
+    def _take(self, now):
+        tokens = self.tokens + (now - self.updated) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        self.updated = now
+        
+        if tokens < 1:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - 1
+        return True
+    
+    def try_acquire(self, now=None):
+        """
+        Lấy 1 token
+        
+        Returns:
+            bool: True nếu còn token (được phép bid)
+        """
+        if now is None:
+            now = time.monotonic()
+        if self.lock is None:
+            return self._take(now)
+        with self.lock:
+            return self._take(now)
+    
+    def is_full(self, now):
+        """
+        Bucket đã nạp đầy (user không bid trong 1 thời gian) → có thể bỏ
+        """
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class BidRateLimiter:
+    """
+    Giới hạn tốc độ BID theo kết nối và theo user
+    
+    Attributes:
+        rate, burst: Cấu hình bucket của mỗi kết nối (rate 0 = tắt)
+        user_rate, user_burst: Cấu hình bucket của mỗi user (user_rate 0 = tắt)
+        user_buckets (dict): {user_key: TokenBucket} - user_key do session gán
+            (xem ClientSession.rate_limit_key)
+        lock (threading.Lock): Chỉ dùng khi thêm / dọn user bucket
+    """
+    
+    def __init__(self, rate=DEFAULT_BID_RATE, burst=DEFAULT_BID_BURST,
+                 user_rate=DEFAULT_USER_BID_RATE, user_burst=DEFAULT_USER_BID_BURST,
+                 max_users=MAX_USER_BUCKETS):
+        self.rate = rate
+        self.burst = burst
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_users = max_users
+        
+        self.user_buckets = {}
+        self.lock = threading.Lock()
+        
+        # Thống kê
+        self.connection_rejected = AtomicCounter()
+        self.user_rejected = AtomicCounter()
+        
+        print(f"[RATE_LIMIT] Kết nối: {rate} bid/s (burst {burst}) | "
+              f"User: {user_rate} bid/s (burst {user_burst})")
+    
+    def new_connection_bucket(self):
+        """
+        Tạo bucket cho 1 kết nối mới (chỉ session của kết nối đó dùng)
+        
+        Returns:
+            TokenBucket or None: None nếu không giới hạn theo kết nối
+        """
+        if self.rate <= 0:
+            return None
+        return TokenBucket(self.rate, self.burst)
+    
+    def get_user_bucket(self, user_key, now):
+        bucket = self.user_buckets.get(user_key)
+        if bucket is not None:
+            return bucket
+        
+        with self.lock:
+            bucket = self.user_buckets.get(user_key)
+            if bucket is None:
+                if len(self.user_buckets) >= self.max_users:
+                    self._evict_idle(now)
+                bucket = TokenBucket(self.user_rate, self.user_burst, shared=True)
+                self.user_buckets[user_key] = bucket
+        return bucket
+    
+    def _evict_idle(self, now):
+        # Bỏ bucket đã đầy: user đó bid lại sẽ nhận bucket mới cũng đầy → không đổi hành vi
+        idle = [user_key for user_key, bucket in self.user_buckets.items() if bucket.is_full(now)]
+        for user_key in idle:
+            del self.user_buckets[user_key]
+    
+    def allow(self, connection_bucket, user_key):
+        """
+        Kiểm tra 1 BID (gọi trong read path, trước AuctionState.lock)
+        
+        Args:
+            connection_bucket (TokenBucket): Bucket của kết nối (None = không giới hạn)
+            user_key (hashable): Danh tính user do server gán (KHÔNG phải trường
+                "user" của từng message - client điền tùy ý)
+        
+        Returns:
+            bool: True nếu được phép, False nếu bị chặn (đã đếm)
+        """
+        now = time.monotonic()
+        
+        if connection_bucket is not None and not connection_bucket.try_acquire(now):
+            self.connection_rejected.increment()
+            return False
+        
+        if self.user_rate > 0 and not self.get_user_bucket(user_key, now).try_acquire(now):
+            self.user_rejected.increment()
+            return False
+        
+        return True
+    
+    def get_stats(self):
+        """
+        Returns:
+            dict: connection_rejected, user_rejected, user_buckets
+        """
+        return {
+            "connection_rejected": self.connection_rejected.value,
+            "user_rejected": self.user_rejected.value,
+            "user_buckets": len(self.user_buckets)
+        }
@@ -0,0 +1,9 @@
+"""
+Cấu hình chung cho pytest: các module server import phẳng (chạy từ server/)
+→ thêm server/ vào sys.path giống benchmark.py / load_test.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server"))
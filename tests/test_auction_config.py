@@ -0,0 +1,67 @@
+"""
+Test auction_config.py: validate() lỗi → reset_invalid_fields() đưa mọi trường hỏng về mặc định
+"""
+
+from auction_config import AuctionConfig
+
+
+def test_default_config_is_valid():
+    assert AuctionConfig().validate() == (True, "")
+
+
+def test_reset_invalid_fields_makes_config_valid():
+    config = AuctionConfig()
+    config.auction_duration = 5
+    config.sync_interval = 0
+    config.outbox_size = 0
+    config.min_increment = -5
+    config.max_price = 1
+    config.log_level = "BAD"
+    config.bid_batch_ms = 5000
+    
+    assert config.validate()[0] is False
+    reset = dict(config.reset_invalid_fields())
+    
+    assert reset == {
+        "auction_duration": AuctionConfig.DEFAULT_DURATION,
+        "sync_interval": AuctionConfig.DEFAULT_SYNC_INTERVAL,
+        "outbox_size": AuctionConfig.DEFAULT_OUTBOX_SIZE,
+        "min_increment": AuctionConfig.DEFAULT_MIN_INCREMENT,
+        "max_price": AuctionConfig.DEFAULT_MAX_PRICE,
+        "log_level": AuctionConfig.DEFAULT_LOG_LEVEL,
+        "bid_batch_ms": AuctionConfig.DEFAULT_BID_BATCH_MS
+    }
+    assert config.validate() == (True, "")
+
+
+def test_reset_keeps_valid_fields():
+    config = AuctionConfig()
+    config.sync_interval = 3
+    config.outbox_size = 16
+    config.overflow_policy = "latest_price"
+    
+    assert config.reset_invalid_fields() == []
+    assert (config.sync_interval, config.outbox_size, config.overflow_policy) == (3, 16, "latest_price")
+
+
+def test_reset_catalog_entries():
+    config = AuctionConfig()
+    config.catalog = [{}, {"auction_id": "auction-2", "item_name": " ", "auction_duration": 0,
+                           "starting_price": 50, "max_price": 10}]
+    
+    reset = dict(config.reset_invalid_fields())
+    
+    assert reset == {
+        "auction-2.item_name": AuctionConfig.DEFAULT_ITEM_NAME,
+        "auction-2.auction_duration": AuctionConfig.DEFAULT_DURATION,
+        "auction-2.max_price": AuctionConfig.DEFAULT_MAX_PRICE
+    }
+    assert config.validate() == (True, "")
+
+
+def test_duplicate_auction_id_cannot_be_reset():
+    config = AuctionConfig()
+    config.catalog = [{}, {"auction_id": config.auction_id, "item_name": "x", "auction_duration": 30}]
+    
+    config.reset_invalid_fields()
+    assert config.validate()[0] is False
@@ -0,0 +1,114 @@
+"""
+Test bid_journal.py: replay sau crash (đuôi ghi dở / sai crc) và cắt text UTF-8
+"""
+
+import os
+
+import pytest
+
+from bid_journal import (RECORD_BID, BidJournal, _LONG_LEN, _SHORT_LEN,
+                         _pack_text, _unpack_text, replay_journal, scan_journal)
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "bids.journal")
+
+
+def write_bids(path, bids):
+    journal = BidJournal(path, interval_ms=1)
+    for auction_id, user, value in bids:
+        journal.record_bid(auction_id, user, value)
+    journal.close()
+
+
+def test_round_trip(journal_path):
+    BidJournal(journal_path).close()
+    journal = BidJournal(journal_path, interval_ms=1)
+    journal.record_deadline("auction-1", 60)
+    journal.record_bid("auction-1", "alice", 1500)
+    journal.record_proxy("auction-1", "bob", 9000)
+    journal.record_bid("auction-1", "bob", 1600)
+    journal.record_end("auction-1")
+    journal.close()
+    
+    bids = []
+    auctions = replay_journal(journal_path, on_bid=lambda *bid: bids.append(bid[:3]))
+    
+    auction = auctions["auction-1"]
+    assert auction["current_price"] == 1600
+    assert auction["current_winner"] == "bob"
+    assert auction["bids"] == 2
+    assert auction["proxies"] == [("bob", 9000)]
+    assert auction["deadline"] is not None
+    assert auction["ended"] is True
+    assert bids == [("auction-1", "alice", 1500), ("auction-1", "bob", 1600)]
+
+
+def test_torn_tail_is_ignored_and_truncated(journal_path):
+    write_bids(journal_path, [("auction-1", "alice", 1000), ("auction-1", "bob", 1100)])
+    size = os.path.getsize(journal_path)
+    
+    # Crash khi đang ghi bản ghi thứ 3: chỉ có nửa bản ghi trên đĩa
+    with open(journal_path, "ab") as f:
+        f.write(b"\x01\x02\x03\x04\x20\x00")
+    
+    auction = replay_journal(journal_path)["auction-1"]
+    assert auction["current_price"] == 1100
+    assert auction["bids"] == 2
+    assert scan_journal(journal_path)[1] == size
+    
+    # Mở lại để ghi tiếp: phần đuôi hỏng bị cắt, bản ghi mới đọc được
+    write_bids(journal_path, [("auction-1", "carol", 1200)])
+    auction = replay_journal(journal_path)["auction-1"]
+    assert auction["current_winner"] == "carol"
+    assert auction["bids"] == 3
+
+
+def test_crc_bad_tail_is_ignored(journal_path):
+    write_bids(journal_path, [("auction-1", "alice", 1000), ("auction-1", "bob", 1100)])
+    
+    # Hỏng 1 byte trong payload của bản ghi cuối → sai crc
+    with open(journal_path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes((last[0] ^ 0xFF,)))
+    
+    records, _ = scan_journal(journal_path)
+    assert [record_type for record_type, _ in records] == [RECORD_BID]
+    auction = replay_journal(journal_path)["auction-1"]
+    assert auction["current_winner"] == "alice"
+    assert auction["bids"] == 1
+
+
+def test_not_a_journal_is_rejected(journal_path):
+    with open(journal_path, "wb") as f:
+        f.write(b"not a journal")
+    
+    with pytest.raises(ValueError):
+        BidJournal(journal_path)
+    assert scan_journal(journal_path) == ([], 0)
+
+
+@pytest.mark.parametrize("length_struct, limit", [(_SHORT_LEN, 255), (_LONG_LEN, 65535)])
+def test_pack_text_truncates_on_character_boundary(length_struct, limit):
+    # "ễ" = 3 bytes, thêm 1 byte ASCII ở đầu → cắt đúng limit bytes rơi giữa ký tự
+    text = "a" + "ễ" * (limit // 3 + 5)
+    
+    packed = _pack_text(text, length_struct)
+    decoded, offset = _unpack_text(packed, 0, length_struct)
+    
+    assert offset == len(packed)
+    assert len(decoded.encode("utf-8")) <= limit
+    assert text.startswith(decoded)
+    assert len(decoded) == 1 + (limit - 1) // 3
+
+
+def test_long_multibyte_auction_id_replays(journal_path):
+    auction_id = "phiên số " + "đấu giá " * 40
+    write_bids(journal_path, [(auction_id, "alice", 1000)])
+    
+    (replayed,) = replay_journal(journal_path)
+    assert auction_id.startswith(replayed)
+    assert len(replayed.encode("utf-8")) <= 255
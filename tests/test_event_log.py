@@ -0,0 +1,34 @@
+"""
+Test event_log.py: writer thread chỉ chạy sau start()
+"""
+
+import io
+
+from event_log import EventLog, log
+
+
+def test_shared_logger_not_started_on_import():
+    assert log.writer_thread is None
+    assert log.flush() is True
+
+
+def test_log_before_start_is_discarded():
+    stream = io.StringIO()
+    event_log = EventLog(stream=stream)
+    event_log.info("TEST", "trước start")
+    
+    assert len(event_log.pending) == 0
+    event_log.close()
+    assert stream.getvalue() == ""
+
+
+def test_start_writes_until_close():
+    stream = io.StringIO()
+    event_log = EventLog(stream=stream)
+    event_log.start()
+    event_log.start()
+    event_log.info("TEST", "sau start", auction_id="auction-1")
+    event_log.close()
+    
+    assert not event_log.writer_thread.is_alive()
+    assert "[TEST] sau start | auction_id=auction-1" in stream.getvalue()
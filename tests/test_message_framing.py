@@ -0,0 +1,96 @@
+"""
+Test message_framing.py: LineFramer.feed (frame bị chia nhỏ, nhiều frame / lần đọc, frame quá lớn)
+"""
+
+import json
+
+from message_framing import LineFramer, encode_message
+
+
+def test_single_frame():
+    framer = LineFramer()
+    assert framer.feed(b'{"type": "BID", "value": 1500}\n') == ([{"type": "BID", "value": 1500}], [])
+    assert framer.buffer == b""
+
+
+def test_frame_split_across_feeds():
+    framer = LineFramer()
+    frame = encode_message({"type": "BID", "value": 1500.5})
+    
+    for i in range(len(frame) - 1):
+        assert framer.feed(frame[i:i + 1]) == ([], [])
+    assert framer.feed(frame[-1:]) == ([{"type": "BID", "value": 1500.5}], [])
+
+
+def test_multibyte_character_split_across_feeds():
+    framer = LineFramer()
+    frame = '{"type": "JOIN", "name": "Nguyễn"}\n'.encode("utf-8")
+    cut = frame.index("ễ".encode("utf-8")) + 1
+    
+    assert framer.feed(frame[:cut]) == ([], [])
+    assert framer.feed(frame[cut:]) == ([{"type": "JOIN", "name": "Nguyễn"}], [])
+
+
+def test_many_frames_in_one_chunk_keep_order_and_remainder():
+    framer = LineFramer()
+    chunk = b"".join(encode_message({"seq": i}) for i in range(5)) + b'{"seq": 5'
+    
+    messages, errors = framer.feed(chunk)
+    assert [message["seq"] for message in messages] == [0, 1, 2, 3, 4]
+    assert errors == []
+    assert framer.buffer == b'{"seq": 5'
+    
+    assert framer.feed(b"}\n") == ([{"seq": 5}], [])
+
+
+def test_blank_lines_are_skipped():
+    framer = LineFramer()
+    assert framer.feed(b'\n  \n{"a": 1}\r\n\n') == ([{"a": 1}], [])
+
+
+def test_invalid_frame_does_not_drop_others():
+    framer = LineFramer()
+    messages, errors = framer.feed(b'{"a": 1}\nnot json\n\xff\xfe\n{"b": 2}\n')
+    
+    assert messages == [{"a": 1}, {"b": 2}]
+    assert len(errors) == 2
+    assert all(error.startswith("Invalid JSON format") for error in errors)
+
+
+def test_oversize_complete_frame_in_one_chunk():
+    framer = LineFramer(max_frame_size=32)
+    big = json.dumps({"pad": "x" * 64}).encode("utf-8")
+    
+    messages, errors = framer.feed(big + b'\n{"ok": 1}\n')
+    assert messages == [{"ok": 1}]
+    assert errors == [f"Frame too large ({len(big)} bytes)"]
+
+
+def test_oversize_partial_frame_is_discarded_until_newline():
+    framer = LineFramer(max_frame_size=32)
+    
+    messages, errors = framer.feed(b'{"pad": "' + b"x" * 40)
+    assert messages == []
+    assert errors == ["Frame too large (> 32 bytes)"]
+    assert framer.buffer == b""
+    
+    # Phần tiếp theo của frame quá lớn: bị bỏ, không báo lỗi lần 2
+    assert framer.feed(b"x" * 40) == ([], [])
+    
+    # Đuôi của frame quá lớn bị bỏ, frame sau đó decode bình thường
+    assert framer.feed(b'xxx"}\n{"ok": 1}\n') == ([{"ok": 1}], [])
+    assert framer.discarding is False
+
+
+def test_frame_at_exact_limit_is_accepted():
+    frame = json.dumps({"pad": "x" * 20}).encode("utf-8")
+    framer = LineFramer(max_frame_size=len(frame))
+    assert framer.feed(frame + b"\n") == ([{"pad": "x" * 20}], [])
+
+
+def test_reset_clears_partial_frame():
+    framer = LineFramer(max_frame_size=8)
+    framer.feed(b"x" * 20)
+    framer.reset()
+    assert framer.feed(b'{"a":1}\n') == ([{"a": 1}], [])
+
@@ -0,0 +1,220 @@
+"""
+Test outbound_queue.py: ClientOutbox.put (gộp frame trạng thái, các chính sách overflow)
+"""
+
+from outbound_queue import DEFAULT_OVERFLOW_POLICY, ClientOutbox
+
+
+class QueueOnlyOutbox(ClientOutbox):
+    """
+    Outbox không có writer: frame nằm lại trong hàng đợi để kiểm tra
+    """
+    
+    def __init__(self, max_size=8, policy=DEFAULT_OVERFLOW_POLICY):
+        self.disconnects = []
+        super().__init__("client-1", max_size=max_size, policy=policy,
+                         on_disconnect=self.disconnects.append)
+    
+    def _wake_writer(self):
+        pass
+    
+    def queued(self):
+        return [entry[1] for entry in self.queue]
+
+
+class Fanout:
+    """
+    FanoutTimer giả: chỉ đếm số lần done()
+    """
+    
+    def __init__(self):
+        self.done_count = 0
+    
+    def done(self):
+        self.done_count += 1
+
+
+def test_new_price_replaces_unsent_frame_of_same_auction():
+    outbox = QueueOnlyOutbox()
+    first = Fanout()
+    outbox.put(b"price-a-1", "NEW_PRICE", "a", first)
+    outbox.put(b"timer-a", "UPDATE_TIMER", "a")
+    outbox.put(b"price-a-2", "NEW_PRICE", "a")
+    
+    # Frame mới vào cuối hàng, không vượt qua frame xếp trước nó
+    assert outbox.queued() == [b"timer-a", b"price-a-2"]
+    assert outbox.stats.coalesced.value == 1
+    assert first.done_count == 1
+
+
+def test_older_price_does_not_replace_newer_queued_price():
+    outbox = QueueOnlyOutbox()
+    stale = Fanout()
+    outbox.put(b"price-a-v5", "NEW_PRICE", "a", version=5)
+    # Broadcast song song xếp hàng lệch thứ tự: v4 đến sau v5
+    assert outbox.put(b"price-a-v4", "NEW_PRICE", "a", stale, version=4) is True
+    
+    assert outbox.queued() == [b"price-a-v5"]
+    assert outbox.stats.coalesced.value == 1
+    assert stale.done_count == 1
+    
+    outbox.put(b"price-a-v6", "NEW_PRICE", "a", version=6)
+    assert outbox.queued() == [b"price-a-v6"]
+
+
+def test_older_price_is_queued_after_newer_price_was_sent():
+    outbox = QueueOnlyOutbox()
+    outbox.put(b"price-a-v5", "NEW_PRICE", "a", version=5)
+    outbox.pop_all()
+    
+    # Không còn gì để so → gửi bình thường (client tự bỏ theo version)
+    outbox.put(b"price-a-v4", "NEW_PRICE", "a", version=4)
+    assert outbox.queued() == [b"price-a-v4"]
+
+
+def test_coalescing_is_per_type_and_auction():
+    outbox = QueueOnlyOutbox()
+    outbox.put(b"price-a", "NEW_PRICE", "a")
+    outbox.put(b"price-b", "NEW_PRICE", "b")
+    outbox.put(b"timer-a", "UPDATE_TIMER", "a")
+    outbox.put(b"timer-a-2", "UPDATE_TIMER", "a")
+    outbox.put(b"timer-b", "UPDATE_TIMER", "b")
+    
+    assert outbox.queued() == [b"price-a", b"price-b", b"timer-a-2", b"timer-b"]
+    assert outbox.stats.coalesced.value == 1
+
+
+def test_terminal_frame_is_never_coalesced_across():
+    outbox = QueueOnlyOutbox()
+    outbox.put(b"price-a-1", "NEW_PRICE", "a")
+    outbox.put(b"winner-a", "WINNER", "a")
+    outbox.put(b"price-a-2", "NEW_PRICE", "a")
+    outbox.put(b"shutdown", "SHUTDOWN")
+    outbox.put(b"shutdown", "SHUTDOWN")
+    
+    assert outbox.queued() == [b"price-a-1", b"winner-a", b"price-a-2", b"shutdown", b"shutdown"]
+    assert outbox.stats.coalesced.value == 0
+
+
+def test_sent_frames_are_not_coalesced():
+    outbox = QueueOnlyOutbox()
+    fanout = Fanout()
+    outbox.put(b"price-a-1", "NEW_PRICE", "a", fanout)
+    
+    frames, fanouts = outbox.pop_all()
+    assert frames == [b"price-a-1"]
+    assert fanouts == [fanout]
+    
+    outbox.put(b"price-a-2", "NEW_PRICE", "a")
+    assert outbox.queued() == [b"price-a-2"]
+    assert outbox.stats.coalesced.value == 0
+    assert fanout.done_count == 0
+
+
+def test_drop_timer_drops_oldest_timer():
+    outbox = QueueOnlyOutbox(max_size=3, policy="drop_timer")
+    outbox.put(b"timer-a", "UPDATE_TIMER", "a")
+    outbox.put(b"price-b", "NEW_PRICE", "b")
+    outbox.put(b"timer-b", "UPDATE_TIMER", "b")
+    
+    assert outbox.put(b"winner-b", "WINNER", "b") is True
+    assert outbox.queued() == [b"price-b", b"timer-b", b"winner-b"]
+    assert outbox.stats.dropped_timer.value == 1
+    assert not outbox.closed
+
+
+def test_drop_timer_drops_new_timer_when_nothing_to_drop():
+    outbox = QueueOnlyOutbox(max_size=2, policy="drop_timer")
+    outbox.put(b"price-a", "NEW_PRICE", "a")
+    outbox.put(b"price-b", "NEW_PRICE", "b")
+    
+    assert outbox.put(b"timer-c", "UPDATE_TIMER", "c") is True
+    assert outbox.queued() == [b"price-a", b"price-b"]
+    assert outbox.stats.dropped_timer.value == 1
+    assert not outbox.closed
+
+
+def test_drop_timer_disconnects_when_no_room():
+    outbox = QueueOnlyOutbox(max_size=2, policy="drop_timer")
+    outbox.put(b"price-a", "NEW_PRICE", "a")
+    outbox.put(b"price-b", "NEW_PRICE", "b")
+    
+    assert outbox.put(b"price-c", "NEW_PRICE", "c") is False
+    assert outbox.closed
+    assert outbox.disconnects == [outbox]
+    assert outbox.stats.disconnected.value == 1
+    
+    # Đã đóng → không nhận thêm, không báo ngắt lần 2
+    assert outbox.put(b"timer-a", "UPDATE_TIMER", "a") is False
+    assert outbox.disconnects == [outbox]
+
+
+def test_latest_price_drops_timers_but_keeps_other_auctions_prices():
+    outbox = QueueOnlyOutbox(max_size=4, policy="latest_price")
+    fanout = Fanout()
+    outbox.put(b"timer-a", "UPDATE_TIMER", "a")
+    outbox.put(b"price-a", "NEW_PRICE", "a", fanout)
+    outbox.put(b"winner-c", "WINNER", "c")
+    outbox.put(b"price-b", "NEW_PRICE", "b")
+    
+    # Client xem nhiều phòng: giá của "d" không được làm mất giá chưa gửi của "a", "b"
+    assert outbox.put(b"price-d", "NEW_PRICE", "d") is True
+    assert outbox.queued() == [b"price-a", b"winner-c", b"price-b", b"price-d"]
+    assert outbox.stats.collapsed_price.value == 0
+    assert outbox.stats.dropped_timer.value == 1
+    assert fanout.done_count == 0
+    assert not outbox.closed
+    
+    # Timer đã bỏ không còn trong latest → timer mới của "a" không bị gộp nhầm
+    outbox.pop_all()
+    outbox.put(b"timer-a-2", "UPDATE_TIMER", "a")
+    assert outbox.queued() == [b"timer-a-2"]
+    assert outbox.stats.coalesced.value == 0
+
+
+def test_latest_price_keeps_price_before_terminal_frame():
+    outbox = QueueOnlyOutbox(max_size=3, policy="latest_price")
+    outbox.put(b"price-a-1", "NEW_PRICE", "a", version=1)
+    outbox.put(b"winner-b", "WINNER", "b")
+    outbox.put(b"price-a-2", "NEW_PRICE", "a", version=2)
+    
+    # Giá cùng phiên sau sự kiện kết thúc được thay, giá trước nó vẫn được gửi
+    assert outbox.put(b"price-a-3", "NEW_PRICE", "a", version=3) is True
+    assert outbox.queued() == [b"price-a-1", b"winner-b", b"price-a-3"]
+    assert not outbox.closed
+
+
+def test_latest_price_keeps_prices_for_other_frame_types():
+    outbox = QueueOnlyOutbox(max_size=3, policy="latest_price")
+    outbox.put(b"price-a", "NEW_PRICE", "a")
+    outbox.put(b"timer-a", "UPDATE_TIMER", "a")
+    outbox.put(b"price-b", "NEW_PRICE", "b")
+    
+    assert outbox.put(b"winner-a", "WINNER", "a") is True
+    assert outbox.queued() == [b"price-a", b"price-b", b"winner-a"]
+    assert outbox.stats.collapsed_price.value == 0
+
+
+def test_latest_price_disconnects_when_no_room():
+    outbox = QueueOnlyOutbox(max_size=2, policy="latest_price")
+    outbox.put(b"winner-a", "WINNER", "a")
+    outbox.put(b"winner-b", "WINNER", "b")
+    
+    assert outbox.put(b"shutdown", "SHUTDOWN") is False
+    assert outbox.closed
+    assert outbox.disconnects == [outbox]
+
+
+def test_disconnect_policy_never_drops():
+    outbox = QueueOnlyOutbox(max_size=2, policy="disconnect")
+    outbox.put(b"timer-a", "UPDATE_TIMER", "a")
+    outbox.put(b"timer-b", "UPDATE_TIMER", "b")
+    
+    assert outbox.put(b"timer-c", "UPDATE_TIMER", "c") is False
+    assert outbox.closed
+    assert outbox.disconnects == [outbox]
+    assert outbox.stats.dropped_timer.value == 0
+
+
+def test_unknown_policy_falls_back_to_default():
+    assert QueueOnlyOutbox(policy="nope").policy == DEFAULT_OVERFLOW_POLICY
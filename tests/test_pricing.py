@@ -0,0 +1,77 @@
+"""
+Test pricing.py: parse giá thành cents (không qua float) và check_bid
+"""
+
+import pytest
+
+from pricing import PriceError, check_bid, format_price, parse_cents, parse_price, to_units
+
+
+@pytest.mark.parametrize("raw, cents", [
+    (1500, 150000),
+    (0, 0),
+    ("1500", 150000),
+    (" 1500.5 ", 150050),
+    ("1500.10", 150010),
+    ("1500.100", 150010),
+    (".5", 50),
+    ("7.", 700),
+    (1500.1, 150010),
+    (0.29, 29),
+    (1.15, 115),
+])
+def test_parse_price(raw, cents):
+    assert parse_price(raw) == cents
+
+
+@pytest.mark.parametrize("raw", [
+    -5, "-5", "-0.5", "1500.123", 1500.123, "abc", "", ".", "1e3", "1 500",
+    True, None, [], float("nan"), float("inf")
+])
+def test_parse_price_rejects(raw):
+    with pytest.raises(PriceError):
+        parse_price(raw)
+
+
+def test_price_error_is_value_error():
+    # Code cũ bắt ValueError vẫn bắt được PriceError
+    with pytest.raises(ValueError):
+        parse_price("abc")
+
+
+@pytest.mark.parametrize("raw, cents", [(150010, 150010), ("42", 42), (0, 0)])
+def test_parse_cents(raw, cents):
+    assert parse_cents(raw) == cents
+
+
+@pytest.mark.parametrize("raw", [-1, "1.5", 1.5, True, None])
+def test_parse_cents_rejects(raw):
+    with pytest.raises(PriceError):
+        parse_cents(raw)
+
+
+def test_to_units_and_format():
+    assert to_units(150000) == 1500
+    assert isinstance(to_units(150000), int)
+    assert to_units(150010) == 1500.1
+    assert format_price(150000) == "1500"
+    assert format_price(150005) == "1500.05"
+
+
+def test_check_bid_accepts_exact_minimum():
+    assert check_bid(110000, 100000, 10000, 99999999900) is None
+
+
+def test_check_bid_min_increment():
+    error = check_bid(105000, 100000, 10000, 99999999900)
+    assert error == "Giá phải ít nhất $1100 (bước giá $100)"
+
+
+def test_check_bid_without_increment_needs_higher_price():
+    assert check_bid(100001, 100000, 1, 99999999900) is None
+    assert check_bid(100000, 100000, 1, 99999999900) == "Giá phải lớn hơn $1000"
+
+
+def test_check_bid_max_price():
+    assert check_bid(500000, 100000, 100, 500000) is None
+    assert check_bid(500001, 100000, 100, 500000) == "Giá tối đa là $5000"
@@ -0,0 +1,122 @@
+"""
+Test proxy_bidding.py: ProxyBook.resolve (ceiling cao nhất thắng, bằng nhau → ai đăng ký trước thắng)
+"""
+
+from proxy_bidding import ProxyBook
+
+START = 1000
+STEP = 100
+
+
+class Auction:
+    """
+    Trạng thái tối thiểu của 1 phiên giống AuctionState (price, winner, standing_seq)
+    """
+    
+    def __init__(self):
+        self.book = ProxyBook()
+        self.price = START
+        self.winner = None
+        self.standing_seq = 0
+    
+    def proxy(self, user, ceiling):
+        self.book.register(user, ceiling)
+        return self.resolve()
+    
+    def bid(self, user, value):
+        self.price = value
+        self.winner = user
+        self.standing_seq = self.book.next_seq()
+        return self.resolve()
+    
+    def resolve(self):
+        outcome = self.book.resolve(self.price, self.winner, self.standing_seq, STEP)
+        if outcome is not None:
+            self.price, self.winner, self.standing_seq = outcome
+        return outcome
+
+
+def test_single_proxy_opens_one_step_above_start():
+    auction = Auction()
+    assert auction.proxy("alice", 5000) == (START + STEP, "alice", 1)
+    # Không có đối thủ → resolve lại không đổi gì
+    assert auction.resolve() is None
+
+
+def test_second_highest_ceiling_sets_price():
+    auction = Auction()
+    auction.proxy("alice", 5000)
+    auction.proxy("bob", 3000)
+    assert (auction.price, auction.winner) == (3100, "alice")
+
+
+def test_higher_later_ceiling_wins():
+    auction = Auction()
+    auction.proxy("alice", 5000)
+    auction.proxy("bob", 6000)
+    assert (auction.price, auction.winner) == (5100, "bob")
+
+
+def test_price_capped_at_winner_ceiling():
+    auction = Auction()
+    auction.proxy("alice", 5000)
+    auction.proxy("bob", 5050)
+    assert (auction.price, auction.winner) == (5050, "bob")
+
+
+def test_tying_ceilings_earlier_registration_wins():
+    auction = Auction()
+    auction.proxy("alice", 5000)
+    outcome = auction.proxy("bob", 5000)
+    
+    assert outcome == (5000, "alice", 1)
+    # bob không bao giờ vượt được nữa → bị loại khỏi sổ
+    assert auction.resolve() is None
+    assert auction.book.get("bob") is None
+    assert len(auction.book) == 1
+
+
+def test_tying_ceilings_order_independent_of_user():
+    auction = Auction()
+    auction.proxy("zoe", 4000)
+    auction.proxy("adam", 4000)
+    assert (auction.price, auction.winner) == (4000, "zoe")
+
+
+def test_earlier_proxy_wins_tie_with_regular_bid():
+    auction = Auction()
+    auction.proxy("alice", 3000)
+    # Bid thường bằng đúng ceiling, đặt sau → proxy đặt trước vẫn dẫn ở giá đó
+    auction.bid("carol", 3000)
+    assert (auction.price, auction.winner) == (3000, "alice")
+
+
+def test_regular_bid_above_ceiling_exhausts_proxy():
+    auction = Auction()
+    auction.proxy("alice", 3000)
+    assert auction.bid("carol", 3050) is None
+    assert (auction.price, auction.winner) == (3050, "carol")
+    assert auction.book.get("alice") is None
+
+
+def test_proxy_below_one_step_cannot_beat_standing_bid():
+    auction = Auction()
+    auction.bid("carol", 2000)
+    assert auction.proxy("alice", 2050) is None
+    assert auction.winner == "carol"
+    assert len(auction.book) == 0
+
+
+def test_raising_ceiling_replaces_old_entry():
+    auction = Auction()
+    auction.proxy("alice", 3000)
+    auction.proxy("bob", 4000)
+    assert (auction.price, auction.winner) == (3100, "bob")
+    
+    auction.proxy("alice", 4500)
+    assert (auction.price, auction.winner) == (4100, "alice")
+    assert auction.book.get("alice") == 4500
+    
+    # Bản ghi cũ (3000) của alice không còn tác dụng
+    auction.proxy("bob", 4500)
+    assert (auction.price, auction.winner) == (4500, "alice")
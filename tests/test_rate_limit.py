@@ -0,0 +1,53 @@
+"""
+Test rate_limit.py: token bucket theo kết nối / theo user (khóa do server gán)
+"""
+
+from rate_limit import DEFAULT_BID_RATE, DEFAULT_USER_BID_RATE, BidRateLimiter, TokenBucket
+
+
+def test_disabled_by_default():
+    assert DEFAULT_BID_RATE == 0
+    assert DEFAULT_USER_BID_RATE == 0
+    limiter = BidRateLimiter()
+    assert limiter.new_connection_bucket() is None
+    assert all(limiter.allow(None, ("127.0.0.1", "alice")) for _ in range(1000))
+
+
+def test_token_bucket_burst_then_refill():
+    bucket = TokenBucket(rate=10, burst=3)
+    now = bucket.updated
+    assert [bucket.try_acquire(now) for _ in range(4)] == [True, True, True, False]
+    # 0.1 giây → nạp lại 1 token
+    assert bucket.try_acquire(now + 0.1) is True
+    assert bucket.try_acquire(now + 0.1) is False
+
+
+def test_connection_bucket_limits_one_connection():
+    limiter = BidRateLimiter(rate=1, burst=2, user_rate=0)
+    first, second = limiter.new_connection_bucket(), limiter.new_connection_bucket()
+    
+    assert [limiter.allow(first, None) for _ in range(3)] == [True, True, False]
+    assert limiter.allow(second, None) is True
+    assert limiter.connection_rejected.value == 1
+
+
+def test_user_buckets_are_isolated_by_key():
+    limiter = BidRateLimiter(rate=0, user_rate=1, user_burst=2)
+    attacker = ("10.0.0.9", "victim")
+    victim = ("10.0.0.1", "victim")
+    
+    # Kết nối khác mượn tên "victim" chỉ rút cạn bucket của chính nó
+    assert [limiter.allow(None, attacker) for _ in range(5)] == [True, True, False, False, False]
+    assert limiter.allow(None, victim) is True
+    assert limiter.user_rejected.value == 3
+
+
+def test_idle_user_buckets_are_evicted():
+    limiter = BidRateLimiter(rate=0, user_rate=1000, user_burst=1, max_users=2)
+    limiter.allow(None, "a")
+    limiter.allow(None, "b")
+    limiter.user_buckets["a"].updated -= 1
+    limiter.user_buckets["b"].updated -= 1
+    
+    limiter.allow(None, "c")
+    assert set(limiter.user_buckets) == {"c"}